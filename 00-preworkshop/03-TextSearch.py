@@ -1,10 +1,8 @@
 from pprint import pprint
 
-import numpy as np
-import pandas as pd
 import requests
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+
+from llmzmcp.search import TextSearch
 
 docs_url = 'https://github.com/alexeygrigorev/llm-rag-workshop/raw/main/notebooks/documents.json'
 docs_response = requests.get(docs_url)
@@ -18,40 +16,8 @@ for course in documents_raw:
         documents.append(doc)
 
 
-class TextSearch:
-
-    def __init__(self, text_fields):
-        self.text_fields = text_fields
-        self.matrices = {}
-        self.vectorizers = {}
-
-    def fit(self, records, vectorizer_params={}):
-        self.df = pd.DataFrame(records)
-
-        for f in self.text_fields:
-            cv = TfidfVectorizer(**vectorizer_params)
-            X = cv.fit_transform(self.df[f])
-            self.matrices[f] = X
-            self.vectorizers[f] = cv
-
-    def search(self, query, n_results=10, boost={}, filters={}):
-        score = np.zeros(len(self.df))
-
-        for f in self.text_fields:
-            b = boost.get(f, 1.0)
-            q = self.vectorizers[f].transform([query])
-            s = cosine_similarity(self.matrices[f], q).flatten()
-            score = score + b * s
-
-        for field, value in filters.items():
-            mask = (self.df[field] == value).values
-            score = score * mask
-
-        idx = np.argsort(-score)[:n_results]
-        results = self.df.iloc[idx]
-        return results.to_dict(orient='records')
-    
-
+# The TextSearch class written here is now packaged as `llmzmcp.search.TextSearch`,
+# which also answers batches of queries with `search_many`
 # Use the search class
 index = TextSearch(text_fields=['section', 'question', 'text'])
 index.fit(documents)
@@ -63,4 +29,14 @@ results = index.search(
     filters={'course': 'data-engineering-zoomcamp'}
 )
 
-pprint(results,indent=2,width=120)
\ No newline at end of file
+pprint(results,indent=2,width=120)
+
+# Many queries at once - one transform and one sparse matrix product per field
+batch_results = index.search_many(
+    ['I just signed up. Is it too late to join the course?', 'How do I run kafka?'],
+    courses=['data-engineering-zoomcamp', 'data-engineering-zoomcamp'],
+    n_results=2,
+    boost={'question': 3.0},
+)
+
+pprint(batch_results,indent=2,width=120)
\ No newline at end of file
@@ -0,0 +1,4 @@
+"""
+Standalone benchmark scripts. Run them as modules, e.g.
+    python -m llmzmcp.benchmarks.snapshot_cold_start
+"""
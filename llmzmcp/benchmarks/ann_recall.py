@@ -0,0 +1,67 @@
+"""
+Recall/latency benchmark of the IVF index against an exact scan on the ground truth set.
+Documents and questions are embedded with `multi-qa-MiniLM-L6-cos-v1` through the
+embedding store, so only the first run pays for the encoding.
+
+    python -m llmzmcp.benchmarks.ann_recall
+"""
+
+import json
+import time
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from llmzmcp.data import load_eval_documents, load_ground_truth_questions
+from llmzmcp.module3.functions import evaluate_search
+from llmzmcp.search import IVFVectorSearch
+from llmzmcp.shared import get_embedding_store, sentence_transformer_encoder
+
+K = 5
+MODEL_NAME = 'multi-qa-MiniLM-L6-cos-v1'
+
+
+def exact_search(vectors, courses, vector, course, k=K):
+    scores = vectors @ vector
+    scores[courses != course] = -np.inf
+    top = np.argsort(-scores)[:k]
+    return top[np.isfinite(scores[top])]
+
+
+if __name__ == "__main__":
+    documents = load_eval_documents()
+    ground_truth = load_ground_truth_questions().to_dict(orient="records")
+
+    store = get_embedding_store(MODEL_NAME)
+    encode = sentence_transformer_encoder(SentenceTransformer(MODEL_NAME))
+    vectors = store.get_many([d['question'] + ' ' + d['text'] for d in documents], encode)
+    query_vectors = store.get_many([q['question'] for q in ground_truth], encode)
+    courses = np.array([d['course'] for d in documents])
+
+    t0 = time.perf_counter()
+    exact = [exact_search(vectors, courses, v, q['course']) for v, q in zip(query_vectors, ground_truth)]
+    exact_ms = (time.perf_counter() - t0) / len(ground_truth) * 1000
+    exact_metrics = evaluate_search(
+        [dict(q, i=i) for i, q in enumerate(ground_truth)],
+        lambda q: [documents[r] for r in exact[q['i']]],
+    )
+
+    index = IVFVectorSearch(keyword_fields=['course'])
+    index.fit(vectors, documents)
+
+    report = {"exact": {**exact_metrics, "recall@5": 1.0, "ms_per_query": round(exact_ms, 4)}}
+    for nprobe in [1, 2, 4, 8, 16, len(index.centroids)]:
+        t0 = time.perf_counter()
+        approx = [index.search_rows(v, {'course': q['course']}, K, nprobe=nprobe)[0]
+                  for v, q in zip(query_vectors, ground_truth)]
+        ms = (time.perf_counter() - t0) / len(ground_truth) * 1000
+
+        recall = np.mean([len(set(a) & set(e)) / max(len(e), 1) for a, e in zip(approx, exact)])
+        metrics = evaluate_search(
+            [dict(q, i=i) for i, q in enumerate(ground_truth)],
+            lambda q: [documents[r] for r in approx[q['i']]],
+        )
+        report[f"ivf nprobe={nprobe}"] = {**metrics, "recall@5": round(float(recall), 3),
+                                          "ms_per_query": round(ms, 4)}
+
+    print(json.dumps(report, indent=2, default=float))
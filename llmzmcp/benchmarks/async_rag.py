@@ -0,0 +1,110 @@
+"""
+Throughput of the async RAG pipelines: `--questions` ground truth questions are answered
+on one event loop with `--concurrency` of them in flight, then by a thread pool calling the
+sync wrappers. Needs the backend of the pipeline and an OpenAI key. Answers land in the
+completion cache, only the first run measures the api, later runs the search side alone.
+
+    python -m llmzmcp.benchmarks.async_rag [--pipeline minsearch] [--concurrency 256]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from llmzmcp.data import load_ground_truth_questions
+from llmzmcp.shared import gather_bounded, multithread_func
+
+PIPELINES = ["minsearch", "elasticsearch", "vectorsearch"]
+
+
+def load_pipeline(name):
+    """
+    (module, async rag, sync rag) of a pipeline, `build()` and `warm()` already run
+    """
+    if name == "minsearch":
+        from llmzmcp.module1 import min_search_rag as module
+        arag, rag = module.arag_minsearch, module.rag_minsearch
+    elif name == "elasticsearch":
+        from llmzmcp.module1 import elastic_search_rag as module
+        arag, rag = module.arag_elasticsearch, module.rag_elasticsearch
+    else:
+        from llmzmcp.module2 import vector_search_rag as module
+        arag, rag = module.arag_vectorsearch, module.rag_vectorsearch
+    module.build()
+    module.warm()
+    return module, arag, rag
+
+
+def percentiles(timings):
+    timings = np.array(timings) * 1000
+    return {"p50_ms": round(float(np.percentile(timings, 50)), 1),
+            "p99_ms": round(float(np.percentile(timings, 99)), 1)}
+
+
+async def run_async(arag, questions, concurrency, deadline):
+    latencies = []
+
+    async def timed(question):
+        t0 = time.perf_counter()
+        try:
+            return await arag(question)
+        finally:
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    results = await gather_bounded(questions, timed, concurrency=concurrency,
+                                   deadline=deadline)
+    elapsed = time.perf_counter() - t0
+    return results, latencies, elapsed
+
+
+def summary(results, latencies, elapsed):
+    errors = [r for r in results if isinstance(r, BaseException)]
+    return {
+        "questions_per_s": round(len(results) / elapsed, 2),
+        "seconds": round(elapsed, 2),
+        "timeouts": sum(isinstance(e, asyncio.TimeoutError) for e in errors),
+        "errors": len(errors),
+        **percentiles(latencies),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pipeline", choices=PIPELINES, default="minsearch")
+    parser.add_argument("--questions", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=256)
+    parser.add_argument("--threads", type=int, default=16, help="thread pool of the sync run")
+    parser.add_argument("--deadline", type=float, default=60)
+    args = parser.parse_args()
+
+    _, arag, rag = load_pipeline(args.pipeline)
+
+    ground_truth = load_ground_truth_questions()
+    questions = ground_truth['question'].sample(args.questions, replace=True,
+                                                random_state=1).tolist()
+
+    report = {}
+    report[f"async (concurrency {args.concurrency})"] = summary(
+        *asyncio.run(run_async(arag, questions, args.concurrency, args.deadline)))
+
+    latencies = []
+
+    def timed(question):
+        t0 = time.perf_counter()
+        try:
+            return rag(question)
+        except Exception as e:
+            return e
+        finally:
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    results = multithread_func(questions, timed, max_workers=args.threads)
+    report[f"sync wrappers ({args.threads} threads)"] = summary(
+        results, latencies, time.perf_counter() - t0)
+
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,73 @@
+"""
+Latency of the in-process hybrid search against the Qdrant `zoomcamp-hybrid` collection
+(`module2/hybrid_search.py`, needs the qdrant service running). Both sides answer the same
+sample of ground truth questions, the local side reports embedding and retrieval time
+separately since the query embedding is computed once and shared by both stages.
+
+    python -m llmzmcp.benchmarks.hybrid_latency
+"""
+
+import json
+import time
+
+import numpy as np
+
+from llmzmcp.data import load_ground_truth_questions, load_rag_documents
+from llmzmcp.search import BM25Index, HybridSearch, QuantizedVectorSearch
+from llmzmcp.shared import embed_texts, fastembed_encoder
+
+MODEL_HANDLE = "jinaai/jina-embeddings-v2-small-en"
+N_QUERIES = 200
+LIMIT = 5
+
+
+def percentiles(timings):
+    timings = np.array(timings) * 1000
+    return {"p50_ms": round(float(np.percentile(timings, 50)), 3),
+            "p99_ms": round(float(np.percentile(timings, 99)), 3)}
+
+
+if __name__ == "__main__":
+    documents = load_rag_documents()
+    questions = load_ground_truth_questions()['question'].sample(
+        n=N_QUERIES, random_state=42).tolist()
+
+    # Same fields as the qdrant collection: bm25 and jina vectors of the answer text
+    sparse_index = BM25Index(text_fields=["text"], keyword_fields=["course"]).fit(documents)
+    vectors = embed_texts([doc["text"] for doc in documents], MODEL_HANDLE)
+    dense_index = QuantizedVectorSearch(keyword_fields=["course"], quantization=None)
+    dense_index.fit(vectors, documents)
+
+    encode = fastembed_encoder(MODEL_HANDLE)
+    hybrid = HybridSearch(sparse_index, dense_index, lambda text: encode([text])[0])
+
+    report = {}
+    embed_timings = []
+    query_vectors = []
+    for q in questions:
+        t0 = time.perf_counter()
+        query_vectors.append(hybrid.encode_query(q))
+        embed_timings.append(time.perf_counter() - t0)
+    report["local query embedding"] = percentiles(embed_timings)
+
+    for mode in ["rerank", "rrf", "linear"]:
+        timings = []
+        for q, v in zip(questions, query_vectors):
+            t0 = time.perf_counter()
+            hybrid.search(q, limit=LIMIT, mode=mode, vector=v)
+            timings.append(time.perf_counter() - t0)
+        report[f"local {mode} (retrieval only)"] = percentiles(timings)
+
+    from llmzmcp.module2 import hybrid_search
+    from llmzmcp.module2.hybrid_search import fusion_rrf_search, reranking_search
+    hybrid_search.build()
+    hybrid_search.warm()
+    for name, func in [("qdrant rerank", reranking_search), ("qdrant rrf", fusion_rrf_search)]:
+        timings = []
+        for q in questions:
+            t0 = time.perf_counter()
+            func(q, limit=LIMIT)
+            timings.append(time.perf_counter() - t0)
+        report[f"{name} (embedding + round trip)"] = percentiles(timings)
+
+    print(json.dumps(report, indent=2))
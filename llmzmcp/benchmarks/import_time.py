@@ -0,0 +1,89 @@
+"""
+Import-time budget of the retrieval functions. Every measurement imports the module in a
+fresh python process, so the cost is what an API worker pays on startup. Besides the wall
+time the child reports which heavy libraries ended up in `sys.modules` and whether any
+backend client was built; both have to stay empty, they belong to `build()`/`warm()` or
+the first request. Exits with status 1 when a module is over budget or has side effects.
+
+    python -m llmzmcp.benchmarks.import_time [--budget-ms 500] [--repeats 5]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+import numpy as np
+
+MODULES = [
+    "llmzmcp.module3",
+    "llmzmcp.module1.min_search_rag",
+    "llmzmcp.module1.elastic_search_rag",
+    "llmzmcp.module2.vector_search",
+    "llmzmcp.module2.sparse_search",
+    "llmzmcp.module2.hybrid_search",
+    "llmzmcp.module2.vector_search_rag",
+    "llmzmcp.module3.search_evaluation",
+    "llmzmcp.module3.offline_rag_eval_cossim",
+]
+
+HEAVY_MODULES = [
+    "qdrant_client", "elasticsearch", "openai", "pandas", "fastembed", "onnxruntime",
+    "torch", "sentence_transformers", "minsearch", "sklearn", "matplotlib", "seaborn",
+]
+
+# The default budget is for `llmzmcp.module3`, the import an API worker needs
+BUDGET_MS = 500
+
+CHILD_CODE = """
+import json, sys, time
+t0 = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t0
+from llmzmcp.shared import client
+print(json.dumps({{
+    "seconds": elapsed,
+    "heavy": sorted({{m.split(".")[0] for m in sys.modules}} & set({heavy!r})),
+    "clients": sorted(client._clients),
+}}))
+"""
+
+
+def run_case(module, repeats=5):
+    """
+    Import `module` in `repeats` fresh processes, returns the timings (seconds) and the
+    heavy modules / clients of the last run
+    """
+    timings = []
+    for _ in range(repeats):
+        out = subprocess.run(
+            [sys.executable, "-c", CHILD_CODE.format(module=module, heavy=HEAVY_MODULES)],
+            check=True, capture_output=True, text=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        timings.append(result["seconds"])
+    return timings, result["heavy"], result["clients"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--modules", nargs="*", default=MODULES)
+    args = parser.parse_args()
+
+    report, failed = {}, False
+    for module in args.modules:
+        timings, heavy, clients = run_case(module, args.repeats)
+        timings = np.array(timings) * 1000
+        ok = float(np.median(timings)) <= args.budget_ms and not heavy and not clients
+        failed = failed or not ok
+        report[module] = {
+            "median_ms": round(float(np.median(timings)), 1),
+            "max_ms": round(float(timings.max()), 1),
+            "heavy_modules": heavy,
+            "clients": clients,
+            "ok": ok,
+        }
+
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,129 @@
+"""
+Retrieval quality, latency and memory of the qdrant collection profiles on the ground truth
+set. Every profile gets its own collection of the zoomcamp-faq vectors (question + answer,
+jina-small) with slim payloads, the ground truth questions are embedded locally and sent
+one `query_points` call at a time with the profile's search params.
+
+Small collections are normally searched by a full scan, the collections are created with a
+1KB indexing/full-scan threshold so the HNSW graph and quantization are actually used.
+Memory is reported twice: the estimated in-RAM vector bytes of the profile, and how much the
+resident memory of the qdrant server (from `/metrics`) grew while the collection was loaded
+and indexed. The latter is server-wide, other collections and allocator caching move it
+too, so read it as a rough cross-check of the estimate, not a per-collection figure.
+
+    python -m llmzmcp.benchmarks.qdrant_profiles [--url http://localhost:6333] [--keep]
+"""
+
+import argparse
+import json
+import re
+import time
+
+import httpx
+import numpy as np
+from qdrant_client import QdrantClient, models
+
+from llmzmcp.data import load_eval_documents, load_ground_truth_questions
+from llmzmcp.module3.functions import course_filter, hit_rate, mrr
+from llmzmcp.shared import (DENSE_MODEL, PROFILES, embed_texts, ensure_collection,
+                            get_profile, hnsw_config, load_vector_artifact, search_params,
+                            slim_payload, sync_qdrant)
+
+EMBEDDING_DIMENSIONALITY = 512
+
+
+def server_resident_bytes(url):
+    try:
+        metrics = httpx.get(f"{url}/metrics", timeout=10).text
+    except httpx.HTTPError:
+        return None
+    match = re.search(r"^memory_resident_bytes (\d+)", metrics, re.MULTILINE)
+    return int(match.group(1)) if match else None
+
+
+def estimated_vector_ram(profile, n_vectors, dim):
+    """
+    Bytes of vectors held in RAM: quantized codes plus the originals unless on disk
+    """
+    config = get_profile(profile)
+    total = 0 if config.on_disk else n_vectors * dim * 4
+    if config.quantization == "int8":
+        total += n_vectors * dim
+    elif config.quantization == "binary":
+        total += n_vectors * dim // 8
+    return total
+
+
+def wait_for_index(client, collection_name, timeout=300):
+    deadline = time.monotonic() + timeout
+    while client.get_collection(collection_name).status != models.CollectionStatus.GREEN:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"'{collection_name}' is still optimizing")
+        time.sleep(0.5)
+
+
+def benchmark_profile(client, url, profile, documents, ground_truth, query_vectors, limit=5):
+    collection_name = f"bench-{profile}"
+    resident_before = server_resident_bytes(url)
+    ensure_collection(
+        client, collection_name,
+        vectors_config=models.VectorParams(size=EMBEDDING_DIMENSIONALITY,
+                                           distance=models.Distance.COSINE),
+        profile=profile, recreate=True,
+        optimizers_config=models.OptimizersConfigDiff(indexing_threshold=1),
+        hnsw_config=hnsw_config(profile, full_scan_threshold=1),
+    )
+    client.create_payload_index(collection_name=collection_name, field_name="course",
+                                field_schema="keyword")
+    vectors = load_vector_artifact(documents)
+    sync_qdrant(client, collection_name, documents,
+                embedders={None: vectors.dense_embedder("question_text")},
+                make_payload=slim_payload, wait=True)
+    # Every point is stored (wait=True), the status can only be yellow for the optimizer
+    wait_for_index(client, collection_name)
+    resident_after = server_resident_bytes(url)
+    resident_delta = (None if resident_before is None or resident_after is None
+                      else resident_after - resident_before)
+
+    latencies, relevance = [], []
+    for q, vector in zip(ground_truth, query_vectors):
+        t0 = time.perf_counter()
+        points = client.query_points(collection_name=collection_name, query=vector.tolist(),
+                                     query_filter=course_filter(q['course']), limit=limit,
+                                     with_payload=["doc_id"],
+                                     search_params=search_params(profile)).points
+        latencies.append(time.perf_counter() - t0)
+        relevance.append([p.payload["doc_id"] == q['document'] for p in points])
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "hit_rate": round(hit_rate(relevance), 3),
+        "mrr": round(mrr(relevance), 3),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 3),
+        "vector_ram_bytes": estimated_vector_ram(profile, len(documents), EMBEDDING_DIMENSIONALITY),
+        "server_resident_bytes": resident_after,
+        "server_resident_delta_bytes": resident_delta,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://qdrant:6333")
+    parser.add_argument("--profiles", nargs="*", default=list(PROFILES))
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark collections")
+    args = parser.parse_args()
+
+    client = QdrantClient(url=args.url)
+    documents = load_eval_documents()
+    ground_truth = load_ground_truth_questions().to_dict(orient="records")
+    query_vectors = embed_texts([q['question'] for q in ground_truth], DENSE_MODEL)
+
+    report = {}
+    for profile in args.profiles:
+        report[profile] = benchmark_profile(client, args.url, profile, documents,
+                                            ground_truth, query_vectors)
+        if not args.keep:
+            client.delete_collection(collection_name=f"bench-{profile}")
+
+    print(json.dumps(report, indent=2))
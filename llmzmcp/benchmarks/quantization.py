@@ -0,0 +1,56 @@
+"""
+Memory, latency and retrieval quality of the quantized vector search against the exact
+float32 scan on the ground truth set, for the MiniLM (384-d) document vectors.
+
+    python -m llmzmcp.benchmarks.quantization
+"""
+
+import json
+import time
+
+from sentence_transformers import SentenceTransformer
+
+from llmzmcp.data import load_eval_documents, load_ground_truth_questions
+from llmzmcp.module3.functions import compare_search
+from llmzmcp.search import QuantizedVectorSearch
+from llmzmcp.shared import get_embedding_store, sentence_transformer_encoder
+
+MODEL_NAME = 'multi-qa-MiniLM-L6-cos-v1'
+
+
+def timed_search(index, query_vectors, ground_truth, oversample=None):
+    t0 = time.perf_counter()
+    for v, q in zip(query_vectors, ground_truth):
+        index.search_rows(v, {'course': q['course']}, 5, oversample)
+    return round((time.perf_counter() - t0) / len(ground_truth) * 1000, 4)
+
+
+if __name__ == "__main__":
+    documents = load_eval_documents()
+    ground_truth = load_ground_truth_questions().to_dict(orient="records")
+
+    store = get_embedding_store(MODEL_NAME)
+    encode = sentence_transformer_encoder(SentenceTransformer(MODEL_NAME))
+    vectors = store.get_many([d['question'] + ' ' + d['text'] for d in documents], encode)
+    query_vectors = store.get_many([q['question'] for q in ground_truth], encode)
+    records = [dict(q, i=i) for i, q in enumerate(ground_truth)]
+
+    exact = QuantizedVectorSearch(keyword_fields=['course'], quantization=None).fit(vectors, documents)
+    report = {"float32": {"ms_per_query": timed_search(exact, query_vectors, ground_truth)}}
+
+    for quantization in ["int8", "binary"]:
+        index = QuantizedVectorSearch(keyword_fields=['course'], quantization=quantization)
+        index.fit(vectors, documents)
+        for oversample in [1, 4, 10]:
+            comparison = compare_search(
+                records,
+                lambda q: exact.search(query_vectors[q['i']], {'course': q['course']}, 5),
+                lambda q: index.search(query_vectors[q['i']], {'course': q['course']}, 5, oversample),
+            )
+            report[f"{quantization} oversample={oversample}"] = {
+                **comparison,
+                **index.memory_usage(),
+                "ms_per_query": timed_search(index, query_vectors, ground_truth, oversample),
+            }
+
+    print(json.dumps(report, indent=2, default=float))
@@ -0,0 +1,52 @@
+"""
+Cold-start benchmark of the FAQ corpus loaders. Every measurement runs in a fresh
+python process so neither `timed_lru_cache` nor the OS page cache of a warm interpreter
+hides the parsing cost. Compares the json path against opening the binary snapshot
+(lazy, zero-copy) and materializing it into the same list of dicts.
+"""
+
+import json
+import subprocess
+import sys
+
+import numpy as np
+
+CHILD_CODE = """
+import time
+from llmzmcp.data import datasets
+t0 = time.perf_counter()
+{stmt}
+print(time.perf_counter() - t0)
+"""
+
+CASES = {
+    "json (documents.json)": "docs = datasets.read_rag_json()",
+    "snapshot open (documents.json)": "snap = datasets.open_rag_snapshot()",
+    "snapshot records (documents.json)": "docs = datasets.open_rag_snapshot().to_records()",
+    "json (documents-with-ids.json)": "docs = datasets.read_eval_json()",
+    "snapshot open (documents-with-ids.json)": "snap = datasets.open_eval_snapshot()",
+    "snapshot records (documents-with-ids.json)": "docs = datasets.open_eval_snapshot().to_records()",
+}
+
+
+def run_case(stmt, repeats=10):
+    timings = []
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, "-c", CHILD_CODE.format(stmt=stmt)],
+                             check=True, capture_output=True, text=True)
+        timings.append(float(out.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+if __name__ == "__main__":
+    # Build the snapshots once so only the read path is measured
+    run_case("datasets.open_rag_snapshot(); datasets.open_eval_snapshot()", repeats=1)
+
+    summary = {}
+    for name, stmt in CASES.items():
+        timings = np.array(run_case(stmt)) * 1000
+        summary[name] = {
+            "median_ms": round(float(np.median(timings)), 2),
+            "min_ms": round(float(timings.min()), 2),
+        }
+    print(json.dumps(summary, indent=2))
@@ -1 +1,3 @@
-from llmzmcp.data.datasets import *
\ No newline at end of file
+from llmzmcp.data.datasets import *
+from llmzmcp.data.ids import *
+from llmzmcp.data.doc_store import *
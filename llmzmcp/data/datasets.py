@@ -1,15 +1,22 @@
 import os
+import re
 from pathlib import Path
 import json
-from llmzmcp.utils import timed_lru_cache
-import pandas as pd
+from llmzmcp.utils import get_cache_dir, timed_lru_cache
+from llmzmcp.data.snapshot import file_checksum, open_snapshot
 
 def data_dir():
     directory = Path(os.path.dirname(os.path.realpath(__file__)))
     return directory
 
-@timed_lru_cache(1800)
-def load_rag_documents():
+RAG_FIELDS = ["text", "section", "question", "course"]
+EVAL_FIELDS = ["text", "section", "question", "course", "id"]
+
+
+def read_rag_json():
+    """
+    Parse documents.json and flatten the per-course documents into one list
+    """
     with open(f'{data_dir()}/documents.json', 'rt') as f_in:
         docs_raw = json.load(f_in)
     
@@ -21,6 +28,35 @@ def load_rag_documents():
     
     return documents
 
+def read_eval_json():
+    with open(f'{data_dir()}/documents-with-ids.json', 'rt') as f_in:
+        documents = json.load(f_in)
+    
+    return documents
+
+def open_rag_snapshot():
+    """
+    Memory-mapped binary snapshot of documents.json. Built on first use and
+    rebuilt whenever the checksum of the json file changes.
+    """
+    return open_snapshot("documents", f'{data_dir()}/documents.json',
+                         RAG_FIELDS, read_rag_json)
+
+def open_eval_snapshot():
+    """
+    Memory-mapped binary snapshot of documents-with-ids.json
+    """
+    return open_snapshot("documents-with-ids", f'{data_dir()}/documents-with-ids.json',
+                         EVAL_FIELDS, read_eval_json)
+
+@timed_lru_cache(1800)
+def load_rag_documents():
+    try:
+        return open_rag_snapshot().to_records()
+    except OSError:
+        # Read-only or missing cache dir, fall back to parsing the json
+        return read_rag_json()
+
 def load_llm_documents():
     with open(f'{data_dir()}/documents-llm.json', 'rt') as f_in:
         docs_raw = json.load(f_in)
@@ -32,26 +68,109 @@ def load_eval_documents():
     """
     Same as rag documents with hash id for identication
     """
-    with open(f'{data_dir()}/documents-with-ids.json', 'rt') as f_in:
-        documents = json.load(f_in)
-    
-    return documents
+    try:
+        return open_eval_snapshot().to_records()
+    except OSError:
+        return read_eval_json()
 
-def load_ground_truth_questions():
+CATEGORICAL_COLUMNS = ["course", "document"]
+EVAL_MODELS = ["gpt4o-mini","gpt4o","gpt35"]
+
+
+def _read_csv(csv_path, columns=None, categorical=True, **kwargs):
+    """
+    Read one of the evaluation csvs, with the id-like columns as categoricals unless
+    `categorical=False`
+    """
+    import pandas as pd
+
+    dtype = None
+    if categorical:
+        header = pd.read_csv(csv_path, nrows=0).columns
+        dtype = {c: "category" for c in CATEGORICAL_COLUMNS if c in header}
+    return pd.read_csv(csv_path, usecols=columns, dtype=dtype, **kwargs)
+
+def columnar_cache_path(csv_path):
+    """
+    Convert a csv into a zstd compressed parquet file once and return its path.
+    The checksum of the csv is part of the file name so edits invalidate the cache.
+    """
+    csv_path = Path(csv_path)
+    cache_dir = get_cache_dir() / "columnar"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    checksum = file_checksum(csv_path)[:16]
+    path = cache_dir / f"{csv_path.stem}-{checksum}.parquet"
+    if not path.exists():
+        # Exactly `<stem>-<checksum>.parquet`, `offline-res-gpt4o-*` would also match the
+        # files of `offline-res-gpt4o-mini`
+        pattern = re.compile(rf"{re.escape(csv_path.stem)}-[0-9a-f]{{16}}\.parquet")
+        for stale in cache_dir.glob(f"{csv_path.stem}-*.parquet"):
+            if pattern.fullmatch(stale.name):
+                stale.unlink(missing_ok=True)
+        df = _read_csv(csv_path)
+        tmp_path = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+        df.to_parquet(tmp_path, compression="zstd", index=False, row_group_size=1000)
+        os.replace(tmp_path, path)
+    return path
+
+def _read_table(csv_path, columns=None, columnar=False):
+    import pandas as pd
+
+    if columnar:
+        return pd.read_parquet(columnar_cache_path(csv_path), columns=columns)
+    # The default read keeps the plain pandas dtypes existing callers rely on, categoricals
+    # are part of the columnar and chunked opt-ins
+    df = _read_csv(csv_path, columns=columns, categorical=False)
+    return df if columns is None else df[columns]
+
+def _iter_table(csv_path, chunksize, columns=None, columnar=True):
+    if not columnar:
+        yield from _read_csv(csv_path, columns=columns, chunksize=chunksize)
+        return
+
+    import pyarrow.parquet as pq
+    parquet_file = pq.ParquetFile(columnar_cache_path(csv_path),
+                                  read_dictionary=CATEGORICAL_COLUMNS)
+    for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+        yield batch.to_pandas()
+
+def load_ground_truth_questions(columns=None, columnar=False):
     """
     Load the questions generated by chatgpt completions api to evaluate the search 
     algos and rag prompts.
+
+    Set `columnar=True` to read from a parquet copy of the csv with categorical
+    `course`/`document` columns (the default read keeps them as strings), and `columns`
+    to load only a subset of the columns.
     """
-    df = pd.read_csv(f'{data_dir()}/ground-truth-data.csv')
+    df = _read_table(f'{data_dir()}/ground-truth-data.csv', columns, columnar)
     
     return df
 
 
-def load_llm_eval_dataframes(model_name):
+def load_llm_eval_dataframes(model_name, columns=None, columnar=False):
     """
-    Load results from different openai models used to evaluate model performance
+    Load results from different openai models used to evaluate model performance.
+    `columns` and `columnar` behave as in `load_ground_truth_questions`.
     """
-    assert model_name in ["gpt4o-mini","gpt4o","gpt35"], "Invalid model name. Valid values are [`gpt4o-mini`,`gpt4o`,`gpt35`]"
-    df = pd.read_csv(f'{data_dir()}/offline-res-{model_name}.csv')
+    assert model_name in EVAL_MODELS, "Invalid model name. Valid values are [`gpt4o-mini`,`gpt4o`,`gpt35`]"
+    df = _read_table(f'{data_dir()}/offline-res-{model_name}.csv', columns, columnar)
     
     return df
+
+
+def iter_ground_truth_questions(chunksize=1000, columns=None, columnar=True):
+    """
+    Stream the ground truth questions as dataframes of at most `chunksize` rows, with
+    categorical `course`/`document` columns
+    """
+    yield from _iter_table(f'{data_dir()}/ground-truth-data.csv', chunksize, columns, columnar)
+
+
+def iter_llm_eval_dataframes(model_name, chunksize=1000, columns=None, columnar=True):
+    """
+    Stream the offline results of a model as dataframes of at most `chunksize` rows
+    """
+    assert model_name in EVAL_MODELS, "Invalid model name. Valid values are [`gpt4o-mini`,`gpt4o`,`gpt35`]"
+    yield from _iter_table(f'{data_dir()}/offline-res-{model_name}.csv', chunksize, columns, columnar)
@@ -0,0 +1,61 @@
+"""
+Read-only document store keyed by document id, used to hydrate search results whose
+payload only carries the id. The documents are the memory-mapped corpus snapshots, the ids
+are a second snapshot built from the same source file, so every worker process maps the
+same pages and only decodes the rows it returns.
+"""
+
+from llmzmcp.data.datasets import (data_dir, open_eval_snapshot, open_rag_snapshot,
+                                   read_eval_json, read_rag_json)
+from llmzmcp.data.ids import document_ids
+from llmzmcp.data.snapshot import open_snapshot
+from llmzmcp.utils import timed_lru_cache
+
+
+class DocumentStore:
+
+    def __init__(self, snapshot, ids):
+        self.snapshot = snapshot
+        self.rows = {doc_id: row for row, doc_id in enumerate(ids)}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.rows
+
+    def get(self, doc_id, default=None):
+        row = self.rows.get(doc_id)
+        return default if row is None else self.snapshot[row]
+
+    def get_many(self, doc_ids):
+        """
+        Documents of `doc_ids` in the same order, None for unknown ids
+        """
+        return [self.get(doc_id) for doc_id in doc_ids]
+
+    def hydrate(self, points, id_key="doc_id"):
+        """
+        Full documents of qdrant points (or payload dicts) that only carry the document id
+        """
+        payloads = [p if isinstance(p, dict) else p.payload for p in points]
+        return self.get_many([payload[id_key] for payload in payloads])
+
+
+def _open_store(name, source_path, open_documents, read_documents):
+    snapshot = open_documents()
+    ids = open_snapshot(f"{name}-ids", source_path, ["doc_id"],
+                        lambda: [{"doc_id": i} for i in document_ids(read_documents())])
+    return DocumentStore(snapshot, ids.column("doc_id"))
+
+
+@timed_lru_cache(1800)
+def open_rag_store():
+    return _open_store("documents", f'{data_dir()}/documents.json',
+                       open_rag_snapshot, read_rag_json)
+
+
+@timed_lru_cache(1800)
+def open_eval_store():
+    return _open_store("documents-with-ids", f'{data_dir()}/documents-with-ids.json',
+                       open_eval_snapshot, read_eval_json)
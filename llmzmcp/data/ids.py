@@ -0,0 +1,49 @@
+"""
+Stable document ids and content hashes. The id identifies a FAQ entry across edits of its
+answer, the content hash changes whenever any field of the entry changes.
+"""
+
+import hashlib
+import json
+
+
+def generate_document_id(doc):
+    """
+    Create a document id using the hash of the course, 
+    question, and part of the response.
+    """
+    combined = f"{doc['course']}-{doc['question']}-{doc['text'][:10]}"
+    hash_object = hashlib.md5(combined.encode())
+    hash_hex = hash_object.hexdigest()
+    document_id = hash_hex[:8]
+    return document_id
+
+
+def content_hash(doc, exclude=()):
+    """
+    Hash of every field of the document except `exclude`, independent of key order
+    """
+    fields = {k: v for k, v in doc.items() if k not in exclude}
+    payload = json.dumps(fields, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def default_document_id(doc):
+    return doc.get("id") or generate_document_id(doc)
+
+
+def document_ids(documents, id_fn=None):
+    """
+    Yield the id of every document. Colliding ids (e.g. two entries with the same question
+    and answer prefix) are made unique with a `-<n>` suffix in corpus order.
+    """
+    id_fn = id_fn or default_document_id
+    seen = {}
+    for doc in documents:
+        doc_id = str(id_fn(doc))
+        if doc_id in seen:
+            seen[doc_id] += 1
+            doc_id = f"{doc_id}-{seen[doc_id]}"
+        else:
+            seen[doc_id] = 0
+        yield doc_id
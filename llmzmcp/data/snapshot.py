@@ -0,0 +1,199 @@
+"""
+Binary snapshots of the FAQ json corpora. Parsing the json files costs every process a full
+`json.load`, so the records are written once into a single columnar file that later processes
+open with a read-only memory map. Each text column is stored as one utf-8 blob plus an int64
+offsets array, so opening a snapshot copies nothing until a cell is actually read.
+
+File layout (all segments are 8 byte aligned):
+    magic (8 bytes) | header length (uint64) | header json | column blobs and offsets
+"""
+
+import hashlib
+import json
+import os
+import struct
+from collections.abc import Sequence
+from pathlib import Path
+
+import numpy as np
+
+from llmzmcp.utils import get_cache_dir
+
+SNAPSHOT_VERSION = 1
+_MAGIC = b"LLMZSNP1"
+_ALIGN = 8
+
+
+def file_checksum(path):
+    """
+    sha256 of a source file, used to invalidate snapshots when the json changes
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f_in:
+        for block in iter(lambda: f_in.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def snapshot_dir():
+    directory = get_cache_dir() / "snapshots"
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+def _pad(n):
+    return (-n) % _ALIGN
+
+
+def write_snapshot(path, records, fields, checksum):
+    """
+    Write `records` (a list of dicts) into a snapshot file. Missing values are stored
+    as empty strings. The file is written to a temporary name and moved into place
+    so concurrent readers never see a partial snapshot.
+    """
+    path = Path(path)
+    columns = {}
+    for field in fields:
+        encoded = [str(rec.get(field, "")).encode("utf-8") for rec in records]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        columns[field] = (b"".join(encoded), offsets)
+
+    # Compute the segment offsets relative to the start of the data section
+    segments = {}
+    position = 0
+    for field, (blob, offsets) in columns.items():
+        data_off = position
+        position += len(blob) + _pad(len(blob))
+        idx_off = position
+        position += offsets.nbytes
+        segments[field] = [data_off, len(blob), idx_off]
+
+    header = json.dumps({
+        "version": SNAPSHOT_VERSION,
+        "checksum": checksum,
+        "n_rows": len(records),
+        "fields": list(fields),
+        "segments": segments,
+    }).encode("utf-8")
+    header += b" " * _pad(len(_MAGIC) + 8 + len(header))
+
+    tmp_path = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+    with open(tmp_path, "wb") as f_out:
+        f_out.write(_MAGIC)
+        f_out.write(struct.pack("<Q", len(header)))
+        f_out.write(header)
+        for blob, offsets in columns.values():
+            f_out.write(blob)
+            f_out.write(b"\0" * _pad(len(blob)))
+            f_out.write(offsets.astype("<i8").tobytes())
+    os.replace(tmp_path, path)
+    return path
+
+
+def _read_header(path):
+    """
+    (header, data start) of a snapshot file, (None, 0) when it is not one or was cut
+    before the end of its header
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f_in:
+        if f_in.read(len(_MAGIC)) != _MAGIC:
+            return None, 0
+        try:
+            (header_len,) = struct.unpack("<Q", f_in.read(8))
+        except struct.error:
+            return None, 0
+        if len(_MAGIC) + 8 + header_len > size:
+            return None, 0
+        header = json.loads(f_in.read(header_len))
+    return header, len(_MAGIC) + 8 + header_len
+
+
+class DocumentSnapshot(Sequence):
+    """
+    Read-only, memory-mapped view over a snapshot file. Rows are decoded lazily
+    into dicts, `column()` decodes a single field and `to_records()` rebuilds the
+    same list of dicts the json loaders return.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        header, data_start = _read_header(self.path)
+        if header is None:
+            raise ValueError(f"{self.path} is not a snapshot file")
+        self.header = header
+        self.fields = header["fields"]
+        self.n_rows = header["n_rows"]
+
+        # A partly written file is shorter than its last offset index
+        end = max([data_start + idx_off + (self.n_rows + 1) * 8
+                   for _, _, idx_off in header["segments"].values()] or [data_start])
+        if os.path.getsize(self.path) < end:
+            raise ValueError(f"{self.path} is truncated")
+
+        self._mmap = np.memmap(self.path, dtype=np.uint8, mode="r")
+        self._columns = {}
+        for field, (data_off, data_len, idx_off) in header["segments"].items():
+            data = self._mmap[data_start + data_off:data_start + data_off + data_len]
+            idx_start = data_start + idx_off
+            offsets = self._mmap[idx_start:idx_start + (self.n_rows + 1) * 8].view("<i8")
+            self._columns[field] = (memoryview(data), offsets)
+
+    @property
+    def checksum(self):
+        return self.header["checksum"]
+
+    def __len__(self):
+        return self.n_rows
+
+    def _cell(self, field, i):
+        data, offsets = self._columns[field]
+        return str(data[offsets[i]:offsets[i + 1]], "utf-8")
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.n_rows))]
+        if i < 0:
+            i += self.n_rows
+        if not 0 <= i < self.n_rows:
+            raise IndexError("snapshot index out of range")
+        return {field: self._cell(field, i) for field in self.fields}
+
+    def column(self, field):
+        """
+        Decode every value of a single field
+        """
+        data, offsets = self._columns[field]
+        bounds = offsets.tolist()
+        return [str(data[a:b], "utf-8") for a, b in zip(bounds[:-1], bounds[1:])]
+
+    def to_records(self):
+        """
+        Materialize the snapshot as a list of dicts, one per document
+        """
+        columns = [self.column(field) for field in self.fields]
+        return [dict(zip(self.fields, row)) for row in zip(*columns)]
+
+
+def open_snapshot(name, source_path, fields, build_records):
+    """
+    Open the snapshot `name`, (re)building it from `build_records()` whenever it is
+    missing, was written by another snapshot version, or was built from a source file
+    with a different checksum.
+    """
+    checksum = file_checksum(source_path)
+    path = snapshot_dir() / f"{name}.v{SNAPSHOT_VERSION}.snap"
+
+    if path.exists():
+        try:
+            snapshot = DocumentSnapshot(path)
+            if (snapshot.header["version"] == SNAPSHOT_VERSION
+                    and snapshot.checksum == checksum
+                    and snapshot.fields == list(fields)):
+                return snapshot
+        except (ValueError, KeyError, OSError, struct.error):
+            pass  # Corrupt or stale file, rebuild below
+
+    write_snapshot(path, build_records(), fields, checksum)
+    return DocumentSnapshot(path)
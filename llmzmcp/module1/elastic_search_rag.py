@@ -1,11 +1,13 @@
-from elasticsearch import Elasticsearch
-from tqdm import tqdm
+"""
+RAG with the `course-questions` elasticsearch index. Importing the module has no side
+effects, `build()` creates and syncs the index and `warm()` opens the client connections.
+`arag_elasticsearch` is the asyncio pipeline on `AsyncElasticsearch`.
+"""
 
 from llmzmcp.data import load_rag_documents
-from llmzmcp.shared import esclient as es_client
-from llmzmcp.module1.utils import build_prompt, llm
-
-documents = load_rag_documents()
+from llmzmcp.shared import (RAG_DEADLINE, get_async_es_client, get_encoding, get_es_client,
+                            limit, run_sync, sync_elasticsearch, with_deadline)
+from llmzmcp.module1.utils import allm, allm_stream, build_prompt, llm_stream
 
 ###########################################################################################
 # Define the ES index settings, similar to a SQL db table schema
@@ -26,29 +28,33 @@ index_settings = {
 }
 index_name = "course-questions"     # Name
 
-# Create the index if it doesn't exist
-if not es_client.indices.exists(index=index_name):
-    print(f"Creating index: {index_name}")
-    es_client.indices.create(index=index_name, body=index_settings)
 
-    ###########################################################################################
-    # Insert entries/documents into the index
-    ###########################################################################################
-    print("Populating index...")
-    for doc in tqdm(documents, position=0):
-        es_client.index(index=index_name, document=doc)
-else:
-    print(f"Index '{index_name}' already exists. Skipping creation and population.")
+def build(es_client=None):
+    """
+    Create the index if it doesn't exist and sync it with the documents: only new, edited
+    and removed FAQ entries are sent to the bulk api. Returns the `SyncPlan`.
+    """
+    return sync_elasticsearch(es_client or get_es_client(), index_name, index_settings,
+                              load_rag_documents())
+
+
+def warm():
+    """
+    Build the pooled client, open a connection to the cluster and load the tokenizer of
+    the prompt context
+    """
+    get_es_client().ping()
+    get_encoding()
 
 
 ###########################################################################################
 # utils
 ###########################################################################################
-def elastic_search_query(query, course:str="data-engineering-zoomcamp"):
+def search_body(query, course:str="data-engineering-zoomcamp"):
     """
-    Query the index
+    Search request body shared by the sync and async queries
     """
-    search_query = {
+    return {
         "size": 5, # Return 5 documents from index
         "query": {
             "bool": {
@@ -69,7 +75,14 @@ def elastic_search_query(query, course:str="data-engineering-zoomcamp"):
         }
     }
 
-    response = es_client.search(index=index_name, body=search_query)
+
+def elastic_search_query(query, course:str="data-engineering-zoomcamp"):
+    """
+    Query the index
+    """
+    search_query = search_body(query, course)
+
+    response = get_es_client().search(index=index_name, body=search_query)
     
     result_docs = []
     
@@ -79,17 +92,54 @@ def elastic_search_query(query, course:str="data-engineering-zoomcamp"):
     return result_docs
 
 
+async def aelastic_search_query(query, course:str="data-engineering-zoomcamp"):
+    """
+    Query the index with the async client
+    """
+    async with limit("elasticsearch"):
+        response = await get_async_es_client().search(index=index_name,
+                                                      body=search_body(query, course))
+
+    return [hit['_source'] for hit in response['hits']['hits']]
+
+
+async def arag_elasticsearch(query, deadline=RAG_DEADLINE):
+    async def pipeline():
+        search_results = await aelastic_search_query(query)
+        prompt = build_prompt(query, search_results)
+        return await allm(prompt)
+    return await with_deadline(pipeline(), deadline)
+
+
 def rag_elasticsearch(query):
+    # No deadline, like the blocking client calls it replaces
+    return run_sync(arag_elasticsearch(query, deadline=None))
+
+
+def rag_elasticsearch_stream(query):
+    """
+    Answer tokens as they are generated, see `llm_stream`
+    """
     search_results = elastic_search_query(query)
-    prompt = build_prompt(query, search_results)
-    answer = llm(prompt)
-    return answer
+    return llm_stream(build_prompt(query, search_results))
+
+
+async def arag_elasticsearch_stream(query, deadline=RAG_DEADLINE):
+    """
+    `async for` the answer tokens, see `allm_stream`. The deadline covers the search,
+    the caller decides how long to consume the stream.
+    """
+    search_results = await with_deadline(aelastic_search_query(query), deadline)
+    return allm_stream(build_prompt(query, search_results))
 
 
 ###########################################################################################
 # Answer a question with context from the documents json
 ###########################################################################################
 if __name__ == "__main__":
+    build()
+    warm()
+
     print("Using document context with GPT-4o and elastic search db.\n\n")
 
     query = 'how do I run kafka?'
@@ -1,20 +1,36 @@
-import json
-from pprint import pprint
+"""
+RAG with the in-process BM25 index of the FAQ documents. Importing the module has no side
+effects, the index is fitted on first use or by `build()`/`warm()`.
+`arag_minsearch` is the asyncio pipeline, many questions share one event loop:
+    answers = await gather_bounded(questions, arag_minsearch)
+"""
 
-import minsearch
+import asyncio
+from functools import lru_cache
 
 from llmzmcp.data import load_rag_documents
-from llmzmcp.shared import oaiclient as client
-from llmzmcp.module1.utils import build_prompt, llm
+from llmzmcp.shared import (RAG_DEADLINE, get_encoding, get_openai_client, run_sync,
+                            with_deadline)
+from llmzmcp.module1.utils import allm, allm_stream, build_prompt, llm_stream
+from llmzmcp.search import BM25Index
+
+
+@lru_cache(maxsize=None)
+def build():
+    """
+    Index the documents - BM25 inverted index with the same api as `minsearch.Index`.
+    A query only scores the documents that share a term with it
+    """
+    index = BM25Index(
+        text_fields=["question", "text", "section"],
+        keyword_fields=["course"]
+    )
+    return index.fit(load_rag_documents())
 
-documents = load_rag_documents()
 
-# Index the documents - create a bag of key words dataframe
-index = minsearch.Index(
-    text_fields=["question", "text", "section"],
-    keyword_fields=["course"]
-)
-index.fit(documents)
+def warm():
+    build()
+    get_encoding()  # Token counts of the prompt context
 
 
 ###########################################################################################
@@ -23,7 +39,7 @@ index.fit(documents)
 def search_course(query:str, course:str='data-engineering-zoomcamp'):
     boost = {'question': 3.0, 'section': 0.5}
 
-    results = index.search(
+    results = build().search(
         query=query,
         filter_dict={'course': course},
         boost_dict=boost,
@@ -32,13 +48,37 @@ def search_course(query:str, course:str='data-engineering-zoomcamp'):
 
     return results
 
+async def arag_minsearch(query, deadline=RAG_DEADLINE):
+    async def pipeline():
+        # The first search fits the index, the worker thread keeps it off the loop
+        search_results = await asyncio.to_thread(search_course, query)
+        prompt = build_prompt(query, search_results)
+        return await allm(prompt)
+    return await with_deadline(pipeline(), deadline)
+
+
 def rag_minsearch(query):
+    # No deadline, like the blocking client calls it replaces
+    return run_sync(arag_minsearch(query, deadline=None))
+
+
+def rag_minsearch_stream(query):
+    """
+    Answer tokens as they are generated, see `llm_stream`
+    """
     search_results = search_course(query)
-    prompt = build_prompt(query, search_results)
-    answer = llm(prompt)
-    return answer
+    return llm_stream(build_prompt(query, search_results))
 
 
+async def arag_minsearch_stream(query, deadline=RAG_DEADLINE):
+    """
+    `async for` the answer tokens, see `allm_stream`. The deadline covers the search (and
+    fitting the index on first use, both in a worker thread), the caller decides how long
+    to consume the stream.
+    """
+    search_results = await with_deadline(asyncio.to_thread(search_course, query), deadline)
+    return allm_stream(build_prompt(query, search_results))
+
 
 if __name__ == "__main__":
     ###########################################################################################
@@ -46,7 +86,7 @@ if __name__ == "__main__":
     ###########################################################################################
     q = 'the course has already started, can I still enroll?'
 
-    response = client.chat.completions.create(
+    response = get_openai_client().chat.completions.create(
         model='gpt-4o',
         messages=[{"role": "user", "content": q}]
     )
@@ -69,3 +109,13 @@ if __name__ == "__main__":
     answer = rag_minsearch(query)
     print(f"Query: {query}")
     print(answer)
+
+    ###########################################################################################
+    # Stream the answer, tokens are printed as they arrive
+    ###########################################################################################
+    query = 'how do I run kafka?'
+    print(f"\n\nStreaming query: {query}")
+    stream = rag_minsearch_stream(query)
+    for token in stream:
+        print(token, end="", flush=True)
+    print("\n", stream.metrics())
@@ -1,7 +1,12 @@
-from llmzmcp.shared import oaiclient as client
+from llmzmcp.shared import (CONTEXT_TOKEN_BUDGET, achat_completion, astream_chat_completion,
+                            chat_completion, pack_context, stream_chat_completion)
 
 
-def build_prompt(query, search_results):
+def pack_prompt(query, search_results, budget=CONTEXT_TOKEN_BUDGET):
+    """
+    Prompt with the search results packed into `budget` tokens (see `pack_context`),
+    returns (prompt, packed context) so callers can log the per-section token use
+    """
     prompt_template = """
     You're a course teaching assistant. Answer the QUESTION based on the CONTEXT from the FAQ database.
     Use only the facts from the CONTEXT when answering the QUESTION.
@@ -12,19 +17,36 @@ def build_prompt(query, search_results):
     {context}
     """.strip()
 
-    context = ""
-    
-    for doc in search_results:
-        context = context + f"section: {doc['section']}\nquestion: {doc['question']}\nanswer: {doc['text']}\n\n"
-    
-    prompt = prompt_template.format(question=query, context=context).strip()
-    return prompt
+    packed = pack_context(search_results, budget=budget, model='gpt-4o')
+
+    prompt = prompt_template.format(question=query, context=packed.text).strip()
+    return prompt, packed
+
+
+def build_prompt(query, search_results, budget=CONTEXT_TOKEN_BUDGET):
+    return pack_prompt(query, search_results, budget)[0]
 
 
 def llm(prompt):
-    response = client.chat.completions.create(
-        model='gpt-4o',
-        messages=[{"role": "user", "content": prompt}]
-    )
-    
-    return response.choices[0].message.content
\ No newline at end of file
+    # Identical prompts are answered from the local completion cache
+    return chat_completion([{"role": "user", "content": prompt}], model='gpt-4o')
+
+
+async def allm(prompt):
+    # Same cache entries as `llm`, the api call runs on the AsyncOpenAI client
+    return await achat_completion([{"role": "user", "content": prompt}], model='gpt-4o')
+
+
+def llm_stream(prompt):
+    """
+    Streaming `llm`: iterate the returned `CompletionStream` for the tokens as they arrive,
+    `.text` is the answer and `.metrics()` holds the time to first token and total time
+    """
+    return stream_chat_completion([{"role": "user", "content": prompt}], model='gpt-4o')
+
+
+def allm_stream(prompt):
+    """
+    `llm_stream` for `async for`
+    """
+    return astream_chat_completion([{"role": "user", "content": prompt}], model='gpt-4o')
@@ -1,25 +1,48 @@
-from random import choice
+"""
+Hybrid (dense + bm25) search on the `zoomcamp-hybrid` qdrant collection. Importing the
+module has no side effects, `build()` creates and syncs the collection and `warm()` loads
+the document store and both query models.
+"""
 
-from fastembed import TextEmbedding
-from qdrant_client import models
-from tqdm import tqdm
+from __future__ import annotations
 
-from llmzmcp.data import load_rag_documents
-from llmzmcp.shared import qdclient as client
+from typing import TYPE_CHECKING
 
-# Load the documents
-documents_raw = load_rag_documents()
+from llmzmcp.data import load_rag_documents, open_rag_store
+from llmzmcp.shared import (ensure_collection, get_qdrant_client, get_query_embedder,
+                            hydrate_points, load_vector_artifact, result_payload, search_params,
+                            slim_payload, sync_qdrant)
+from llmzmcp.utils import SLIM_PAYLOADS
+
+if TYPE_CHECKING:
+    from qdrant_client import models
 
 collection_name = "zoomcamp-hybrid"
+dense_model_handle = "jinaai/jina-embeddings-v2-small-en"
+sparse_model_handle = "Qdrant/bm25"
 
-# Check if the collection exists
-existing_collections = client.get_collections().collections
-existing_names = [c.name for c in existing_collections]
 
-# Create the collection with specified vector parameters
-if collection_name not in existing_names:
-    client.create_collection(
-        collection_name=collection_name,
+def query_embedder():
+    """
+    Dense and sparse query vectors are computed locally once per distinct question and cached
+    """
+    return get_query_embedder(dense_model_handle, sparse_model_handle)
+
+
+def build(client=None):
+    """
+    Create the collection if it does not exist and sync it with the documents.
+    Returns the `SyncPlan`.
+    """
+    from qdrant_client import models
+
+    client = client or get_qdrant_client()
+    documents_raw = load_rag_documents()
+
+    # Create the collection with specified vector parameters if it does not exist.
+    # Storage, HNSW and quantization settings come from the `LLMZMCP_QDRANT_PROFILE` profile
+    ensure_collection(
+        client, collection_name,
         vectors_config={ # Named dense vector
             "jina-small": models.VectorParams(
                 size=512, distance=models.Distance.COSINE,
@@ -31,97 +54,93 @@ if collection_name not in existing_names:
             )
         }
     )
-else:
-    print(f"Collection '{collection_name}' already exists. Skipping creation.")
-
-
-# Upsert the entries into the collection i.e. create if it doesn't exist or update if it exists
-resp = client.count(collection_name=collection_name, exact=True)
-if resp.count == 0:
-    print(f"Collection '{collection_name}' is empty. Proceeding with upsert.")
-
-    points = []
-    print("Seeding points....")
-    for id,doc in tqdm(enumerate(documents_raw), total=len(documents_raw), position=0):
-        # Manually specify a collection index
-        point = models.PointStruct(
-            id=id+1,
-            vector={
-                "jina-small": models.Document(
-                    text=doc["text"], model="jinaai/jina-embeddings-v2-small-en",
-                ),
-                "bm25": models.Document(text=doc["text"], model="Qdrant/bm25"),
-            },
-            payload={
-                "text": doc["text"],
-                "section": doc["section"],
-                "course": doc["course"],
-            }
-        )
-        points.append(point)
-    
-    client.upsert(collection_name=collection_name,points=points)
-else:
-    print(f"Collection '{collection_name}' already has {resp.count} points. Skipping upsert.")
+
+    # Sync the collection with the documents: only new, edited and removed FAQ entries are
+    # embedded, upserted or deleted, unchanged points are left as they are
+    # Dense and sparse vectors come from the shared artifact, no model runs for this collection
+    vectors = load_vector_artifact(documents_raw)
+    return sync_qdrant(
+        client, collection_name, documents_raw,
+        embedders={
+            "jina-small": vectors.dense_embedder("text"),
+            "bm25": vectors.sparse_embedder("text"),
+        },
+        make_payload=slim_payload if SLIM_PAYLOADS else lambda doc: {
+            "text": doc["text"],
+            "section": doc["section"],
+            "course": doc["course"],
+        },
+    )
+
+
+def warm():
+    """
+    Open the memory-mapped store that hydrates slim search results and load the query models
+    """
+    open_rag_store()
+    query_embedder().warm(dense=True, sparse=True)
 
 
 ###########################################################################################
 # Search the db collection using the hybrid embedding point vectors
 ###########################################################################################
 def reranking_search(query: str, limit: int = 1) -> list[models.ScoredPoint]:
-    results = client.query_points(
+    from qdrant_client import models
+
+    results = get_qdrant_client().query_points(
         collection_name=collection_name,
         # Prefetch excess results
         prefetch=[
             models.Prefetch(
-                query=models.Document(text=query,
-                                      model="jinaai/jina-embeddings-v2-small-en",),
+                query=query_embedder().dense(query),
                 using="jina-small", # vector name
                 limit=(10 * limit), # ten times more results
+                params=search_params(),
             ),
         ],
         # Rerank step
-        query=models.Document(text=query, model="Qdrant/bm25"),
-        using="bm25", limit=limit, with_payload=True,
+        query=query_embedder().sparse(query),
+        using="bm25", limit=limit, with_payload=result_payload(),
     )
 
-    return results.points
+    return hydrate_points(results.points, open_rag_store())
 
 
 def fusion_rrf_search(query: str, limit: int = 1) -> list[models.ScoredPoint]:
-    results = client.query_points(
+    from qdrant_client import models
+
+    results = get_qdrant_client().query_points(
         collection_name=collection_name,
         # Prefetch results for both the dense and sparse algo
         prefetch=[
             models.Prefetch(
-                query=models.Document(
-                    text=query,
-                    model="jinaai/jina-embeddings-v2-small-en",
-                ),
+                query=query_embedder().dense(query),
                 using="jina-small",
                 limit=(5 * limit),
+                params=search_params(),
             ),
             models.Prefetch(
-                query=models.Document(
-                    text=query,
-                    model="Qdrant/bm25",
-                ),
+                query=query_embedder().sparse(query),
                 using="bm25",
                 limit=(5 * limit),
             ),
         ],
         # Fusion query enables fusion on the prefetched results
         query=models.FusionQuery(fusion=models.Fusion.RRF),
-        with_payload=True,
+        with_payload=result_payload(),
     )
 
-    return results.points
+    return hydrate_points(results.points, open_rag_store())
+
 
+if __name__ == "__main__":
+    build()
+    warm()
 
-query = "Uploading to s3 fails with An error occurred (InvalidAccessKeyId) when calling the PutObject operation: "+\
-    "The AWS Access Key Id you provided does not exist in our records."
-print(f"\n\nQuery 1: {query}")
-print("\nHybrid Rerank results\n")
-print(reranking_search(query)[0].payload['text'])
-print("\nHybrid Fusion results\n")
-print(fusion_rrf_search(query)[0].payload['text'])
\ No newline at end of file
+    query = "Uploading to s3 fails with An error occurred (InvalidAccessKeyId) when calling the PutObject operation: "+\
+        "The AWS Access Key Id you provided does not exist in our records."
+    print(f"\n\nQuery 1: {query}")
+    print("\nHybrid Rerank results\n")
+    print(reranking_search(query)[0].payload['text'])
+    print("\nHybrid Fusion results\n")
+    print(fusion_rrf_search(query)[0].payload['text'])
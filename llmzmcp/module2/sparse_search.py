@@ -1,58 +1,68 @@
-from uuid import uuid4
+"""
+BM25 sparse vector search on the `zoomcamp-sparse` qdrant collection. Importing the module
+has no side effects, `build()` creates and syncs the collection and `warm()` loads the
+document store and the bm25 query model.
+"""
 
-from llmzmcp.data import load_rag_documents
-from llmzmcp.shared import qdclient as client
-from qdrant_client import models
-from tqdm import tqdm
+from __future__ import annotations
 
-# Load the documents
-documents_raw = load_rag_documents()
+from typing import TYPE_CHECKING
+
+from llmzmcp.data import load_rag_documents, open_rag_store
+from llmzmcp.shared import (ensure_collection, get_qdrant_client, get_query_embedder,
+                            hydrate_points, load_vector_artifact, result_payload, search_params,
+                            slim_payload, sync_qdrant)
+from llmzmcp.utils import SLIM_PAYLOADS
+
+if TYPE_CHECKING:
+    from qdrant_client import models
 
 collection_name = "zoomcamp-sparse"
 model_handle = "Qdrant/bm25"
 
-# Check if the collection exists
-existing_collections = client.get_collections().collections
-existing_names = [c.name for c in existing_collections]
 
-# Create the collection with sparse `bm25` statistical algo
-if collection_name not in existing_names:
-    client.create_collection(
-        collection_name=collection_name,
+def build(client=None):
+    """
+    Create the collection if it does not exist and sync it with the documents.
+    Returns the `SyncPlan`.
+    """
+    from qdrant_client import models
+
+    client = client or get_qdrant_client()
+    documents_raw = load_rag_documents()
+
+    # Create the collection with sparse `bm25` statistical algo if it does not exist.
+    # Storage, HNSW and quantization settings come from the `LLMZMCP_QDRANT_PROFILE` profile
+    ensure_collection(
+        client, collection_name,
         sparse_vectors_config={
             "bm25": models.SparseVectorParams(
                 modifier=models.Modifier.IDF,
             )
         }
     )
-else:
-    print(f"Collection '{collection_name}' already exists. Skipping creation.")
-
-
-# Create a list of points 
-points = []
-
-print("Seeding points....")
-for id,doc in tqdm(enumerate(documents_raw), total=len(documents_raw), position=0):
-    # Manually specify a collection index
-    point = models.PointStruct(
-            id=uuid4().hex, # Use uuid for index instead of int (optional)
-            vector={"bm25": models.Document(text=doc["text"],model=model_handle)},
-            payload={# metadata
-                "text": doc["text"],
-                "section": doc["section"],
-                "course": doc["course"],
-            }
-        )
-    points.append(point)
-
-# Upsert the entries into the collection i.e. create if it doesn't exist or update if it exists
-resp = client.count(collection_name=collection_name, exact=True)
-if resp.count == 0:
-    print(f"Collection '{collection_name}' is empty. Proceeding with upsert.")
-    client.upsert(collection_name=collection_name,points=points)
-else:
-    print(f"Collection '{collection_name}' already has {resp.count} points. Skipping upsert.")
+
+    # Sync the collection with the documents: only new, edited and removed FAQ entries are
+    # embedded, upserted or deleted, unchanged points are left as they are
+    # Sparse vectors are read from the shared artifact, computed locally once for all collections
+    vectors = load_vector_artifact(documents_raw, sparse_model=model_handle)
+    return sync_qdrant(
+        client, collection_name, documents_raw,
+        embedders={"bm25": vectors.sparse_embedder("text")},
+        make_payload=slim_payload if SLIM_PAYLOADS else lambda doc: {# metadata
+            "text": doc["text"],
+            "section": doc["section"],
+            "course": doc["course"],
+        },
+    )
+
+
+def warm():
+    """
+    Open the memory-mapped store that hydrates slim search results and load the query model
+    """
+    open_rag_store()
+    get_query_embedder(sparse_model=model_handle).warm(dense=False, sparse=True)
 
 
 ###########################################################################################
@@ -60,36 +70,41 @@ else:
 ###########################################################################################
 def sparse_search(query: str, limit: int = 1) -> list[models.ScoredPoint]:
     "Return top result only from sparse search"
-    results = client.query_points(
+    results = get_qdrant_client().query_points(
         collection_name=collection_name,
-        query=models.Document(text=query,model=model_handle),
+        # bm25 query vector computed locally, cached per distinct query
+        query=get_query_embedder(sparse_model=model_handle).sparse(query),
         using="bm25", limit=limit,
-        with_payload=True,
+        with_payload=result_payload(), search_params=search_params(),
     )
 
-    return results.points
+    return hydrate_points(results.points, open_rag_store())
+
 
+if __name__ == "__main__":
+    build()
+    warm()
 
-# Manually get results for three different words from the collection 
-print(f"\n\nQuery 1: `polars`")
-print(sparse_search("polars"))
+    # Manually get results for three different words from the collection
+    print(f"\n\nQuery 1: `polars`")
+    print(sparse_search("polars"))
 
-print(f"\n\nQuery 2: `pandas`")
-print("Results are:")
-res = sparse_search("pandas")
-print(">",res[0].payload['text'].strip())
+    print(f"\n\nQuery 2: `pandas`")
+    print("Results are:")
+    res = sparse_search("pandas")
+    print(">",res[0].payload['text'].strip())
 
-print(f"\n\nQuery 3: `postgres`")
-print("Results are:")
-res = sparse_search("postgres")
-print(">",res[0].payload['text'].strip())
-# Scores returned by BM25 are not calculated with cosine similarity, but with BM25 formula. 
-# They are not bounded to a specific range like cos. sim which uses (-1,1). They are virtually unbounded.
-score = res[0].score
-print(f"BM25 score: {score:.2f}")
+    print(f"\n\nQuery 3: `postgres`")
+    print("Results are:")
+    res = sparse_search("postgres")
+    print(">",res[0].payload['text'].strip())
+    # Scores returned by BM25 are not calculated with cosine similarity, but with BM25 formula.
+    # They are not bounded to a specific range like cos. sim which uses (-1,1). They are virtually unbounded.
+    score = res[0].score
+    print(f"BM25 score: {score:.2f}")
 
 
-print(f"\n\nQuery 4: `Even though the upload works using aws cli and boto3 in Jupyter notebook.`")
-print("Results are:")
-res = sparse_search("Even though the upload works using aws cli and boto3 in Jupyter notebook.")
-print(">",res[0].payload['text'].strip())
+    print(f"\n\nQuery 4: `Even though the upload works using aws cli and boto3 in Jupyter notebook.`")
+    print("Results are:")
+    res = sparse_search("Even though the upload works using aws cli and boto3 in Jupyter notebook.")
+    print(">",res[0].payload['text'].strip())
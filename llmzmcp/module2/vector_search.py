@@ -1,24 +1,26 @@
-from random import choice
-
-from fastembed import TextEmbedding
-from qdrant_client import models
-from tqdm import tqdm
-
-from llmzmcp.data import load_rag_documents
-from llmzmcp.shared import qdclient as client
+"""
+Dense vector search on the `zoomcamp-rag` qdrant collection. Importing the module has no
+side effects, `build()` creates and syncs the collection, `warm()` loads the document
+store and the query model so the first search is fast:
+    from llmzmcp.module2 import vector_search
+    vector_search.build()
+    vector_search.warm()
+    vector_search.search_in_course("What if I submit homeworks late?")
+"""
 
-# Load the documents
-documents_raw = load_rag_documents()
+from random import choice
 
-# List the quantized models in the FastEmbed package
-options = TextEmbedding.list_supported_models()
+from llmzmcp.data import load_rag_documents, open_rag_store
+from llmzmcp.shared import (ensure_collection, get_qdrant_client, get_query_embedder,
+                            hydrate_points, load_vector_artifact, result_payload, search_params,
+                            slim_payload, sync_qdrant)
+from llmzmcp.utils import SLIM_PAYLOADS
 
 # Filter models that can generate 512 embeddings
 EMBEDDING_DIMENSIONALITY = 512
-options512 = [mod for mod in options if mod["dim"] == EMBEDDING_DIMENSIONALITY]
 
 # You need to know the model name and description e.g.
-# Whether it's valid for a specific language, whether it's unimodal or multi-modal, etc. 
+# Whether it's valid for a specific language, whether it's unimodal or multi-modal, etc.
 # For this example, we use a unimodal model for english text only. It uses cosine similarity
 model_handle = "jinaai/jina-embeddings-v2-small-en"
 
@@ -26,47 +28,69 @@ model_handle = "jinaai/jina-embeddings-v2-small-en"
 # Define the collection name. Analogous to a db table
 collection_name = "zoomcamp-rag"
 
-# Check if the collection exists
-existing_collections = client.get_collections().collections
-existing_names = [c.name for c in existing_collections]
 
-# Create the collection with specified vector parameters
-if collection_name not in existing_names:
-    client.create_collection(
-        collection_name=collection_name,
+def embedding_options(dim=EMBEDDING_DIMENSIONALITY):
+    """
+    List the quantized models in the FastEmbed package that generate `dim` embeddings
+    """
+    from fastembed import TextEmbedding
+
+    return [mod for mod in TextEmbedding.list_supported_models() if mod["dim"] == dim]
+
+
+###########################################################################################
+# Create and sync the collection
+###########################################################################################
+def build(client=None):
+    """
+    Create the collection if it does not exist and sync it with the documents.
+    Returns the `SyncPlan`.
+    """
+    from qdrant_client import models
+
+    client = client or get_qdrant_client()
+    documents_raw = load_rag_documents()
+
+    # Create the collection with specified vector parameters if it does not exist.
+    # Storage, HNSW and quantization settings come from the `LLMZMCP_QDRANT_PROFILE` profile
+    ensure_collection(
+        client, collection_name,
         vectors_config=models.VectorParams(
             size=EMBEDDING_DIMENSIONALITY,  # Dimensionality of the vectors
             distance=models.Distance.COSINE  # Distance metric for similarity search
         )
     )
-else:
-    print(f"Collection '{collection_name}' already exists. Skipping creation.")
-
-# Create a list of points 
-points = []
-
-print("Seeding points....")
-for id,doc in tqdm(enumerate(documents_raw), total=len(documents_raw), position=0):
-    # Manually specify a collection index
-    point = models.PointStruct(
-        id=id+1,
-        #embed text locally with "jinaai/jina-embeddings-v2-small-en" from FastEmbed
-        vector=models.Document(text=doc['text'], model=model_handle),
-        payload={
+
+    # Sync the collection with the documents: only new, edited and removed FAQ entries are
+    # embedded, upserted or deleted, unchanged points are left as they are
+    # Vectors are read from the shared artifact, embedded locally once for all collections
+    # with "jinaai/jina-embeddings-v2-small-en" from FastEmbed
+    vectors = load_vector_artifact(documents_raw, dense_model=model_handle)
+    plan = sync_qdrant(
+        client, collection_name, documents_raw,
+        embedders={None: vectors.dense_embedder("text")},  # single unnamed vector
+        # Slim points only store the id and `course`, the text is read locally after a search
+        make_payload=slim_payload if SLIM_PAYLOADS else lambda doc: {
             "text": doc['text'],
             "section": doc['section'],
             "course": doc['course']
-        } #save all needed metadata fields
+        }, #save all needed metadata fields
     )
-    points.append(point)
 
-# Upsert the entries into the collection i.e. create if it doesn't exist or update if it exists
-resp = client.count(collection_name=collection_name, exact=True)
-if resp.count == 0:
-    print(f"Collection '{collection_name}' is empty. Proceeding with upsert.")
-    client.upsert(collection_name=collection_name,points=points)
-else:
-    print(f"Collection '{collection_name}' already has {resp.count} points. Skipping upsert.")
+    # Index the collection for more efficient search results
+    client.create_payload_index(
+        collection_name=collection_name, field_name="course",
+        field_schema="keyword" # exact matching on string metadata fields
+    )
+    return plan
+
+
+def warm():
+    """
+    Open the memory-mapped store that hydrates slim search results and load the query model
+    """
+    open_rag_store()
+    get_query_embedder(dense_model=model_handle).warm()
 
 
 ###########################################################################################
@@ -76,60 +100,62 @@ def similarity_search(query, limit=1):
     """
     Query the vector embeddings to find the closest one without filtering by metadata
     """
-    #embed the query text locally with "jinaai/jina-embeddings-v2-small-en"
-    results = client.query_points(
+    #embed the query text locally with "jinaai/jina-embeddings-v2-small-en", cached per query
+    results = get_qdrant_client().query_points(
         collection_name=collection_name,
-        query=models.Document(text=query,model=model_handle ),
+        query=get_query_embedder(dense_model=model_handle).dense(query),
         limit=limit,       # top closest matches
-        with_payload=True  # to get metadata in the results
+        with_payload=result_payload(),  # to get metadata in the results
+        search_params=search_params(),  # hnsw_ef and quantization rescoring of the profile
     )
+    hydrate_points(results.points, open_rag_store())
 
     return results
 
-# Randomly select a question from the original documents and query the collection for it
-rand = choice(documents_raw)
-rand_q = rand['question']
-rand_a = rand['text']
-result = similarity_search(rand_q)
-result_txt = result.points[0].payload['text']
-
-print(f"\n\nQuery: {rand_q}")
-if rand_a == result_txt:
-    print("  ->\tWe found the original question")
-else:
-    print("  ->\tOriginal question could not be retrieved")
-
-
-# Manual question
-print(f"\n\nQuery 2 no filtering")
-print(similarity_search("What if I submit homeworks late?").points[0].payload['text'].strip())
-
-
-###########################################################################################
-# Index the collection for more efficient search results
-###########################################################################################
-client.create_payload_index(
-    collection_name=collection_name, field_name="course",
-    field_schema="keyword" # exact matching on string metadata fields
-)
 
 def search_in_course(query, course="mlops-zoomcamp", limit=1):
     """Perform query with filter applied"""
-    results = client.query_points(
+    from qdrant_client import models
+
+    results = get_qdrant_client().query_points(
         collection_name=collection_name,
-        query=models.Document(text=query, model=model_handle),
+        query=get_query_embedder(dense_model=model_handle).dense(query),
         # filter results by course name
-        query_filter=models.Filter( 
+        query_filter=models.Filter(
             must=[models.FieldCondition(key="course",
                     match=models.MatchValue(value=course))
             ]
         ),
-        limit=limit, with_payload=True
+        limit=limit, with_payload=result_payload(), search_params=search_params()
     )
+    hydrate_points(results.points, open_rag_store())
 
     return results
 
 
-# Manual question
-print(f"\n\nQuery 2 with filtered results")
-print(search_in_course("What if I submit homeworks late?", "mlops-zoomcamp").points[0].payload['text'])
\ No newline at end of file
+if __name__ == "__main__":
+    options512 = embedding_options()
+    build()
+    warm()
+
+    # Randomly select a question from the original documents and query the collection for it
+    rand = choice(load_rag_documents())
+    rand_q = rand['question']
+    rand_a = rand['text']
+    result = similarity_search(rand_q)
+    result_txt = result.points[0].payload['text']
+
+    print(f"\n\nQuery: {rand_q}")
+    if rand_a == result_txt:
+        print("  ->\tWe found the original question")
+    else:
+        print("  ->\tOriginal question could not be retrieved")
+
+
+    # Manual question
+    print(f"\n\nQuery 2 no filtering")
+    print(similarity_search("What if I submit homeworks late?").points[0].payload['text'].strip())
+
+    # Manual question
+    print(f"\n\nQuery 2 with filtered results")
+    print(search_in_course("What if I submit homeworks late?", "mlops-zoomcamp").points[0].payload['text'])
@@ -1,86 +1,154 @@
-from qdrant_client import models
-from tqdm import tqdm
+"""
+RAG over the `zoomcamp-faq` qdrant collection, whose vectors embed both the question and
+the answer. Importing the module has no side effects, `build()` creates and syncs the
+collection and `warm()` loads the document store and the query model.
+`arag_vectorsearch` is the asyncio pipeline on `AsyncQdrantClient`.
+"""
 
-from llmzmcp.data import load_eval_documents
-from llmzmcp.module1.utils import build_prompt, llm
-from llmzmcp.shared import qdclient as client
+import asyncio
+
+from llmzmcp.data import load_eval_documents, open_eval_store
+from llmzmcp.module1.utils import allm, allm_stream, build_prompt, llm_stream
+from llmzmcp.module3.functions import course_filter, qdrant_vector_query_batch
+from llmzmcp.shared import (RAG_DEADLINE, aio, ensure_collection, get_async_qdrant_client,
+                            get_encoding, get_qdrant_client, get_query_embedder, hydrate_points,
+                            load_vector_artifact, result_payload, run_sync, search_params,
+                            slim_payload, sync_qdrant, with_deadline)
+from llmzmcp.utils import SLIM_PAYLOADS
 
-# Create a collection that generates embeddings from both the question and text
-documents_raw = load_eval_documents()
 EMBEDDING_DIMENSIONALITY = 512
 
 model_handle = "jinaai/jina-embeddings-v2-small-en"
 collection_name = "zoomcamp-faq"
 
-# Check if the collection exists
-existing_collections = client.get_collections().collections
-existing_names = [c.name for c in existing_collections]
 
-# Create the collection with specified vector parameters
-if collection_name not in existing_names:
-    print(f"Creating collection '{collection_name}'")
-    client.create_collection(
-        collection_name=collection_name,
+def build(client=None):
+    """
+    Create the collection if it does not exist, sync it with the documents and index the
+    `course` field. Returns the `SyncPlan`.
+    """
+    from qdrant_client import models
+
+    client = client or get_qdrant_client()
+    # Create a collection that generates embeddings from both the question and text
+    documents_raw = load_eval_documents()
+
+    # Create the collection with specified vector parameters if it does not exist.
+    # Storage, HNSW and quantization settings come from the `LLMZMCP_QDRANT_PROFILE` profile
+    ensure_collection(
+        client, collection_name,
         vectors_config=models.VectorParams(
             size=EMBEDDING_DIMENSIONALITY,  # Dimensionality of the vectors
             distance=models.Distance.COSINE  # Distance metric for similarity search
         )
     )
-else:
-    print(f"Collection '{collection_name}' already exists. Skipping creation.")
-
-# Create a list of points 
-points = []
-for id,doc in tqdm(enumerate(documents_raw), total=len(documents_raw), position=0):
-    # Manually specify a collection index
-    text = doc['question'] + " " + doc['text']
-    point = models.PointStruct(
-        id=id+1,
-        vector=models.Document(text=text, model=model_handle),
-        payload=doc
+
+    # Sync the collection with the documents: only new, edited and removed FAQ entries are
+    # embedded, upserted or deleted, unchanged points are left as they are
+    # Question + answer vectors come from the shared artifact, embedded locally once
+    vectors = load_vector_artifact(documents_raw, dense_model=model_handle)
+    plan = sync_qdrant(
+        client, collection_name, documents_raw,
+        embedders={None: vectors.dense_embedder("question_text")},
+        make_payload=slim_payload if SLIM_PAYLOADS else lambda doc: doc,
+    )
+
+    # Create the index
+    client.create_payload_index(
+        collection_name=collection_name, field_name="course",
+        field_schema="keyword" # exact matching on string metadata fields
     )
-    points.append(point)
-
-# Upsert the entries into the collection i.e. create if it doesn't exist or update if it exists
-resp = client.count(collection_name=collection_name, exact=True)
-if resp.count == 0:
-    print(f"Collection '{collection_name}' is empty. Proceeding with upsert.")
-    client.upsert(collection_name=collection_name,points=points)
-else:
-    print(f"Collection '{collection_name}' already has {resp.count} points. Skipping upsert.")
-
-# Create the index
-client.create_payload_index(
-    collection_name=collection_name, field_name="course",
-    field_schema="keyword" # exact matching on string metadata fields
-)
+    return plan
+
+
+def warm():
+    """
+    Open the memory-mapped store that hydrates slim search results and load the query model
+    """
+    open_eval_store()
+    get_query_embedder(dense_model=model_handle).warm()
+    get_encoding()  # Token counts of the prompt context
+
 
 def vector_search_w_filter(query, course="mlops-zoomcamp", limit=5):
     """Perform query with filter applied"""
-    vector_points = client.query_points(
+    vector_points = get_qdrant_client().query_points(
         collection_name=collection_name,
-        query=models.Document(text=query, model=model_handle),
-        query_filter=models.Filter( 
-            must=[models.FieldCondition(key="course",
-                    match=models.MatchValue(value=course))
-            ]
-        ),
-        limit=limit, with_payload=True
+        query=get_query_embedder(dense_model=model_handle).dense(query),
+        query_filter=course_filter(course),
+        limit=limit, with_payload=result_payload(), search_params=search_params()
     )
+    hydrate_points(vector_points.points, open_eval_store())
 
     results = [point.payload for point in vector_points.points]
 
     return results
 
 
+def vector_search_w_filter_batch(queries, courses, limit=5, batch_size=64):
+    """
+    Search many questions at once, one embedding pass and `query_batch_points`
+    requests of `batch_size` questions. Results are returned in input order.
+    """
+    return qdrant_vector_query_batch(queries, collection_name, model_handle, courses,
+                                     limit=limit, batch_size=batch_size,
+                                     store=open_eval_store())
+
+
+async def avector_search_w_filter(query, course="mlops-zoomcamp", limit=5):
+    """
+    `vector_search_w_filter` with the async client. A query missing from the query
+    embedding cache is embedded in a worker thread, the model never blocks the loop.
+    """
+    vector = await asyncio.to_thread(get_query_embedder(dense_model=model_handle).dense, query)
+    # `limit` is taken by the number of results, the backend limit is `aio.limit`
+    async with aio.limit("qdrant"):
+        vector_points = await get_async_qdrant_client().query_points(
+            collection_name=collection_name, query=vector, query_filter=course_filter(course),
+            limit=limit, with_payload=result_payload(), search_params=search_params()
+        )
+    hydrate_points(vector_points.points, open_eval_store())
+
+    return [point.payload for point in vector_points.points]
+
+
+async def arag_vectorsearch(query, course="data-engineering-zoomcamp", deadline=RAG_DEADLINE):
+    async def pipeline():
+        search_results = await avector_search_w_filter(query, course=course)
+        prompt = build_prompt(query, search_results)
+        return await allm(prompt)
+    return await with_deadline(pipeline(), deadline)
+
+
 def rag_vectorsearch(query, course="data-engineering-zoomcamp"):
+    # No deadline, like the blocking client calls it replaces
+    return run_sync(arag_vectorsearch(query, course=course, deadline=None))
+
+
+def rag_vectorsearch_stream(query, course="data-engineering-zoomcamp"):
+    """
+    Answer tokens as they are generated, see `llm_stream`
+    """
     search_results = vector_search_w_filter(query, course=course)
-    prompt = build_prompt(query, search_results)
-    answer = llm(prompt)
-    return answer
+    return llm_stream(build_prompt(query, search_results))
+
+
+async def arag_vectorsearch_stream(query, course="data-engineering-zoomcamp",
+                                   deadline=RAG_DEADLINE):
+    """
+    `async for` the answer tokens, see `allm_stream`. The deadline covers the search,
+    the caller decides how long to consume the stream.
+    """
+    search_results = await with_deadline(avector_search_w_filter(query, course=course),
+                                         deadline)
+    return allm_stream(build_prompt(query, search_results))
+
 
+if __name__ == "__main__":
+    build()
+    warm()
 
-query = 'how do I setup postgres?'
-answer = rag_vectorsearch(query)
-print(f"Query: {query}")
-print(answer,"\n\n")
\ No newline at end of file
+    query = 'how do I setup postgres?'
+    answer = rag_vectorsearch(query)
+    print(f"Query: {query}")
+    print(answer,"\n\n")
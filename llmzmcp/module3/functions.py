@@ -1,8 +1,10 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 from tqdm import tqdm
-from llmzmcp.shared import esclient
-from llmzmcp.shared import qdclient
-from qdrant_client import models
+from llmzmcp.shared import (get_es_client, get_qdrant_client, get_query_embedder,
+                            hydrate_points, result_payload, search_params)
 
 
 ###########################################################################################
@@ -50,12 +52,48 @@ def evaluate_search(ground_truth, search_function):
     }
 
 
-def elastic_search_query(index_name, query, course:str="data-engineering-zoomcamp"):
+def evaluate_search_batch(ground_truth, batch_search_function, batch_size=None):
     """
-    Query the index
+    Same metrics as `evaluate_search` for search functions that answer a list of
+    ground truth records at once and return one result list per record.
+    `batch_size=None` sends the whole ground truth in a single call.
+    """
+    batch_size = batch_size or max(len(ground_truth), 1)
+    relevance_list = []
+
+    for start in tqdm(range(0, len(ground_truth), batch_size)):
+        batch = ground_truth[start:start + batch_size]
+        for q, results in zip(batch, batch_search_function(batch)):
+            relevance_list.append([d['id'] == q['document'] for d in results])
+
+    return {
+        'hit_rate': round(hit_rate(relevance_list),3),
+        'mrr': round(mrr(relevance_list),3),
+    }
+
+
+def compare_search(ground_truth, baseline_function, candidate_function):
+    """
+    Evaluate two search functions on the same ground truth and report the
+    hit rate / MRR of the candidate relative to the baseline.
+    """
+    baseline = evaluate_search(ground_truth, baseline_function)
+    candidate = evaluate_search(ground_truth, candidate_function)
+
+    return {
+        'baseline': baseline,
+        'candidate': candidate,
+        'delta': {k: round(candidate[k] - baseline[k], 3) for k in baseline},
+    }
+
+
+def elastic_search_body(query, course:str="data-engineering-zoomcamp", size=5, source=None):
+    """
+    Search request body shared by the single and the multi-search queries.
+    `source` limits the returned `_source` fields, e.g. ["id"] for evaluation.
     """
     search_query = {
-        "size": 5, # Return 5 documents from index
+        "size": size, # Return 5 documents from index
         "query": {
             "bool": {
                 "must": {
@@ -74,8 +112,19 @@ def elastic_search_query(index_name, query, course:str="data-engineering-zoomcam
             }
         }
     }
+    if source is not None:
+        search_query["_source"] = source
+
+    return search_query
+
+
+def elastic_search_query(index_name, query, course:str="data-engineering-zoomcamp"):
+    """
+    Query the index
+    """
+    search_query = elastic_search_body(query, course)
 
-    response = esclient.search(index=index_name, body=search_query)
+    response = get_es_client().search(index=index_name, body=search_query)
     
     result_docs = []
     
@@ -85,8 +134,47 @@ def elastic_search_query(index_name, query, course:str="data-engineering-zoomcam
     return result_docs
 
 
+def elastic_msearch_queries(index_name, queries, courses, batch_size=100, max_in_flight=4,
+                            source=["id"], size=5):
+    """
+    Run many queries with the `_msearch` api, `batch_size` searches per request and at most
+    `max_in_flight` requests at a time. Only the `source` fields are returned (`id` is all
+    the relevance metrics need). Returns one list of `_source` dicts per query, in order.
+    """
+    def run_batch(start):
+        searches = []
+        for query, course in zip(queries[start:start + batch_size], courses[start:start + batch_size]):
+            searches.append({"index": index_name})
+            searches.append(elastic_search_body(query, course, size=size, source=source))
+        response = get_es_client().msearch(searches=searches)
+
+        batch_results = []
+        for item in response['responses']:
+            if 'error' in item:
+                raise RuntimeError(f"msearch query failed: {item['error']}")
+            batch_results.append([hit['_source'] for hit in item['hits']['hits']])
+        return batch_results
+
+    results = []
+    starts = range(0, len(queries), batch_size)
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        # Keep at most `max_in_flight` batches pending so the requests are streamed
+        pending = deque()
+        for start in starts:
+            if len(pending) >= max_in_flight:
+                results.extend(pending.popleft().result())
+            pending.append(pool.submit(run_batch, start))
+        while pending:
+            results.extend(pending.popleft().result())
+
+    return results
+
+
 def minsearch_query(index, query:str, course:str='data-engineering-zoomcamp', 
                     boost = {'question': 3.0, 'section': 0.5}):
+    """
+    Works with both `minsearch.Index` and `llmzmcp.search.BM25Index`
+    """
     results = index.search(
         query=query,
         filter_dict={'course': course},
@@ -99,7 +187,7 @@ def minsearch_query(index, query:str, course:str='data-engineering-zoomcamp',
 
 def minsearch_vector_query(vindex, vector, course, limit=5):
     """
-    MinSearch with vector embeddings
+    MinSearch with vector embeddings (or any index with the same api, e.g. IVFVectorSearch)
     Returns top 5 results similar to input vector
     """
     return vindex.search(
@@ -109,20 +197,66 @@ def minsearch_vector_query(vindex, vector, course, limit=5):
     )
 
 
+def course_filter(course):
+    """
+    Qdrant filter on the `course` payload field
+    """
+    from qdrant_client import models
+
+    return models.Filter(
+        must=[models.FieldCondition(key="course",
+                match=models.MatchValue(value=course))
+        ]
+    )
+
+
 def qdrant_vector_query(query, collection_name, model_handle,
-                        course="mlops-zoomcamp", limit=5):
-    """Perform query with filter applied"""
-    vector_points = qdclient.query_points(
+                        course="mlops-zoomcamp", limit=5, store=None):
+    """
+    Perform query with filter applied. With a `store` (see `llmzmcp.data.DocumentStore`)
+    only the document ids are fetched and the payloads are hydrated locally.
+    """
+    vector_points = get_qdrant_client().query_points(
         collection_name=collection_name,
-        query=models.Document(text=query, model=model_handle),
-        query_filter=models.Filter( 
-            must=[models.FieldCondition(key="course",
-                    match=models.MatchValue(value=course))
-            ]
-        ),
-        limit=limit, with_payload=True
+        query=get_query_embedder(dense_model=model_handle).dense(query),
+        query_filter=course_filter(course),
+        limit=limit, with_payload=True if store is None else result_payload(),
+        search_params=search_params()
     )
+    if store is not None:
+        hydrate_points(vector_points.points, store)
 
     results = [point.payload for point in vector_points.points]
 
-    return results
\ No newline at end of file
+    return results
+
+
+def qdrant_vector_query_batch(queries, collection_name, model_handle, courses,
+                              limit=5, batch_size=64, store=None):
+    """
+    Batch version of `qdrant_vector_query`. All queries are embedded with the same query
+    embedder (and LRU) in one batched call for the misses and sent as `query_batch_points`
+    requests of `batch_size` queries each. Returns one list of payloads per query, in
+    input order.
+    """
+    from qdrant_client import models
+
+    vectors = get_query_embedder(dense_model=model_handle).dense_many(list(queries))
+
+    results = []
+    for start in range(0, len(vectors), batch_size):
+        requests = [
+            models.QueryRequest(query=vector, filter=course_filter(course),
+                                limit=limit, params=search_params(),
+                                with_payload=True if store is None else result_payload())
+            for vector, course in zip(vectors[start:start + batch_size],
+                                      courses[start:start + batch_size])
+        ]
+        responses = get_qdrant_client().query_batch_points(collection_name=collection_name,
+                                                requests=requests)
+        for response in responses:
+            if store is not None:
+                hydrate_points(response.points, store)
+            results.append([point.payload for point in response.points])
+
+    return results
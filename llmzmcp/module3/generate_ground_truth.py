@@ -1,24 +1,11 @@
-import hashlib
 import json
 import pickle
 
 import pandas as pd
 from tqdm import tqdm
 
-from llmzmcp.data import load_rag_documents
-from llmzmcp.shared import oaiclient as client
-
-
-def generate_document_id(doc):
-    """
-    Create a document id using the hash of the course, 
-    question, and part of the response.
-    """
-    combined = f"{doc['course']}-{doc['question']}-{doc['text'][:10]}"
-    hash_object = hashlib.md5(combined.encode())
-    hash_hex = hash_object.hexdigest()
-    document_id = hash_hex[:8]
-    return document_id
+from llmzmcp.data import generate_document_id, load_rag_documents
+from llmzmcp.shared import chat_completion
 
 
 prompt_template = """
@@ -45,12 +32,8 @@ def generate_questions(doc):
     """
     prompt = prompt_template.format(**doc)
 
-    response = client.chat.completions.create(
-        model='gpt-4o',
-        messages=[{"role": "user", "content": prompt}]
-    )
-
-    json_response = response.choices[0].message.content
+    # Re-runs of the pipeline reuse the cached completion instead of paying for it again
+    json_response = chat_completion([{"role": "user", "content": prompt}], model='gpt-4o')
     return json_response
 
 
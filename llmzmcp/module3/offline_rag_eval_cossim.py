@@ -2,46 +2,79 @@
 Compare answers to ground truth questions from an LLM to an actual human answer. Compute the cosine similarity 
 of the embedding vectors for both answers to evaluate how well a model performed.
 The zoomcamp provides responses from the gpt-4o and gpt-3.5-turbo. This costs quite a number of tokens
+
+Importing the module has no side effects. The vector index is fitted on first use or by
+`build()`/`warm()`, SentenceTransformer (and torch) is only loaded when a text is missing
+from the embedding store, seaborn only by the plots of the script.
 """
 
 import json
+from functools import lru_cache
 
-import matplotlib.pyplot as plt
 import numpy as np
-import seaborn as sns
-from minsearch import VectorSearch
-from sentence_transformers import SentenceTransformer
-from tqdm import tqdm
 
-from llmzmcp.data import (load_eval_documents, load_ground_truth_questions,
-                          load_llm_eval_dataframes)
-from llmzmcp.shared import multithread_func
-from llmzmcp.shared import oaiclient as client
+from llmzmcp.data import load_eval_documents, load_llm_eval_dataframes
+from llmzmcp.shared import (chat_completion, get_embedding_store, get_encoding,
+                             multithread_func, pack_context, sentence_transformer_encoder)
+from llmzmcp.search import IVFVectorSearch
 
 ###########################################################################################
 # Load the evaluation data and create a simple lookup index
 ###########################################################################################
-documents = load_eval_documents()
-ground_truth = load_ground_truth_questions()
-doc_idx = {d['id']: d for d in documents}
+@lru_cache(maxsize=None)
+def doc_idx():
+    return {d['id']: d for d in load_eval_documents()}
 
 
 ###########################################################################################
 # Generate vector embeddings of documents using sentence transformer for MinSearch
 ###########################################################################################
 model_name = 'multi-qa-MiniLM-L6-cos-v1'
-model = SentenceTransformer(model_name)
-vectors = []
 
-for doc in tqdm(documents, position=0):
-    question = doc['question']
-    text = doc['text']
-    vector = model.encode(question + ' ' + text)
-    vectors.append(vector)
-vectors = np.array(vectors)
 
-vindex = VectorSearch(keyword_fields=['course'])
-vindex.fit(vectors, documents)
+@lru_cache(maxsize=None)
+def _encoder():
+    from sentence_transformers import SentenceTransformer
+
+    return sentence_transformer_encoder(SentenceTransformer(model_name))
+
+
+def encode(texts):
+    return _encoder()(texts)
+
+
+def embedding_store():
+    """
+    Embeddings are persisted by text hash, only texts never seen before are encoded
+    (in one batched call), every other run reads them from the memory-mapped store
+    """
+    return get_embedding_store(model_name)
+
+
+@lru_cache(maxsize=None)
+def build(approximate=False):
+    """
+    Exact minsearch.VectorSearch index, the retrieval the evaluation scores.
+    `approximate=True` fits an IVF-flat index with the same fit/search api instead, faster
+    but its recall is part of the result, see llmzmcp.benchmarks.ann_recall
+    """
+    documents = load_eval_documents()
+    vectors = embedding_store().get_many(
+        [doc['question'] + ' ' + doc['text'] for doc in documents], encode)
+
+    if approximate:
+        vindex = IVFVectorSearch(keyword_fields=['course'], nprobe=8)
+    else:
+        from minsearch import VectorSearch
+
+        vindex = VectorSearch(keyword_fields=['course'])
+    return vindex.fit(vectors, documents)
+
+
+def warm():
+    build()
+    doc_idx()
+    get_encoding()  # Token counts of the prompt context
 
 
 ###########################################################################################
@@ -51,7 +84,7 @@ def minsearch_vector_search(vector, course):
     """
     Returns top 5 results similar to input vector
     """
-    return vindex.search(
+    return build().search(
         vector,
         filter_dict={'course': course},
         num_results=5
@@ -61,7 +94,7 @@ def question_text_vector(q):
     question = q['question']
     course = q['course']
 
-    v_q = model.encode(question)
+    v_q = embedding_store().get(question, encode)
 
     return minsearch_vector_search(v_q, course)
 
@@ -80,22 +113,15 @@ CONTEXT:
 {context}
 """.strip()
 
-    context = ""
-    
-    for doc in search_results:
-        context = context + f"section: {doc['section']}\nquestion: {doc['question']}\nanswer: {doc['text']}\n\n"
-    
+    # Same token budget as the module1 prompts, see `pack_context`
+    context = pack_context(search_results).text
+
     prompt = prompt_template.format(question=query, context=context).strip()
     return prompt
 
 
 def llm(prompt, model='gpt-4o'):
-    response = client.chat.completions.create(
-        model=model,
-        messages=[{"role": "user", "content": prompt}]
-    )
-    
-    return response.choices[0].message.content
+    return chat_completion([{"role": "user", "content": prompt}], model=model)
 
 
 def rag(query: dict, model='gpt-4o') -> str:
@@ -115,7 +141,7 @@ def process_record(rec, model='gpt-3.5-turbo'):
     answer_llm = rag(rec, model=model)
     
     doc_id = rec['document']
-    original_doc = doc_idx[doc_id]
+    original_doc = doc_idx()[doc_id]
     answer_orig = original_doc['text']
 
     # The llm and original answer can be compared using cosine similarity
@@ -133,7 +159,8 @@ def process_record(rec, model='gpt-3.5-turbo'):
 # `process_record()` to compare multiple models
 ###########################################################################################
 # Select only 10 samples to minimize api costs
-# ground_truth_list = ground_truth[:10].to_dict(orient="records")
+# from llmzmcp.data import load_ground_truth_questions
+# ground_truth_list = load_ground_truth_questions()[:10].to_dict(orient="records")
 # results_gpt35 = multithread_func(ground_truth_list, process_record)
 # df_gpt35 = pd.DataFrame(results_gpt35)
 # df_gpt35.to_csv("gpt-3.5-turbo.csv", index=False)
@@ -150,17 +177,25 @@ def compute_cosine_similarity(record):
     answer_orig = record['answer_orig']
     answer_llm = record['answer_llm']
     
-    v_llm = model.encode(answer_llm)
-    v_orig = model.encode(answer_orig)
+    v_llm, v_orig = embedding_store().get_many([answer_llm, answer_orig], encode)
     
     return v_llm.dot(v_orig)
 
 
 if __name__=="__main__":
-    # Load the completed results for the 3 models provided by datatalks
-    gpt4o_mini = load_llm_eval_dataframes("gpt4o-mini")
-    gpt4o = load_llm_eval_dataframes("gpt4o")
-    gpt35 = load_llm_eval_dataframes("gpt35")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    # Load the completed results for the 3 models provided by datatalks.
+    # Only the two answer columns are needed for the cosine similarity
+    answer_cols = ["answer_llm", "answer_orig"]
+    gpt4o_mini = load_llm_eval_dataframes("gpt4o-mini", columns=answer_cols, columnar=True)
+    gpt4o = load_llm_eval_dataframes("gpt4o", columns=answer_cols, columnar=True)
+    gpt35 = load_llm_eval_dataframes("gpt35", columns=answer_cols, columnar=True)
+
+    # Embed every answer in one batched pass, the per-record scorer then only hits the store
+    for df in [gpt4o_mini, gpt4o, gpt35]:
+        embedding_store().get_many(df.answer_llm.tolist() + df.answer_orig.tolist(), encode)
 
     # Compute the cosine similarity
     cos_sim_gpt4o_mini = multithread_func(gpt4o_mini.to_dict(orient="records"),compute_cosine_similarity)
@@ -8,19 +8,14 @@ import pandas as pd
 from tqdm import tqdm
 
 from llmzmcp.data import load_llm_eval_dataframes
-from llmzmcp.shared import oaiclient as client
+from llmzmcp.shared import chat_completion
 
 # Load the dataframe of the LLM answers generated via api calls on the ground truth questions
 gpt_4o_mini = load_llm_eval_dataframes("gpt4o-mini")
 
 
 def llm(prompt, model='gpt-4o-mini'):
-    response = client.chat.completions.create(
-        model=model,
-        messages=[{"role": "user", "content": prompt}]
-    )
-    
-    return response.choices[0].message.content
+    return chat_completion([{"role": "user", "content": prompt}], model=model)
 
 
 ###########################################################################################
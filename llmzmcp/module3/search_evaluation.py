@@ -1,21 +1,18 @@
 """
 Show how to evaluate MinSearch vs. ElasticSearch retrieval performance 
 on the ground truth dataset.
+Importing the module has no side effects, `build()` syncs the elasticsearch index and
+`warm()` fits the in-memory indexes, which are otherwise fitted on first use.
 """
 
 import json
-
-import minsearch
-import numpy as np
-from tqdm import tqdm
+from functools import lru_cache
 
 from llmzmcp.data import load_eval_documents, load_ground_truth_questions
-from llmzmcp.module3.functions import evaluate_search
-from llmzmcp.shared import esclient as es_client
-
-# Load the eval documents that contain the document id
-documents = load_eval_documents()
-ground_truth = load_ground_truth_questions().to_dict(orient="records")
+from llmzmcp.module3.functions import (elastic_msearch_queries, evaluate_search,
+                                       evaluate_search_batch)
+from llmzmcp.search import BM25Index, TextSearch
+from llmzmcp.shared import get_es_client, sync_elasticsearch
 
 ###########################################################################################
 # Define the ES index settings, similar to a SQL db table schema
@@ -37,32 +34,57 @@ index_settings = {
 }
 index_name = "course-questions-with-ids"     # DB Name
 
-# Create the index if it doesn't exist
-if not es_client.indices.exists(index=index_name):
-    print(f"Creating index: {index_name}")
-    # es_client.indices.delete(index=index_name, ignore_unavailable=True) # Delete old index if you need to recreate
-    es_client.indices.create(index=index_name, body=index_settings)
 
-    ###########################################################################################
-    # Insert entries/documents into the index
-    ###########################################################################################
-    print("Populating index...")
-    for doc in tqdm(documents, position=0):
-        es_client.index(index=index_name, document=doc)
-else:
-    print(f"Index '{index_name}' already exists. Skipping creation and population.")
 
+def build(es_client=None):
+    """
+    Create the index if it doesn't exist and sync it with the documents, the `id` field of
+    every document is its `_id`. Drop the index to rebuild it, e.g. after changing the
+    mappings. Returns the `SyncPlan`.
+    """
+    # Load the eval documents that contain the document id
+    return sync_elasticsearch(es_client or get_es_client(), index_name, index_settings,
+                              load_eval_documents())
 
 
 ###########################################################################################
 # Define the index properties for minsearch
 ###########################################################################################
-index = minsearch.Index(
-    text_fields=["question", "text", "section"],
-    keyword_fields=["course", "id"]
-)
+@lru_cache(maxsize=None)
+def minsearch_index():
+    import minsearch
+
+    index = minsearch.Index(
+        text_fields=["question", "text", "section"],
+        keyword_fields=["course", "id"]
+    )
+    index.fit(load_eval_documents())
+    return index
+
+
+@lru_cache(maxsize=None)
+def bm25_index():
+    """
+    Same fields with the in-process BM25 engine
+    """
+    return BM25Index(
+        text_fields=["question", "text", "section"],
+        keyword_fields=["course", "id"]
+    ).fit(load_eval_documents())
+
+
+@lru_cache(maxsize=None)
+def tfidf_index():
+    """
+    TF-IDF index that scores the whole ground truth with a few sparse matrix products
+    """
+    return TextSearch(text_fields=["question", "text", "section"]).fit(load_eval_documents())
 
-index.fit(documents)
+
+def warm():
+    minsearch_index()
+    bm25_index()
+    tfidf_index()
 
 
 ###########################################################################################
@@ -93,7 +115,7 @@ def elastic_search_query(query, course:str="data-engineering-zoomcamp"):
         }
     }
 
-    response = es_client.search(index=index_name, body=search_query)
+    response = get_es_client().search(index=index_name, body=search_query)
     
     result_docs = []
     
@@ -102,10 +124,10 @@ def elastic_search_query(query, course:str="data-engineering-zoomcamp"):
     
     return result_docs
 
-def minsearch_query(query:str, course:str='data-engineering-zoomcamp'):
+def minsearch_query(query:str, course:str='data-engineering-zoomcamp', search_index=None):
     boost = {'question': 3.0, 'section': 0.5}
 
-    results = index.search(
+    results = (search_index or minsearch_index()).search(
         query=query,
         filter_dict={'course': course},
         boost_dict=boost,
@@ -115,9 +137,29 @@ def minsearch_query(query:str, course:str='data-engineering-zoomcamp'):
     return results
 
 
-# Evaluate both search functions
-es_res = evaluate_search(ground_truth, lambda q: elastic_search_query(q['question'], q['course']))
-ms_res = evaluate_search(ground_truth, lambda q: minsearch_query(q['question'], q['course']))
+if __name__ == "__main__":
+    build()
+    warm()
+    ground_truth = load_ground_truth_questions().to_dict(orient="records")
+
+    # Evaluate both search functions
+    # Elastic search queries are sent as `_msearch` batches instead of one request per question
+    es_res = evaluate_search_batch(
+        ground_truth,
+        lambda batch: elastic_msearch_queries(index_name, [q['question'] for q in batch],
+                                              [q['course'] for q in batch])
+    )
+    ms_res = evaluate_search(ground_truth, lambda q: minsearch_query(q['question'], q['course']))
+    bm25_res = evaluate_search(ground_truth, lambda q: minsearch_query(q['question'], q['course'],
+                                                                      search_index=bm25_index()))
+    tfidf_res = evaluate_search_batch(
+        ground_truth,
+        lambda batch: tfidf_index().search_many([q['question'] for q in batch],
+                                                courses=[q['course'] for q in batch],
+                                                n_results=5, boost={'question': 3.0, 'section': 0.5})
+    )
 
-print("\n\n","Elastic search results:\n", json.dumps(es_res, indent=2))
-print("\n\n","Min. search results:\n", json.dumps(ms_res, indent=2))
\ No newline at end of file
+    print("\n\n","Elastic search results:\n", json.dumps(es_res, indent=2))
+    print("\n\n","Min. search results:\n", json.dumps(ms_res, indent=2))
+    print("\n\n","BM25 search results:\n", json.dumps(bm25_res, indent=2))
+    print("\n\n","Batched TF-IDF search results:\n", json.dumps(tfidf_res, indent=2))
@@ -0,0 +1,15 @@
+"""
+In-process search engines over the FAQ documents, no external service required.
+- BM25Index - sparse keyword search on inverted posting lists, drop-in for `minsearch.Index`
+- TextSearch - TF-IDF search over several fields with a batched `search_many`
+- IVFVectorSearch - approximate dense vector search (IVF-flat), drop-in for `minsearch.VectorSearch`
+- QuantizedVectorSearch - dense search over int8/binary codes with exact rescoring
+- HybridSearch - BM25 + dense fusion (rerank, rrf, linear) sharing one query embedding
+- KeywordIndex - precomputed row sets per keyword value used by the indexes to filter
+"""
+from llmzmcp.search.filters import *
+from llmzmcp.search.bm25 import *
+from llmzmcp.search.text_search import *
+from llmzmcp.search.ann import *
+from llmzmcp.search.quantized import *
+from llmzmcp.search.hybrid import *
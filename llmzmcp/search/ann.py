@@ -0,0 +1,170 @@
+"""
+Approximate nearest neighbour search with an inverted file index (IVF-flat) in NumPy.
+The vectors are clustered with spherical k-means and stored grouped by cluster, a query only scans
+the `nprobe` clusters whose centroids score highest. Same interface as
+`minsearch.VectorSearch` (inner product scoring):
+    index = IVFVectorSearch(keyword_fields=["course"], nprobe=8)
+    index.fit(vectors, documents)
+    index.search(vector, filter_dict={"course": ...}, num_results=5)
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from llmzmcp.search.filters import KeywordIndex
+
+
+def _unit(vectors):
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12)
+
+
+def kmeans(vectors, n_clusters, n_iter=20, seed=42):
+    """
+    Spherical k-means (Lloyd's with k-means++ style seeding) under the inner product,
+    returns (n_clusters, dim) unit length centroids. A vector goes to the centroid with
+    the largest inner product, the rule `IVFVectorSearch` uses to fill and probe its
+    lists, whether or not the vectors are normalized.
+    """
+    rng = np.random.default_rng(seed)
+    unit = _unit(vectors)
+    n = len(unit)
+    centroids = np.empty((n_clusters, unit.shape[1]), dtype=np.float32)
+    centroids[0] = unit[rng.integers(n)]
+    closest = np.maximum(1 - unit @ centroids[0], 0)  # cosine distance
+    for i in range(1, n_clusters):
+        probs = closest / closest.sum() if closest.sum() > 0 else None
+        centroids[i] = unit[rng.choice(n, p=probs)]
+        closest = np.minimum(closest, np.maximum(1 - unit @ centroids[i], 0))
+
+    for _ in range(n_iter):
+        assign = (unit @ centroids.T).argmax(axis=1)
+        counts = np.bincount(assign, minlength=n_clusters)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, unit)
+        nonempty = counts > 0
+        updated = _unit(sums[nonempty])
+        if np.allclose(updated, centroids[nonempty]):
+            break
+        centroids[nonempty] = updated
+    return centroids
+
+
+def _npz_path(path):
+    # np.savez appends the suffix, np.load doesn't
+    path = Path(path)
+    return path if path.suffix == ".npz" else path.with_name(path.name + ".npz")
+
+
+class IVFVectorSearch:
+    """
+    `n_lists` clusters (default sqrt(n)) and `nprobe` clusters scanned per query trade
+    recall for latency, `nprobe=n_lists` is an exact search. Filters that leave fewer
+    rows than `exact_threshold` are answered with an exact scan of those rows.
+    """
+
+    def __init__(self, keyword_fields, n_lists=None, nprobe=8, n_iter=20,
+                 exact_threshold=256, seed=42):
+        self.keyword_fields = keyword_fields
+        self.n_lists = n_lists
+        self.nprobe = nprobe
+        self.n_iter = n_iter
+        self.exact_threshold = exact_threshold
+        self.seed = seed
+        self.keyword_index = KeywordIndex(keyword_fields)
+
+    def fit(self, vectors, documents):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.docs = list(documents)
+        n_lists = self.n_lists or max(1, int(np.sqrt(len(vectors))))
+        n_lists = min(n_lists, len(vectors))
+
+        self.centroids = kmeans(vectors, n_lists, self.n_iter, self.seed)
+        assign = (vectors @ self.centroids.T).argmax(axis=1)
+        self._build(vectors, assign)
+        return self
+
+    def _build(self, vectors, assign):
+        # Store the vectors grouped by list so a probe reads one contiguous block
+        order = np.argsort(assign, kind="stable")
+        self.list_rows = order.astype(np.int32)
+        self.list_vectors = vectors[order]
+        self.list_ptr = np.zeros(len(self.centroids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assign, minlength=len(self.centroids)), out=self.list_ptr[1:])
+        # Position of every original row inside list_vectors, for exact filtered scans
+        self.row_pos = np.empty(len(order), dtype=np.int64)
+        self.row_pos[order] = np.arange(len(order))
+        self.keyword_index.fit(self.docs)
+
+    def _top(self, rows, scores, num_results):
+        if len(scores) > num_results:
+            top = np.argpartition(-scores, num_results - 1)[:num_results]
+            rows, scores = rows[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return rows[order], scores[order]
+
+    def search_rows(self, vector, filter_dict={}, num_results=10, nprobe=None):
+        """
+        Return `(rows, scores)` of the approximate top matches, best first
+        """
+        vector = np.asarray(vector, dtype=np.float32)
+        if num_results <= 0:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+
+        candidates = self.keyword_index.rows_for(filter_dict)
+        if candidates is not None and len(candidates) <= self.exact_threshold:
+            positions = self.row_pos[candidates]
+            return self._top(candidates, self.list_vectors[positions] @ vector, num_results)
+
+        allowed = None if candidates is None else self.keyword_index.mask(filter_dict)
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        list_order = np.argsort(-(self.centroids @ vector))
+
+        while True:
+            rows, scores = [], []
+            for lst in list_order[:nprobe]:
+                start, end = self.list_ptr[lst], self.list_ptr[lst + 1]
+                list_rows = self.list_rows[start:end]
+                block = self.list_vectors[start:end]
+                if allowed is not None:
+                    keep = allowed[list_rows]
+                    list_rows, block = list_rows[keep], block[keep]
+                rows.append(list_rows)
+                scores.append(block @ vector)
+            rows, scores = np.concatenate(rows), np.concatenate(scores)
+            # A selective filter can empty the probed lists, widen the probe until k are found
+            if len(rows) >= num_results or nprobe >= len(self.centroids):
+                break
+            nprobe = min(nprobe * 2, len(self.centroids))
+
+        return self._top(rows, scores, num_results)
+
+    def search(self, vector, filter_dict={}, num_results=10, nprobe=None):
+        rows, _ = self.search_rows(vector, filter_dict, num_results, nprobe)
+        return [self.docs[i] for i in rows]
+
+    def save(self, path):
+        np.savez(_npz_path(path), centroids=self.centroids, list_rows=self.list_rows,
+                 list_vectors=self.list_vectors, list_ptr=self.list_ptr,
+                 docs=np.array(json.dumps(self.docs)),
+                 params=np.array(json.dumps({
+                     "keyword_fields": list(self.keyword_fields), "nprobe": self.nprobe,
+                     "n_iter": self.n_iter, "exact_threshold": self.exact_threshold,
+                     "seed": self.seed,
+                 })))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(_npz_path(path)) as data:
+            params = json.loads(str(data["params"]))
+            index = cls(n_lists=len(data["centroids"]), **params)
+            index.docs = json.loads(str(data["docs"]))
+            index.centroids = data["centroids"]
+            vectors = np.empty_like(data["list_vectors"])
+            vectors[data["list_rows"]] = data["list_vectors"]
+            assign = np.repeat(np.arange(len(index.centroids)), np.diff(data["list_ptr"]))
+            assign_rows = np.empty_like(assign)
+            assign_rows[data["list_rows"]] = assign
+        index._build(vectors, assign_rows)
+        return index
@@ -0,0 +1,157 @@
+"""
+In-memory BM25 index with the same interface as `minsearch.Index`. Every text field gets
+an inverted index stored as CSR arrays (term -> posting list of document rows) with the
+BM25 weight of each posting precomputed at fit time, so a query only touches the postings
+of its own terms instead of scoring the whole corpus.
+"""
+
+import re
+from collections import Counter
+
+import numpy as np
+
+from llmzmcp.search.filters import KeywordIndex
+
+
+class BM25Index:
+    """
+    Drop-in replacement for `minsearch.Index`:
+        index = BM25Index(text_fields=["question", "text", "section"], keyword_fields=["course"])
+        index.fit(documents)
+        index.search(query, filter_dict={"course": ...}, boost_dict={"question": 3.0}, num_results=5)
+    """
+
+    def __init__(self, text_fields, keyword_fields, k1=1.2, b=0.75,
+                 token_pattern=r"(?u)\b\w\w+\b", stop_words=None):
+        self.text_fields = text_fields
+        self.keyword_fields = keyword_fields
+        self.k1 = k1
+        self.b = b
+        self.token_re = re.compile(token_pattern)
+        self.stop_words = frozenset(stop_words or ())
+
+        self.docs = []
+        self.vocab = {}        # field -> {term: term id}
+        self.postings = {}     # field -> (indptr, rows, weights)
+        self.keyword_index = KeywordIndex(keyword_fields)
+
+    def tokenize(self, text):
+        tokens = self.token_re.findall(str(text).lower())
+        if self.stop_words:
+            tokens = [t for t in tokens if t not in self.stop_words]
+        return tokens
+
+    def _fit_field(self, field):
+        vocab = {}
+        term_ids, rows, tfs = [], [], []
+        doc_len = np.zeros(len(self.docs), dtype=np.float32)
+
+        for row, doc in enumerate(self.docs):
+            tokens = self.tokenize(doc.get(field) or "")
+            doc_len[row] = len(tokens)
+            for term, tf in Counter(tokens).items():
+                term_ids.append(vocab.setdefault(term, len(vocab)))
+                rows.append(row)
+                tfs.append(tf)
+
+        term_ids = np.asarray(term_ids, dtype=np.int64)
+        rows = np.asarray(rows, dtype=np.int32)
+        tfs = np.asarray(tfs, dtype=np.float32)
+
+        # Group postings by term -> CSR layout, rows stay sorted inside each list
+        order = np.argsort(term_ids, kind="stable")
+        term_ids, rows, tfs = term_ids[order], rows[order], tfs[order]
+        doc_freq = np.bincount(term_ids, minlength=len(vocab))
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(doc_freq, out=indptr[1:])
+
+        n_docs = len(self.docs)
+        idf = np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+        avgdl = max(float(doc_len.mean()) if n_docs else 0.0, 1.0)
+        norm = self.k1 * (1 - self.b + self.b * doc_len[rows] / avgdl)
+        weights = idf[term_ids] * tfs * (self.k1 + 1) / (tfs + norm)
+
+        self.vocab[field] = vocab
+        self.postings[field] = (indptr, rows, weights.astype(np.float32))
+
+    def fit(self, docs):
+        self.docs = list(docs)
+        for field in self.text_fields:
+            self._fit_field(field)
+
+        self.keyword_index.fit(self.docs)
+        return self
+
+    def search_rows(self, query, filter_dict={}, boost_dict={}, num_results=10):
+        """
+        Return `(rows, scores)` of the top matching documents, best first.
+        Only documents with a positive score are returned. `filter_dict` accepts the
+        specs of `KeywordIndex` (equality, lists for IN, `$or`/`$and`).
+        """
+        allowed = self.keyword_index.mask(filter_dict)
+        query_terms = Counter(self.tokenize(query))
+
+        matched_rows, contributions = [], []
+        for field in self.text_fields:
+            boost = boost_dict.get(field, 1.0)
+            if boost == 0:
+                continue
+            vocab = self.vocab[field]
+            indptr, rows, weights = self.postings[field]
+            for term, qtf in query_terms.items():
+                term_id = vocab.get(term)
+                if term_id is None:
+                    continue
+                start, end = indptr[term_id], indptr[term_id + 1]
+                posting_rows, posting_weights = rows[start:end], weights[start:end]
+                if allowed is not None:
+                    keep = allowed[posting_rows]
+                    posting_rows, posting_weights = posting_rows[keep], posting_weights[keep]
+                matched_rows.append(posting_rows)
+                contributions.append(posting_weights * (boost * qtf))
+
+        if not matched_rows or num_results <= 0:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+
+        # Accumulate per candidate, cost is proportional to the number of postings touched
+        candidates, inverse = np.unique(np.concatenate(matched_rows), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(contributions))
+
+        positive = scores > 0
+        candidates, scores = candidates[positive], scores[positive]
+        if len(scores) > num_results:
+            top = np.argpartition(-scores, num_results - 1)[:num_results]
+            candidates, scores = candidates[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return candidates[order], scores[order]
+
+    def score_rows(self, query, rows, boost_dict={}):
+        """
+        BM25 scores of the given document rows only, e.g. to rerank candidates
+        from another retriever. Posting lists are sorted so each lookup is a binary search.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        scores = np.zeros(len(rows), dtype=np.float64)
+        if len(rows) == 0:
+            return scores
+
+        for field in self.text_fields:
+            boost = boost_dict.get(field, 1.0)
+            if boost == 0:
+                continue
+            vocab = self.vocab[field]
+            indptr, posting_rows, weights = self.postings[field]
+            for term, qtf in Counter(self.tokenize(query)).items():
+                term_id = vocab.get(term)
+                if term_id is None:
+                    continue
+                start, end = indptr[term_id], indptr[term_id + 1]
+                pos = np.searchsorted(posting_rows[start:end], rows)
+                found = pos < end - start
+                found[found] = posting_rows[start + pos[found]] == rows[found]
+                scores[found] += weights[start + pos[found]] * (boost * qtf)
+        return scores
+
+    def search(self, query, filter_dict={}, boost_dict={}, num_results=10):
+        rows, _ = self.search_rows(query, filter_dict, boost_dict, num_results)
+        return [self.docs[i] for i in rows]
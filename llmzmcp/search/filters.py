@@ -0,0 +1,97 @@
+"""
+Precomputed keyword filters for the in-memory indexes. At fit time every value of a
+keyword field is mapped to the sorted array of rows holding it, so a filter resolves to
+a candidate row set with a few set operations instead of a pandas comparison per query.
+
+Filter specs:
+    {"course": "mlops-zoomcamp"}                     equality
+    {"course": ["mlops-zoomcamp", "llm-zoomcamp"]}   IN (any of the values)
+    {"course": "mlops-zoomcamp", "id": "a1b2c3d4"}   AND across fields
+    {"$or": [{"course": "..."}, {"id": "..."}]}      OR of sub-specs
+    {"$and": [{...}, {...}]}                         AND of sub-specs
+"""
+
+import numpy as np
+
+from llmzmcp.utils import TTLCache
+
+
+class KeywordIndex:
+
+    def __init__(self, keyword_fields, mask_cache_size=64):
+        self.keyword_fields = list(keyword_fields)
+        self.rows = {}  # field -> {value: sorted int32 row ids}
+        self.n_rows = 0
+        self._masks = TTLCache(maxsize=mask_cache_size)
+
+    def fit(self, records):
+        records = list(records)
+        self.n_rows = len(records)
+        self._masks.clear()
+
+        for field in self.keyword_fields:
+            values = np.array([str(rec.get(field)) for rec in records], dtype=object)
+            order = np.argsort(values, kind="stable")
+            uniques, starts = np.unique(values[order], return_index=True)
+            bounds = list(starts) + [len(order)]
+            # Rows of a value are a contiguous, already sorted slice of the stable argsort
+            self.rows[field] = {
+                value: order[bounds[i]:bounds[i + 1]].astype(np.int32)
+                for i, value in enumerate(uniques)
+            }
+        return self
+
+    def _field_rows(self, field, value):
+        values = value if isinstance(value, (list, tuple, set, frozenset)) else [value]
+        parts = [self.rows[field].get(str(v)) for v in values]
+        parts = [p for p in parts if p is not None]
+        if not parts:
+            return np.empty(0, dtype=np.int32)
+        return parts[0] if len(parts) == 1 else np.unique(np.concatenate(parts))
+
+    def rows_for(self, filter_dict):
+        """
+        Sorted array of the rows matching the filter, or None when nothing is filtered.
+        Fields that aren't keyword fields are ignored, as in minsearch.
+        """
+        result = None
+        for key, value in filter_dict.items():
+            if key == "$or":
+                parts = [self.rows_for(spec) for spec in value]
+                if any(p is None for p in parts):
+                    rows = None  # One branch matches everything
+                else:
+                    rows = np.unique(np.concatenate(parts)) if parts else np.empty(0, np.int32)
+            elif key == "$and":
+                rows = None
+                for spec in value:
+                    sub = self.rows_for(spec)
+                    if sub is not None:
+                        rows = sub if rows is None else np.intersect1d(rows, sub, assume_unique=True)
+            elif key in self.rows:
+                rows = self._field_rows(key, value)
+            else:
+                continue
+
+            if rows is not None:
+                result = rows if result is None else np.intersect1d(result, rows, assume_unique=True)
+        return result
+
+    def mask(self, filter_dict):
+        """
+        Boolean row mask of the filter (None when nothing is filtered). Masks of recently
+        used filters are cached, so repeated filters like the same course cost a lookup.
+        """
+        if not filter_dict:
+            return None
+        key = repr(sorted(filter_dict.items(), key=lambda kv: kv[0]))
+
+        def build():
+            rows = self.rows_for(filter_dict)
+            if rows is None:
+                return None
+            mask = np.zeros(self.n_rows, dtype=bool)
+            mask[rows] = True
+            return mask
+
+        return self._masks.get_or_load(key, build)
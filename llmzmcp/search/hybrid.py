@@ -0,0 +1,75 @@
+"""
+In-process hybrid retrieval that combines a BM25 index with a dense vector index over the
+same documents, mirroring the Qdrant queries in `module2/hybrid_search.py` without a server:
+- rerank - dense prefetch of `10 * limit` candidates reranked by their BM25 score
+- rrf    - reciprocal rank fusion of `5 * limit` dense and `5 * limit` BM25 candidates
+- linear - weighted sum of the min-max normalized dense and BM25 scores of those candidates
+The query is embedded once per request and that vector is shared by every stage.
+"""
+
+import numpy as np
+
+HYBRID_MODES = ("rerank", "rrf", "linear")
+
+
+def _min_max(scores):
+    if len(scores) == 0:
+        return scores
+    low, high = scores.min(), scores.max()
+    return np.ones_like(scores) if high == low else (scores - low) / (high - low)
+
+
+class HybridSearch:
+    """
+    `sparse_index` is a fitted `BM25Index`, `dense_index` any fitted dense index with
+    `search_rows(vector, filter_dict, num_results)` (QuantizedVectorSearch, IVFVectorSearch)
+    built over the same documents in the same order. `encode_query(text)` returns the
+    query vector.
+    """
+
+    def __init__(self, sparse_index, dense_index, encode_query, boost_dict={}):
+        self.sparse_index = sparse_index
+        self.dense_index = dense_index
+        self.encode_query = encode_query
+        self.boost_dict = boost_dict
+        self.docs = sparse_index.docs
+
+    def search_rows(self, query, limit=1, mode="rrf", filter_dict={}, vector=None,
+                    rrf_k=60, alpha=0.5):
+        """
+        Return `(rows, scores)` best first. Pass `vector` to reuse a query embedding
+        computed elsewhere. `alpha` weights the dense score in linear mode.
+        """
+        assert mode in HYBRID_MODES, f"mode must be one of {HYBRID_MODES}"
+        if vector is None:
+            vector = self.encode_query(query)
+
+        if mode == "rerank":
+            dense_rows, dense_scores = self.dense_index.search_rows(vector, filter_dict, 10 * limit)
+            sparse_scores = self.sparse_index.score_rows(query, dense_rows, self.boost_dict)
+            # Sort by BM25, candidates without any term match keep their dense order
+            order = np.lexsort((-dense_scores, -sparse_scores))[:limit]
+            return dense_rows[order], sparse_scores[order]
+
+        dense_rows, dense_scores = self.dense_index.search_rows(vector, filter_dict, 5 * limit)
+        sparse_rows, sparse_scores = self.sparse_index.search_rows(
+            query, filter_dict, self.boost_dict, 5 * limit)
+
+        fused = {}
+        if mode == "rrf":
+            for rows in (dense_rows, sparse_rows):
+                for rank, row in enumerate(rows.tolist()):
+                    fused[row] = fused.get(row, 0.0) + 1.0 / (rrf_k + rank + 1)
+        else:
+            for rows, scores, weight in ((dense_rows, _min_max(dense_scores), alpha),
+                                         (sparse_rows, _min_max(sparse_scores), 1 - alpha)):
+                for row, score in zip(rows.tolist(), scores.tolist()):
+                    fused[row] = fused.get(row, 0.0) + weight * score
+
+        best = sorted(fused.items(), key=lambda item: -item[1])[:limit]
+        return (np.array([row for row, _ in best], dtype=np.int64),
+                np.array([score for _, score in best], dtype=np.float64))
+
+    def search(self, query, limit=1, mode="rrf", filter_dict={}, vector=None, **kwargs):
+        rows, _ = self.search_rows(query, limit, mode, filter_dict, vector, **kwargs)
+        return [self.docs[i] for i in rows]
@@ -0,0 +1,136 @@
+"""
+Dense vector search over compressed codes with exact rescoring. The full precision vectors
+are written once to a `.npy` file and opened as a read-only memory map, the scan runs over
+the in-memory codes only:
+- int8   - symmetric per-dimension scalar quantization, 4x smaller than float32
+- binary - one sign bit per dimension scored by hamming distance, 32x smaller
+The `num_results * oversample` best candidates by code are then rescored with the original
+vectors, so only that shortlist is read from the memory map.
+"""
+
+import hashlib
+from pathlib import Path
+
+import numpy as np
+
+from llmzmcp.search.filters import KeywordIndex
+from llmzmcp.utils import get_cache_dir
+
+QUANTIZATIONS = (None, "int8", "binary")
+
+
+def _popcount(x):
+    """
+    Set bits of every byte, same shape as `x`
+    """
+    if hasattr(np, "bitwise_count"):  # numpy >= 2.0
+        return np.bitwise_count(x)
+    return np.unpackbits(x[..., None], axis=-1).sum(axis=-1, dtype=np.uint8)
+
+
+class QuantizedVectorSearch:
+    """
+    Same fit/search api as `minsearch.VectorSearch` (inner product scoring).
+    `quantization=None` scans the memory-mapped float32 vectors exactly.
+    Without `mmap_path` the vectors go to `<cache>/vectors/<content digest>.npy`, refits of
+    the same vectors reuse the file. Nothing deletes these files, clear the directory to
+    reclaim the space of vectors that are no longer indexed.
+    """
+
+    def __init__(self, keyword_fields, quantization="int8", oversample=4, mmap_path=None,
+                 block_size=4096):
+        assert quantization in QUANTIZATIONS, f"quantization must be one of {QUANTIZATIONS}"
+        self.keyword_fields = keyword_fields
+        self.quantization = quantization
+        self.oversample = oversample
+        self.mmap_path = mmap_path
+        self.block_size = block_size
+        self.keyword_index = KeywordIndex(keyword_fields)
+
+    def fit(self, vectors, documents):
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.docs = list(documents)
+        self.dim = vectors.shape[1]
+
+        path = self.mmap_path
+        if path is not None:
+            path = Path(path)
+            # np.save appends the suffix, np.load doesn't
+            if path.suffix != ".npy":
+                path = path.with_name(path.name + ".npy")
+        else:
+            digest = hashlib.blake2b(vectors.tobytes(), digest_size=16).hexdigest()
+            directory = get_cache_dir() / "vectors"
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / f"{digest}.npy"
+        if self.mmap_path is not None or not path.exists():
+            np.save(path, vectors)
+        self.vectors = np.load(path, mmap_mode="r")
+
+        if self.quantization == "int8":
+            self.scale = np.maximum(np.abs(vectors).max(axis=0), 1e-12) / 127
+            self.codes = np.clip(np.rint(vectors / self.scale), -127, 127).astype(np.int8)
+        elif self.quantization == "binary":
+            self.codes = np.packbits(vectors > 0, axis=1)
+        else:
+            self.codes = self.vectors
+
+        self.keyword_index.fit(self.docs)
+        return self
+
+    def memory_usage(self):
+        """
+        Bytes held in memory by the scan codes vs. the float32 vectors they replace
+        """
+        in_memory = 0 if self.quantization is None else self.codes.nbytes
+        return {"codes_bytes": in_memory, "float32_bytes": len(self.docs) * self.dim * 4}
+
+    def _approx_scores(self, codes, vector):
+        if self.quantization == "binary":
+            query_bits = np.packbits(vector > 0)
+            hamming = _popcount(codes ^ query_bits).sum(axis=1, dtype=np.int32)
+            return (self.dim - 2 * hamming).astype(np.float32)
+
+        query = vector * self.scale if self.quantization == "int8" else vector
+        # Blocks bound the temporary float copy of the codes
+        return np.concatenate([
+            codes[start:start + self.block_size].astype(np.float32) @ query
+            for start in range(0, len(codes), self.block_size)
+        ]) if len(codes) else np.empty(0, dtype=np.float32)
+
+    @staticmethod
+    def _top(scores, k):
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        return top[np.argsort(-scores[top], kind="stable")]
+
+    def search_rows(self, vector, filter_dict={}, num_results=10, oversample=None):
+        """
+        Return `(rows, scores)` best first, scores are exact inner products
+        """
+        vector = np.asarray(vector, dtype=np.float32)
+        if num_results <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        rows = self.keyword_index.rows_for(filter_dict)
+        codes = self.codes if rows is None else self.codes[rows]
+        approx = self._approx_scores(codes, vector)
+
+        if self.quantization is None:
+            shortlist = self._top(approx, num_results)
+        else:
+            shortlist = self._top(approx, num_results * (oversample or self.oversample))
+        if rows is not None:
+            shortlist = rows[shortlist]
+
+        # Rescore the shortlist with the full precision vectors from the memory map
+        shortlist = np.sort(shortlist)
+        exact = self.vectors[shortlist] @ vector
+        best = self._top(exact, num_results)
+        return shortlist[best], exact[best]
+
+    def search(self, vector, filter_dict={}, num_results=10, oversample=None):
+        rows, _ = self.search_rows(vector, filter_dict, num_results, oversample)
+        return [self.docs[i] for i in rows]
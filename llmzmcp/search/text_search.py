@@ -0,0 +1,112 @@
+"""
+TF-IDF search over several text fields, packaged from the preworkshop `TextSearch`.
+`search_many` answers a whole batch of queries with one vectorizer transform and one
+sparse matrix-matrix product per field instead of one cosine similarity per query.
+"""
+
+from collections import defaultdict
+
+import numpy as np
+
+from llmzmcp.search.filters import KeywordIndex
+
+
+def top_k_rows(scores, k):
+    """
+    Column indices of the k largest values of every row of a dense (m, n) score
+    matrix, best first
+    """
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1)
+
+
+class TextSearch:
+    """
+    `keyword_fields` get precomputed row sets for filtering (defaults to every
+    non-text column), so filtered queries only score their candidate rows.
+    """
+
+    def __init__(self, text_fields, keyword_fields=None):
+        self.text_fields = text_fields
+        self.keyword_fields = keyword_fields
+        self.matrices = {}
+        self.vectorizers = {}
+
+    def fit(self, records, vectorizer_params={}):
+        import pandas as pd
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.preprocessing import normalize
+
+        self.df = pd.DataFrame(records)
+        self.records = self.df.to_dict(orient='records')
+
+        for f in self.text_fields:
+            cv = TfidfVectorizer(**vectorizer_params)
+            X = cv.fit_transform(self.df[f])
+            # Rows are l2 normalized so a dot product is the cosine similarity
+            self.matrices[f] = normalize(X).tocsr()
+            self.vectorizers[f] = cv
+
+        keyword_fields = self.keyword_fields
+        if keyword_fields is None:
+            keyword_fields = [c for c in self.df.columns if c not in self.text_fields]
+        self.keyword_index = KeywordIndex(keyword_fields).fit(self.records)
+        return self
+
+    def score_many(self, queries, boost={}, rows=None):
+        """
+        Dense (len(queries), len(rows)) matrix of boosted cosine similarities,
+        `rows=None` scores every document
+        """
+        from sklearn.preprocessing import normalize
+
+        n_rows = len(self.df) if rows is None else len(rows)
+        scores = np.zeros((len(queries), n_rows), dtype=np.float64)
+        for f in self.text_fields:
+            b = boost.get(f, 1.0)
+            if b == 0:
+                continue
+            X = self.matrices[f] if rows is None else self.matrices[f][rows]
+            Q = normalize(self.vectorizers[f].transform(queries))
+            scores += b * (Q @ X.T).toarray()
+        return scores
+
+    def search_many(self, queries, courses=None, n_results=10, boost={}, filters={},
+                    course_field='course', batch_size=1024):
+        """
+        Search many queries at once. `courses` optionally restricts every query to its own
+        value of `course_field`, `filters` (a `KeywordIndex` spec) applies to all queries.
+        Returns one list of records per query, in input order.
+        """
+        if courses is not None and course_field not in self.keyword_index.keyword_fields:
+            # rows_for ignores unknown fields, every course would be searched
+            raise ValueError(f"'{course_field}' is not a keyword field of the index")
+        queries = list(queries)
+        results = [[] for _ in queries]
+
+        # Group the queries by course so every group only scores its candidate rows
+        groups = defaultdict(list)
+        for pos in range(len(queries)):
+            groups[None if courses is None else courses[pos]].append(pos)
+
+        for course, positions in groups.items():
+            spec = filters if course is None else {"$and": [filters, {course_field: course}]}
+            rows = self.keyword_index.rows_for(spec)
+            if rows is not None and len(rows) == 0:
+                continue
+
+            for start in range(0, len(positions), batch_size):
+                batch = positions[start:start + batch_size]
+                scores = self.score_many([queries[pos] for pos in batch], boost, rows)
+                for pos, idx in zip(batch, top_k_rows(scores, n_results)):
+                    doc_rows = idx if rows is None else rows[idx]
+                    results[pos] = [self.records[i] for i in doc_rows]
+        return results
+
+    def search(self, query, n_results=10, boost={}, filters={}):
+        return self.search_many([query], n_results=n_results, boost=boost, filters=filters)[0]
@@ -1,2 +1,19 @@
 from llmzmcp.shared.client import *
+from llmzmcp.shared.aio import *
 from llmzmcp.shared.parallel import *
+from llmzmcp.shared.completions import *
+from llmzmcp.shared.context import *
+from llmzmcp.shared.embeddings import *
+from llmzmcp.shared.elastic import *
+from llmzmcp.shared.qdrant_ingest import *
+from llmzmcp.shared.sync import *
+from llmzmcp.shared.vector_artifact import *
+from llmzmcp.shared.payloads import *
+from llmzmcp.shared.qdrant_profiles import *
+from llmzmcp.shared.query_embeddings import *
+
+
+def __getattr__(name):
+    # Lazy client aliases (`oaiclient`, `esclient`, `qdclient`, ...), see shared.client
+    from llmzmcp.shared import client
+    return getattr(client, name)
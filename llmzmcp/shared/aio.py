@@ -0,0 +1,109 @@
+"""
+asyncio building blocks of the async RAG pipelines. Backend calls wait for a slot of
+`limit(name)`, a per event loop semaphore sized by `CONCURRENCY_LIMITS`, so hundreds of
+in-flight questions queue inside the process instead of exhausting the connection pools.
+`with_deadline` bounds one request, `gather_bounded` runs many of them on one loop:
+    answers = await gather_bounded(questions, arag_minsearch, concurrency=256)
+The synchronous entry points are thin wrappers around the coroutines, `run_sync` runs them
+on one background event loop shared by every thread of the process.
+"""
+
+import asyncio
+import concurrent.futures
+import os
+import threading
+import weakref
+
+from llmzmcp.shared.client import CLIENT_SETTINGS
+
+__all__ = ["CONCURRENCY_LIMITS", "RAG_DEADLINE", "limit", "with_deadline", "gather_bounded",
+           "run_sync"]
+
+# Maximum in-flight calls per backend and event loop
+CONCURRENCY_LIMITS = {
+    "openai": int(os.environ.get("LLMZMCP_OPENAI_CONCURRENCY",
+                                 CLIENT_SETTINGS["async_pool_size"])),
+    "elasticsearch": int(os.environ.get("LLMZMCP_ES_CONCURRENCY", "64")),
+    "qdrant": int(os.environ.get("LLMZMCP_QDRANT_CONCURRENCY", "64")),
+}
+
+# Seconds an async RAG request (search + prompt + completion) may take by default, None
+# disables the deadline. The synchronous wrappers don't apply it.
+RAG_DEADLINE = float(os.environ.get("LLMZMCP_RAG_DEADLINE", "60")) or None
+
+_semaphores = weakref.WeakKeyDictionary()  # event loop -> {name: asyncio.Semaphore}
+_semaphores_lock = threading.Lock()
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def limit(name):
+    """
+    Semaphore bounding the in-flight calls to backend `name` on the running loop:
+        async with limit("qdrant"):
+            ...
+    """
+    loop = asyncio.get_running_loop()
+    with _semaphores_lock:
+        semaphores = _semaphores.setdefault(loop, {})
+        if name not in semaphores:
+            semaphores[name] = asyncio.Semaphore(CONCURRENCY_LIMITS[name])
+        return semaphores[name]
+
+
+async def with_deadline(awaitable, deadline=RAG_DEADLINE):
+    """
+    Await with a deadline in seconds (None waits forever). The awaitable is cancelled
+    and `asyncio.TimeoutError` raised when it runs late.
+    """
+    if deadline is None:
+        return await awaitable
+    return await asyncio.wait_for(awaitable, deadline)
+
+
+async def gather_bounded(items, func, concurrency=256, deadline=None, return_exceptions=True):
+    """
+    `await func(item)` for every item with at most `concurrency` in flight, each call with
+    its own `deadline` once it started. Results are in input order, failed or timed out
+    items hold their exception unless `return_exceptions=False`.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(item):
+        async with semaphore:
+            return await with_deadline(func(item), deadline)
+
+    return await asyncio.gather(*(run(item) for item in items),
+                                return_exceptions=return_exceptions)
+
+
+def _background_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="llmzmcp-aio", daemon=True).start()
+        return _loop
+
+
+def run_sync(coro, timeout=None):
+    """
+    Run a coroutine on the shared background event loop and wait for its result. Safe to
+    call from many threads at once (and from notebooks with a running loop), the calls
+    share the loop's async clients and concurrency limits.
+    """
+    loop = _background_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_sync called on the background loop, await the coroutine")
+
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
@@ -1,14 +1,189 @@
-from elasticsearch import Elasticsearch
-from openai import OpenAI
-from qdrant_client import QdrantClient
+"""
+Registry of the backend clients. Nothing is imported or connected when this module is
+loaded, each client is built on first use with pooled, keep-alive connections and then
+shared by every thread of the process (all three client libraries are thread-safe):
+    from llmzmcp.shared import get_qdrant_client
+    client = get_qdrant_client()
+The old module attributes `oaiclient`, `esclient` and `qdclient` still work and resolve to
+the same shared instances, `aoaiclient`, `aesclient` and `aqdclient` are the async twins.
+Async clients can't be shared between event loops, inside a coroutine the async getters
+return the clients of the running loop (built on first use, dropped with the loop).
+
+Hosts, pool sizes and timeouts are read from `CLIENT_SETTINGS` (env overridable).
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+
 from llmzmcp.utils import OPENAI_API_KEY
 
-# Create an open ai client. Ensure the account is funded
-oaiclient = OpenAI(api_key = OPENAI_API_KEY)
+__all__ = [
+    "CLIENT_SETTINGS", "get_client", "get_openai_client", "get_es_client", "get_qdrant_client",
+    "get_async_openai_client", "get_async_es_client", "get_async_qdrant_client",
+    "close_clients", "aclose_clients",
+]
+
+CLIENT_SETTINGS = {
+    "es_url": os.environ.get("LLMZMCP_ES_URL", "http://elasticsearch:9200"),
+    # QdrantClient("http://localhost:6333") # connecting to local Qdrant instance
+    "qdrant_url": os.environ.get("LLMZMCP_QDRANT_URL", "http://qdrant:6333"),  # devcontainer
+    "pool_size": int(os.environ.get("LLMZMCP_POOL_SIZE", "16")),
+    # One event loop multiplexes hundreds of in-flight requests, see shared.aio
+    "async_pool_size": int(os.environ.get("LLMZMCP_ASYNC_POOL_SIZE", "256")),
+    "keepalive_seconds": 30,
+    "timeout_seconds": float(os.environ.get("LLMZMCP_CLIENT_TIMEOUT", "60")),
+    "max_retries": 2,
+}
+
+_clients = {}
+_loop_clients = weakref.WeakKeyDictionary()  # event loop -> {name: async client}
+_lock = threading.Lock()
+
+
+def _pool_size(asynchronous):
+    return CLIENT_SETTINGS["async_pool_size" if asynchronous else "pool_size"]
+
+
+def _httpx_limits(asynchronous=False):
+    import httpx
+
+    return httpx.Limits(max_connections=_pool_size(asynchronous),
+                        max_keepalive_connections=_pool_size(asynchronous),
+                        keepalive_expiry=CLIENT_SETTINGS["keepalive_seconds"])
+
+
+def _openai(asynchronous):
+    import openai
+
+    # Ensure the account is funded
+    if asynchronous:
+        client_cls, http_cls = openai.AsyncOpenAI, openai.DefaultAsyncHttpxClient
+    else:
+        client_cls, http_cls = openai.OpenAI, openai.DefaultHttpxClient
+    return client_cls(api_key=OPENAI_API_KEY, timeout=CLIENT_SETTINGS["timeout_seconds"],
+                      max_retries=CLIENT_SETTINGS["max_retries"],
+                      http_client=http_cls(limits=_httpx_limits(asynchronous)))
+
+
+def _elasticsearch(asynchronous):
+    import elasticsearch
+
+    # AsyncElasticsearch needs the optional aiohttp dependency (`elasticsearch[async]`)
+    client_cls = elasticsearch.AsyncElasticsearch if asynchronous else elasticsearch.Elasticsearch
+    return client_cls(CLIENT_SETTINGS["es_url"],
+                      connections_per_node=_pool_size(asynchronous),
+                      request_timeout=CLIENT_SETTINGS["timeout_seconds"],
+                      max_retries=CLIENT_SETTINGS["max_retries"], retry_on_timeout=True)
+
+
+def _qdrant(asynchronous):
+    import qdrant_client
+
+    client_cls = qdrant_client.AsyncQdrantClient if asynchronous else qdrant_client.QdrantClient
+    # The version check is an extra request on construction, skip it
+    return client_cls(url=CLIENT_SETTINGS["qdrant_url"],
+                      timeout=int(CLIENT_SETTINGS["timeout_seconds"]),
+                      limits=_httpx_limits(asynchronous), check_compatibility=False)
+
+
+_BUILDERS = {
+    "openai": lambda: _openai(False),
+    "elasticsearch": lambda: _elasticsearch(False),
+    "qdrant": lambda: _qdrant(False),
+    "async_openai": lambda: _openai(True),
+    "async_elasticsearch": lambda: _elasticsearch(True),
+    "async_qdrant": lambda: _qdrant(True),
+}
+
+# Module attributes kept for the scripts, resolved lazily by `__getattr__`
+_ALIASES = {
+    "oaiclient": "openai",
+    "esclient": "elasticsearch",
+    "qdclient": "qdrant",
+    "aoaiclient": "async_openai",
+    "aesclient": "async_elasticsearch",
+    "aqdclient": "async_qdrant",
+}
+
+
+def _running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def get_client(name):
+    """
+    Shared client `name` (see `_BUILDERS`), built on first use. Async clients are
+    shared per running event loop.
+    """
+    clients = _clients
+    loop = _running_loop() if name.startswith("async_") else None
+    if loop is not None:
+        with _lock:
+            clients = _loop_clients.setdefault(loop, {})
+
+    client = clients.get(name)
+    if client is None:
+        with _lock:
+            client = clients.get(name)
+            if client is None:
+                client = clients[name] = _BUILDERS[name]()
+    return client
+
+
+def get_openai_client():
+    return get_client("openai")
+
+
+def get_es_client():
+    return get_client("elasticsearch")
+
+
+def get_qdrant_client():
+    return get_client("qdrant")
+
+
+def get_async_openai_client():
+    return get_client("async_openai")
+
+
+def get_async_es_client():
+    return get_client("async_elasticsearch")
+
+
+def get_async_qdrant_client():
+    return get_client("async_qdrant")
+
+
+def close_clients():
+    """
+    Close the synchronous clients built so far and forget every client. Async
+    clients have to be closed on their event loop, see `aclose_clients`.
+    """
+    with _lock:
+        clients = dict(_clients)
+        _clients.clear()
+        _loop_clients.clear()
+    for name, client in clients.items():
+        if not name.startswith("async_"):
+            client.close()
+
+
+async def aclose_clients():
+    """
+    Close and forget the async clients of the running event loop
+    """
+    with _lock:
+        clients = _loop_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.close()
 
-# Create an elastic search client
-esclient = Elasticsearch(hosts=[{"host":"elasticsearch", "port":9200, "scheme":"http"}]) 
 
-# Create a Qdrant client
-# QdrantClient("http://localhost:6333") # connecting to local Qdrant instance
-qdclient = QdrantClient(host="qdrant", port=6333) # devcontainer
\ No newline at end of file
+def __getattr__(name):
+    if name in _ALIASES:
+        return get_client(_ALIASES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
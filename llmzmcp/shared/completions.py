@@ -0,0 +1,222 @@
+import asyncio
+import threading
+import time
+
+from llmzmcp.shared.aio import limit
+from llmzmcp.shared.client import get_async_openai_client, get_openai_client
+from llmzmcp.utils.completion_cache import CompletionCache, completion_key
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_completion_cache():
+    """
+    Process wide completion cache stored in the llmzmcp cache dir
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = CompletionCache()
+    return _default_cache
+
+
+def chat_completion(messages, model='gpt-4o', cache=None, client=None, **params):
+    """
+    Call the chat completions api and return the message content. Identical requests
+    (model, messages and params) are answered from the persistent completion cache,
+    pass `cache=False` to always call the api.
+    """
+    client = client or get_openai_client()
+    if cache is None:
+        cache = get_completion_cache()
+
+    def create():
+        response = client.chat.completions.create(model=model, messages=messages, **params)
+        return response.choices[0].message.content
+
+    if cache is False:
+        return create()
+    return cache.get_or_create(model, messages, create, **params)
+
+
+async def achat_completion(messages, model='gpt-4o', cache=None, client=None, **params):
+    """
+    `chat_completion` on the `AsyncOpenAI` client. Api calls wait for a slot of the
+    "openai" concurrency limit, the sqlite cache is read and written in worker threads so
+    it never blocks the event loop.
+    """
+    client = client or get_async_openai_client()
+    if cache is None:
+        cache = get_completion_cache()
+
+    if cache is not False:
+        key = completion_key(model, messages, **params)
+        content = await asyncio.to_thread(cache.get, key)
+        if content is not None:
+            return content
+
+    async with limit("openai"):
+        response = await client.chat.completions.create(model=model, messages=messages,
+                                                        **params)
+    content = response.choices[0].message.content
+
+    if cache is not False:
+        await asyncio.to_thread(cache.set, key, model, content)
+    return content
+
+
+###########################################################################################
+# Streaming: content deltas as they arrive, with time to first token and total time
+###########################################################################################
+class _StreamRecorder:
+    def __init__(self, model, messages, cache, client, params):
+        self.model = model
+        self.messages = messages
+        self.params = params
+        self.cache = get_completion_cache() if cache is None else cache
+        self.client = client
+        self.key = completion_key(model, messages, **params)
+        self.chunks = []
+        self.cached = False
+        self.done = False
+        self.ttft = self.total_time = None
+        self._started = None
+
+    @property
+    def text(self):
+        """
+        Content received so far, the full answer once `done`
+        """
+        return "".join(self.chunks)
+
+    def _start(self):
+        # A stream closed early starts over when it is iterated again
+        self.chunks, self.ttft, self._started = [], None, time.perf_counter()
+
+    def _record(self, delta):
+        if self.ttft is None:
+            self.ttft = time.perf_counter() - self._started
+        self.chunks.append(delta)
+
+    def _finish(self):
+        self.total_time = time.perf_counter() - self._started
+        self.done = True
+
+    def metrics(self):
+        return {
+            "model": self.model,
+            "cached": self.cached,
+            "ttft_s": None if self.ttft is None else round(self.ttft, 4),
+            "total_s": None if self.total_time is None else round(self.total_time, 4),
+            "chunks": len(self.chunks),
+            "chars": sum(len(c) for c in self.chunks),
+        }
+
+
+class CompletionStream(_StreamRecorder):
+    """
+    Iterate to get the content deltas of a chat completion as they arrive. `text`
+    collects the answer, `ttft` (time to first token) and `total_time` are seconds
+    from the start of the iteration. An answer streamed to the end is stored in the
+    completion cache under the same key as `chat_completion`, a cached answer is
+    replayed as one chunk without calling the api.
+    """
+
+    def __iter__(self):
+        if self.done:
+            yield self.text
+            return
+        self._start()
+
+        if self.cache is not False:
+            content = self.cache.get(self.key)
+            if content is not None:
+                self.cached = True
+                self._record(content)
+                self._finish()
+                yield content
+                return
+
+        client = self.client or get_openai_client()
+        response = client.chat.completions.create(model=self.model, messages=self.messages,
+                                                  stream=True, **self.params)
+        try:
+            for chunk in response:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    self._record(delta)
+                    yield delta
+        finally:
+            response.close()
+        self._finish()
+
+        if self.cache is not False:
+            self.cache.set(self.key, self.model, self.text)
+
+    def collect(self):
+        """
+        Consume the rest of the stream and return the full answer
+        """
+        for _ in self:
+            pass
+        return self.text
+
+
+class AsyncCompletionStream(_StreamRecorder):
+    """
+    `CompletionStream` for `async for` on the AsyncOpenAI client. The stream holds a
+    slot of the "openai" concurrency limit until it is consumed or closed.
+    """
+
+    async def __aiter__(self):
+        if self.done:
+            yield self.text
+            return
+        self._start()
+
+        if self.cache is not False:
+            content = await asyncio.to_thread(self.cache.get, self.key)
+            if content is not None:
+                self.cached = True
+                self._record(content)
+                self._finish()
+                yield content
+                return
+
+        client = self.client or get_async_openai_client()
+        async with limit("openai"):
+            response = await client.chat.completions.create(
+                model=self.model, messages=self.messages, stream=True, **self.params)
+            try:
+                async for chunk in response:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        self._record(delta)
+                        yield delta
+            finally:
+                await response.close()
+        self._finish()
+
+        if self.cache is not False:
+            await asyncio.to_thread(self.cache.set, self.key, self.model, self.text)
+
+    async def collect(self):
+        async for _ in self:
+            pass
+        return self.text
+
+
+def stream_chat_completion(messages, model='gpt-4o', cache=None, client=None, **params):
+    """
+    Streaming `chat_completion`, returns a `CompletionStream`. Nothing is sent before
+    the stream is iterated.
+    """
+    return CompletionStream(model, messages, cache, client, params)
+
+
+def astream_chat_completion(messages, model='gpt-4o', cache=None, client=None, **params):
+    """
+    Streaming `achat_completion`, returns an `AsyncCompletionStream` for `async for`
+    """
+    return AsyncCompletionStream(model, messages, cache, client, params)
@@ -0,0 +1,158 @@
+"""
+Token-budgeted context of the RAG prompts. Search results are packed in rank order into a
+fixed number of `tiktoken` tokens: repeated answers are dropped, an answer longer than its
+share of the budget is cut at a token boundary, and packing stops when the budget is
+spent. The report says what was kept and how many tokens every FAQ section used:
+    packed = pack_context(search_results, budget=1500)
+    packed.text, packed.tokens, packed.sections  # {"Module 1: Docker": 412, ...}
+tiktoken downloads its encodings on first use, `get_encoding()` belongs in `warm()`. When
+the encoding can't be loaded (offline), or isn't loaded yet inside a coroutine, tokens are
+approximated as 4 characters instead of failing the request.
+"""
+
+import asyncio
+import os
+import threading
+from collections import namedtuple
+
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("LLMZMCP_CONTEXT_TOKENS", "2000"))
+
+# Snippet layout of the prompts, the header and the answer are tokenized separately so a
+# long answer can be cut without re-encoding the snippet
+SNIPPET_HEADER = "section: {section}\nquestion: {question}\nanswer: "
+SNIPPET_END = "\n\n"
+TRUNCATION_MARK = " ..."
+
+_encodings = {}
+_encodings_lock = threading.Lock()
+
+
+class PackedContext(namedtuple("PackedContext", ["text", "tokens", "budget", "sections",
+                                                 "documents", "duplicates", "truncated",
+                                                 "dropped"])):
+    """
+    `tokens` used out of `budget`, `sections` the tokens per FAQ section, `documents` the
+    packed search results in order and `duplicates`, `truncated`, `dropped` the number
+    of results skipped as repeats, cut short or left out for lack of budget
+    """
+
+    def report(self):
+        return {
+            "tokens": self.tokens,
+            "budget": self.budget,
+            "documents": len(self.documents),
+            "duplicates": self.duplicates,
+            "truncated": self.truncated,
+            "dropped": self.dropped,
+            "sections": dict(self.sections),
+        }
+
+
+class ApproximateEncoding:
+    """
+    Stand-in for a tiktoken encoding, every 4 characters count as one token
+    """
+
+    name = "approximate"
+
+    def encode(self, text):
+        return [text[i:i + 4] for i in range(0, len(text), 4)]
+
+    def decode(self, tokens):
+        return "".join(tokens)
+
+
+APPROXIMATE_ENCODING = ApproximateEncoding()
+
+
+def get_encoding(model='gpt-4o'):
+    """
+    Shared tiktoken encoding of a model, `o200k_base` for models tiktoken doesn't know.
+    A failed load is remembered and answered with `APPROXIMATE_ENCODING`.
+    """
+    with _encodings_lock:
+        if model not in _encodings:
+            import tiktoken
+
+            try:
+                try:
+                    _encodings[model] = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    _encodings[model] = tiktoken.get_encoding("o200k_base")
+            except Exception as e:
+                print(f"tiktoken encoding of '{model}' unavailable ({e.__class__.__name__}), "
+                      "approximating 4 characters per token")
+                _encodings[model] = APPROXIMATE_ENCODING
+        return _encodings[model]
+
+
+def _loaded_encoding(model):
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return get_encoding(model)
+    # Never load (download) inside a coroutine, the event loop would stall on it
+    return _encodings.get(model, APPROXIMATE_ENCODING)
+
+
+def _dedup_key(doc):
+    return " ".join(doc.get("text", "").split()).casefold()
+
+
+def pack_context(search_results, budget=CONTEXT_TOKEN_BUDGET, model='gpt-4o',
+                 max_doc_tokens=None, rank=None, min_answer_tokens=32, encoding=None):
+    """
+    Pack the search results into at most `budget` tokens. Results keep their search rank
+    unless `rank(doc)` (higher first) is given. An answer is cut to `max_doc_tokens`
+    tokens per snippet (default half the budget) and to what is left of the budget,
+    results that can't fit `min_answer_tokens` of their answer are dropped.
+    Inside a coroutine the encoding has to be loaded already (see `get_encoding`),
+    otherwise the token counts are approximate.
+    """
+    encoding = encoding or _loaded_encoding(model)
+    max_doc_tokens = max_doc_tokens or max(budget // 2, min_answer_tokens)
+    if rank is not None:
+        search_results = sorted(search_results, key=rank, reverse=True)
+
+    mark_tokens = len(encoding.encode(TRUNCATION_MARK))
+    end_tokens = len(encoding.encode(SNIPPET_END))
+    parts, sections, documents, seen = [], {}, [], set()
+    used = duplicates = truncated = dropped = 0
+
+    for doc in search_results:
+        key = _dedup_key(doc)
+        if key in seen:
+            duplicates += 1
+            continue
+
+        header = SNIPPET_HEADER.format(section=doc.get("section", ""),
+                                       question=doc.get("question", ""))
+        header_tokens = len(encoding.encode(header))
+        answer = doc.get("text", "")
+        answer_ids = encoding.encode(answer)
+
+        room = min(budget - used - header_tokens - end_tokens,
+                   max_doc_tokens - header_tokens - end_tokens)
+        if len(answer_ids) > room:
+            if room - mark_tokens < min_answer_tokens:
+                dropped += 1
+                continue
+            answer_ids = answer_ids[:room - mark_tokens]
+            # A cut inside a multi-byte character decodes to a replacement character
+            answer = encoding.decode(answer_ids).rstrip().rstrip("\ufffd") + TRUNCATION_MARK
+            snippet_tokens = header_tokens + len(answer_ids) + mark_tokens + end_tokens
+            truncated += 1
+        else:
+            snippet_tokens = header_tokens + len(answer_ids) + end_tokens
+
+        seen.add(key)
+        parts.extend([header, answer, SNIPPET_END])
+        section = doc.get("section", "")
+        sections[section] = sections.get(section, 0) + snippet_tokens
+        documents.append(doc)
+        used += snippet_tokens
+
+    # Token counts of the parts are additive up to merges at the joins, close enough for a
+    # budget, `len(encoding.encode(text))` gives the exact count
+    return PackedContext("".join(parts), used, budget, sections, documents, duplicates,
+                         truncated, dropped)
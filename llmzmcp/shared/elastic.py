@@ -0,0 +1,36 @@
+from tqdm import tqdm
+
+
+def bulk_actions(es_client, index_name, actions, total=None, chunk_size=500, thread_count=4):
+    """
+    Run bulk api actions against an index, `chunk_size` actions per request and
+    `thread_count` requests in flight. Refreshes are switched off during the load and
+    the previous refresh interval is restored afterwards.
+
+    Returns the number of successful actions and a list of per-action errors.
+    """
+    from elasticsearch.helpers import parallel_bulk
+
+    settings = es_client.indices.get_settings(index=index_name, flat_settings=True)
+    previous_interval = settings[index_name]["settings"].get("index.refresh_interval")
+    es_client.indices.put_settings(index=index_name, settings={"index": {"refresh_interval": "-1"}})
+
+    succeeded, errors = 0, []
+    try:
+        results = parallel_bulk(es_client, actions, chunk_size=chunk_size,
+                                thread_count=thread_count, raise_on_error=False,
+                                raise_on_exception=False)
+        for ok, item in tqdm(results, total=total, position=0):
+            if ok:
+                succeeded += 1
+            else:
+                # item looks like {"index": {"_id": ..., "status": ..., "error": ...}}
+                errors.append(next(iter(item.values())))
+    finally:
+        # None resets the setting to the cluster default
+        es_client.indices.put_settings(index=index_name,
+                                       settings={"index": {"refresh_interval": previous_interval}})
+        es_client.indices.refresh(index=index_name)
+
+    return succeeded, errors
+
@@ -0,0 +1,102 @@
+import threading
+
+import numpy as np
+
+from llmzmcp.utils.embedding_store import EmbeddingStore
+
+_stores = {}
+_encoders = {}
+_models = {}
+_stores_lock = threading.RLock()
+
+
+def get_embedding_store(model_name, dtype="float32"):
+    """
+    One shared store per (model, dtype) in the process
+    """
+    with _stores_lock:
+        key = (model_name, dtype)
+        if key not in _stores:
+            _stores[key] = EmbeddingStore(model_name, dtype=dtype)
+        return _stores[key]
+
+
+def sentence_transformer_encoder(model, batch_size=64):
+    """
+    Wrap a SentenceTransformer so it can fill store misses in one batched call
+    """
+    def encode(texts):
+        return model.encode(texts, batch_size=batch_size)
+    return encode
+
+
+def get_fastembed_model(model_handle, sparse=False):
+    """
+    One loaded FastEmbed model per process, shared by the document and query encoders
+    """
+    with _stores_lock:
+        key = (model_handle, sparse)
+        if key not in _models:
+            from fastembed import SparseTextEmbedding, TextEmbedding
+
+            model_cls = SparseTextEmbedding if sparse else TextEmbedding
+            _models[key] = model_cls(model_name=model_handle)
+        return _models[key]
+
+
+def fastembed_encoder(model_handle, batch_size=64):
+    """
+    Encoder backed by a local FastEmbed model, e.g. `jinaai/jina-embeddings-v2-small-en`.
+    This is the same model qdrant-client runs for `models.Document` inference.
+    """
+    model = get_fastembed_model(model_handle)
+
+    def encode(texts):
+        return np.array(list(model.embed(texts, batch_size=batch_size)))
+    return encode
+
+
+def fastembed_sparse_encoder(model_handle, batch_size=64):
+    """
+    Sparse FastEmbed encoder, e.g. `Qdrant/bm25`. Returns one (indices, values) pair per text
+    """
+    model = get_fastembed_model(model_handle, sparse=True)
+
+    def encode(texts):
+        return [(e.indices, e.values) for e in model.embed(texts, batch_size=batch_size)]
+    return encode
+
+
+def fastembed_query_encoder(model_handle, sparse=False):
+    """
+    Query side of a FastEmbed model (`query_embed`). For `Qdrant/bm25` query terms are
+    not weighted by term frequency, as in qdrant-client's query inference.
+    """
+    model = get_fastembed_model(model_handle, sparse)
+
+    def encode(texts):
+        embeddings = model.query_embed(texts)
+        if sparse:
+            return [(e.indices, e.values) for e in embeddings]
+        return np.array(list(embeddings))
+    return encode
+
+
+def get_encoder(model_handle, sparse=False):
+    """
+    Shared FastEmbed encoder per model, loading the onnx model only once per process
+    """
+    with _stores_lock:
+        key = (model_handle, sparse)
+        if key not in _encoders:
+            factory = fastembed_sparse_encoder if sparse else fastembed_encoder
+            _encoders[key] = factory(model_handle)
+        return _encoders[key]
+
+
+def embed_texts(texts, model_handle):
+    """
+    Embed texts with a FastEmbed model, reusing every vector already in the store
+    """
+    return get_embedding_store(model_handle).get_many(texts, get_encoder(model_handle))
+
@@ -0,0 +1,38 @@
+"""
+Slim qdrant payloads. With `SLIM_PAYLOADS` (env `LLMZMCP_SLIM_PAYLOADS`, on unless set to 0)
+points only carry the document id and the filterable `course`, searches only ask for the id
+and the results are hydrated from the local memory-mapped `DocumentStore`:
+    points = client.query_points(..., with_payload=result_payload()).points
+    hydrate_points(points, open_rag_store())
+"""
+
+from llmzmcp.utils import SLIM_PAYLOADS
+
+
+def slim_payload(doc):
+    """
+    Payload of a slim point, `sync_qdrant` adds the document id and content hash
+    """
+    return {"course": doc["course"]}
+
+
+def result_payload():
+    """
+    `with_payload` selector for searches
+    """
+    return ["doc_id"] if SLIM_PAYLOADS else True
+
+
+def hydrate_points(points, store):
+    """
+    Replace the payload of slim points by the full document, in place. Points that
+    already carry the document (no slim payloads) are returned as they are.
+    """
+    if not SLIM_PAYLOADS:
+        return points
+    for point in points:
+        payload = point.payload or {}
+        doc = store.get(payload["doc_id"]) if "doc_id" in payload else None
+        if doc is not None:
+            point.payload = {**payload, **doc}
+    return points
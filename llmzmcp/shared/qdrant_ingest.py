@@ -0,0 +1,93 @@
+"""
+Streaming ingestion of documents into a Qdrant collection. Documents are processed in
+fixed-size batches: worker threads embed batches locally while the main thread upserts the
+finished ones in order with `wait=False`, so embedding and network transfer overlap and at
+most `max_pending` batches of points exist in memory. Points carry their content hash (see
+`sync_qdrant`), re-running an interrupted sync only sends what didn't arrive.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import cpu_count
+
+from tqdm import tqdm
+
+from llmzmcp.shared.embeddings import embed_texts, get_encoder
+
+
+def dense_embedder(model_handle, text_fn=lambda doc: doc['text']):
+    """
+    Embed a batch of documents with a FastEmbed model through the embedding store
+    """
+    def embed(docs):
+        return [v.tolist() for v in embed_texts([text_fn(doc) for doc in docs], model_handle)]
+    return embed
+
+
+def sparse_embedder(model_handle, text_fn=lambda doc: doc['text']):
+    """
+    Embed a batch of documents into qdrant sparse vectors, e.g. with `Qdrant/bm25`
+    """
+    def embed(docs):
+        from qdrant_client import models
+
+        encoded = get_encoder(model_handle, sparse=True)([text_fn(doc) for doc in docs])
+        return [models.SparseVector(indices=i.tolist(), values=v.tolist()) for i, v in encoded]
+    return embed
+
+
+def ingest_points(client, collection_name, documents, embedders, make_payload,
+                  make_id=lambda i, doc: i + 1, batch_size=64, workers=None,
+                  max_pending=None, wait=False):
+    """
+    Embed and upsert `documents` into `collection_name`.
+
+    `embedders` maps a vector name to a function that embeds a list of documents
+    (use the name None for a collection with a single unnamed vector).
+    `make_payload(doc)` and `make_id(position, doc)` build the rest of each point.
+    `wait=True` returns only once every point is stored, e.g. before reading the
+    collection status. Returns the number of points sent.
+    """
+    documents = list(documents)
+    workers = workers or max(1, int(cpu_count() * 0.75))
+    max_pending = max_pending or 2 * workers
+    n_batches = (len(documents) + batch_size - 1) // batch_size
+
+    from qdrant_client import models
+
+    def build_points(batch):
+        start = batch * batch_size
+        docs = documents[start:start + batch_size]
+        vectors = {name: embed(docs) for name, embed in embedders.items()}
+        points = []
+        for offset, doc in enumerate(docs):
+            named = {name: vecs[offset] for name, vecs in vectors.items()}
+            points.append(models.PointStruct(
+                id=make_id(start + offset, doc),
+                vector=named[None] if None in named else named,
+                payload=make_payload(doc),
+            ))
+        return points
+
+    sent = 0
+    batches = iter(range(n_batches))
+    with ThreadPoolExecutor(max_workers=workers) as pool, \
+            tqdm(total=n_batches, position=0) as progress:
+        pending = deque()
+        for batch in batches:
+            pending.append(pool.submit(build_points, batch))
+            if len(pending) >= max_pending:
+                break
+
+        while pending:
+            points = pending.popleft().result()
+            # wait=False returns once qdrant accepted the batch, the next one is already embedding
+            client.upsert(collection_name=collection_name, points=points, wait=wait)
+            sent += len(points)
+            progress.update(1)
+
+            next_batch = next(batches, None)
+            if next_batch is not None:
+                pending.append(pool.submit(build_points, next_batch))
+
+    return sent
@@ -0,0 +1,135 @@
+"""
+Named qdrant collection profiles. A profile bundles the HNSW graph parameters, the vector
+quantization, what is kept on disk and the matching search parameters:
+    default      - qdrant defaults
+    low-latency  - int8 scalar quantization kept in RAM, small search beam, light rescoring
+    low-memory   - binary quantization in RAM, original vectors, graph and payloads on disk,
+                   oversampled rescoring from disk
+    high-recall  - denser graph, wide search beam, full precision vectors
+Collections are created with `ensure_collection(..., profile=...)` and searched with
+`search_params(profile)`. `LLMZMCP_QDRANT_PROFILE` selects the profile of the scripts.
+"""
+
+import os
+from collections import namedtuple
+
+CollectionProfile = namedtuple(
+    "CollectionProfile",
+    ["hnsw", "quantization", "on_disk", "on_disk_payload", "hnsw_ef", "oversampling"],
+)
+
+# Plain values, the qdrant models are only built when a collection is created or searched
+PROFILES = {
+    "default": CollectionProfile(None, None, None, None, None, None),
+    "low-latency": CollectionProfile(
+        hnsw={"m": 16, "ef_construct": 128}, quantization="int8",
+        on_disk=False, on_disk_payload=False, hnsw_ef=32, oversampling=1.0,
+    ),
+    "low-memory": CollectionProfile(
+        hnsw={"m": 8, "ef_construct": 64, "on_disk": True}, quantization="binary",
+        on_disk=True, on_disk_payload=True, hnsw_ef=64, oversampling=3.0,
+    ),
+    "high-recall": CollectionProfile(
+        hnsw={"m": 32, "ef_construct": 256}, quantization=None,
+        on_disk=False, on_disk_payload=False, hnsw_ef=256, oversampling=None,
+    ),
+}
+
+QDRANT_PROFILE = os.environ.get("LLMZMCP_QDRANT_PROFILE", "default")
+
+
+def get_profile(profile=None):
+    profile = profile or QDRANT_PROFILE
+    if isinstance(profile, CollectionProfile):
+        return profile
+    assert profile in PROFILES, f"profile must be one of {list(PROFILES)}"
+    return PROFILES[profile]
+
+
+def hnsw_config(profile=None, **overrides):
+    from qdrant_client import models
+
+    config = get_profile(profile)
+    if config.hnsw is None and not overrides:
+        return None
+    return models.HnswConfigDiff(**{**(config.hnsw or {}), **overrides})
+
+
+def quantization_config(profile=None):
+    """
+    int8 scalar or binary quantization, the codes are always kept in RAM
+    """
+    from qdrant_client import models
+
+    quantization = get_profile(profile).quantization
+    if quantization == "int8":
+        return models.ScalarQuantization(scalar=models.ScalarQuantizationConfig(
+            type=models.ScalarType.INT8, quantile=0.99, always_ram=True))
+    if quantization == "binary":
+        return models.BinaryQuantization(
+            binary=models.BinaryQuantizationConfig(always_ram=True))
+    return None
+
+
+def search_params(profile=None):
+    """
+    `search_params` of `query_points` (and `models.Prefetch`) for the profile
+    """
+    from qdrant_client import models
+
+    config = get_profile(profile)
+    if config.hnsw_ef is None:
+        return None
+    quantization = None
+    if config.quantization is not None:
+        # Rescore the oversampled candidates with the original vectors
+        quantization = models.QuantizationSearchParams(rescore=True,
+                                                       oversampling=config.oversampling)
+    return models.SearchParams(hnsw_ef=config.hnsw_ef, quantization=quantization)
+
+
+def _with_on_disk(vectors_config, on_disk):
+    if vectors_config is None or on_disk is None:
+        return vectors_config
+    if isinstance(vectors_config, dict):  # Named vectors
+        return {name: params.model_copy(update={"on_disk": on_disk})
+                for name, params in vectors_config.items()}
+    return vectors_config.model_copy(update={"on_disk": on_disk})
+
+
+def _with_sparse_on_disk(sparse_vectors_config, on_disk):
+    if sparse_vectors_config is None or not on_disk:
+        return sparse_vectors_config
+    from qdrant_client import models
+
+    return {name: params.model_copy(update={"index": models.SparseIndexParams(on_disk=True)})
+            for name, params in sparse_vectors_config.items()}
+
+
+def ensure_collection(client, collection_name, vectors_config=None, sparse_vectors_config=None,
+                      profile=None, recreate=False, **create_kwargs):
+    """
+    Create the collection with the profile's storage, HNSW and quantization settings
+    unless it already exists. The profile only applies at creation, `recreate=True`
+    drops and rebuilds the collection, e.g. after switching profiles. Extra
+    `create_collection` arguments override the profile.
+    """
+    config = get_profile(profile)
+    if recreate:
+        client.delete_collection(collection_name=collection_name)
+
+    if client.collection_exists(collection_name=collection_name):
+        print(f"Collection '{collection_name}' already exists. Skipping creation.")
+        return False
+
+    print(f"Creating collection '{collection_name}' with profile '{profile or QDRANT_PROFILE}'")
+    params = {
+        "vectors_config": _with_on_disk(vectors_config, config.on_disk),
+        "sparse_vectors_config": _with_sparse_on_disk(sparse_vectors_config, config.on_disk),
+        "hnsw_config": hnsw_config(config),
+        "quantization_config": quantization_config(config),
+        "on_disk_payload": config.on_disk_payload,
+    }
+    params.update(create_kwargs)
+    client.create_collection(collection_name=collection_name, **params)
+    return True
@@ -0,0 +1,107 @@
+"""
+Query-side embeddings for qdrant searches. The dense and sparse vectors of a query are
+computed locally once and kept in a bounded LRU keyed by the normalized query text, so the
+prefetch stages of a hybrid search and repeated questions reuse them. The model still sees
+the query as it was asked (the first spelling of it), normalization only picks the entry. Searches pass the raw
+vectors instead of `models.Document`, which qdrant-client would embed again on every use:
+    query_embedder = get_query_embedder()
+    client.query_points(..., query=query_embedder.dense(query), ...)
+"""
+
+import threading
+
+from llmzmcp.shared.embeddings import fastembed_query_encoder
+from llmzmcp.shared.vector_artifact import DENSE_MODEL, SPARSE_MODEL
+from llmzmcp.utils import TTLCache
+
+_embedders = {}
+_embedders_lock = threading.Lock()
+
+
+def normalize_query(query):
+    """
+    Case and whitespace insensitive form of a query, the cache key of its vectors
+    """
+    return " ".join(query.split()).casefold()
+
+
+class QueryEmbedder:
+    """
+    Models are loaded on first use. `maxsize` bounds the number of cached vectors
+    (dense and sparse count separately), `ttl=None` keeps them until evicted.
+    """
+
+    def __init__(self, dense_model=DENSE_MODEL, sparse_model=SPARSE_MODEL, maxsize=4096,
+                 ttl=None):
+        self.dense_model = dense_model
+        self.sparse_model = sparse_model
+        self.cache = TTLCache(ttl=ttl, maxsize=maxsize)
+        self._encoders = {}
+
+    def _encode(self, kind, texts):
+        if kind not in self._encoders:
+            model = self.dense_model if kind == "dense" else self.sparse_model
+            self._encoders[kind] = fastembed_query_encoder(model, sparse=kind == "sparse")
+        encoded = self._encoders[kind](texts)
+        if kind == "dense":
+            return [v.tolist() for v in encoded]
+        from qdrant_client import models
+
+        return [models.SparseVector(indices=i.tolist(), values=v.tolist()) for i, v in encoded]
+
+    def _get(self, kind, query):
+        key = (kind, normalize_query(query))
+        return self.cache.get_or_load(key, lambda: self._encode(kind, [query])[0])
+
+    def _get_many(self, kind, queries):
+        keys = [(kind, normalize_query(q)) for q in queries]
+        originals = {}  # first spelling of every distinct query
+        for key, query in zip(keys, queries):
+            originals.setdefault(key, query)
+        vectors = {key: self.cache.get(key) for key in originals}
+        missing = [key for key, vector in vectors.items() if vector is None]
+        if missing:
+            # Misses are embedded in one batched call
+            encoded = self._encode(kind, [originals[key] for key in missing])
+            for key, vector in zip(missing, encoded):
+                self.cache.set(key, vector)
+                vectors[key] = vector
+        return [vectors[key] for key in keys]
+
+    def dense(self, query):
+        """
+        Dense query vector as a list of floats
+        """
+        return self._get("dense", query)
+
+    def sparse(self, query):
+        """
+        Sparse query vector as a `models.SparseVector`
+        """
+        return self._get("sparse", query)
+
+    def dense_many(self, queries):
+        return self._get_many("dense", queries)
+
+    def sparse_many(self, queries):
+        return self._get_many("sparse", queries)
+
+    def warm(self, dense=True, sparse=False):
+        """
+        Load the models and run one throwaway query through them, nothing is cached
+        """
+        for kind, wanted in [("dense", dense), ("sparse", sparse)]:
+            if wanted:
+                self._encode(kind, ["warm up"])
+        return self
+
+
+def get_query_embedder(dense_model=DENSE_MODEL, sparse_model=SPARSE_MODEL):
+    """
+    One shared query embedder (and cache) per model pair in the process
+    """
+    with _embedders_lock:
+        key = (dense_model, sparse_model)
+        if key not in _embedders:
+            _embedders[key] = QueryEmbedder(dense_model, sparse_model)
+        return _embedders[key]
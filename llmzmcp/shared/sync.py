@@ -0,0 +1,174 @@
+"""
+Incremental synchronization of a document corpus with the search backends. Every document
+gets a stable id (`generate_document_id`, or its own `id` field) and a content hash that is
+stored next to it in the backend. A sync reads the stored (id, hash) pairs, diffs them
+against the corpus and only applies the inserts, updates and deletes:
+    plan = sync_elasticsearch(es_client, "course-questions", index_settings, documents)
+    plan = sync_qdrant(client, "zoomcamp-rag", documents, embedders, make_payload)
+An edited FAQ entry keeps its id and is re-indexed (and re-embedded) alone, a removed
+entry is deleted, the rest of the corpus is left untouched.
+"""
+
+from collections import namedtuple
+from uuid import NAMESPACE_URL, uuid5
+
+from llmzmcp.data import content_hash, document_ids
+from llmzmcp.shared.elastic import bulk_actions
+from llmzmcp.shared.qdrant_ingest import ingest_points
+
+HASH_FIELD = "content_hash"
+
+
+class SyncPlan(namedtuple("SyncPlan", ["inserts", "updates", "deletes", "unchanged"])):
+    """
+    `inserts` and `updates` are lists of (doc_id, hash, document), `deletes` a list of
+    stored keys and `unchanged` the number of documents left as they are
+    """
+
+    @property
+    def changed(self):
+        return bool(self.inserts or self.updates or self.deletes)
+
+    def __str__(self):
+        return (f"{len(self.inserts)} inserts, {len(self.updates)} updates, "
+                f"{len(self.deletes)} deletes, {self.unchanged} unchanged")
+
+
+def keyed_documents(documents, id_fn=None, exclude=(), salt=""):
+    """
+    Yield (doc_id, hash, document) for the corpus, see `document_ids`. A `salt` is mixed
+    into every hash, e.g. to re-send all points when their payload layout changes.
+    """
+    documents = list(documents)
+    for doc_id, doc in zip(document_ids(documents, id_fn), documents):
+        doc_hash = content_hash(doc, exclude)
+        if salt:
+            doc_hash = content_hash({"hash": doc_hash, "salt": salt})
+        yield doc_id, doc_hash, doc
+
+
+def diff_documents(documents, stored, id_fn=None, exclude=(), salt=""):
+    """
+    Compare the corpus with `stored`, a dict of doc_id -> content hash (None when unknown)
+    """
+    inserts, updates, unchanged = [], [], 0
+    current = set()
+    for doc_id, doc_hash, doc in keyed_documents(documents, id_fn, exclude, salt):
+        current.add(doc_id)
+        if doc_id not in stored:
+            inserts.append((doc_id, doc_hash, doc))
+        elif stored[doc_id] != doc_hash:
+            updates.append((doc_id, doc_hash, doc))
+        else:
+            unchanged += 1
+    deletes = [doc_id for doc_id in stored if doc_id not in current]
+    return SyncPlan(inserts, updates, deletes, unchanged)
+
+
+###########################################################################################
+# Elasticsearch: the document id is the `_id`, the hash a non-indexed keyword field
+###########################################################################################
+def elasticsearch_hashes(es_client, index_name, hash_field=HASH_FIELD):
+    from elasticsearch.helpers import scan
+
+    hits = scan(es_client, index=index_name, query={"query": {"match_all": {}}},
+                _source=[hash_field])
+    return {hit["_id"]: hit.get("_source", {}).get(hash_field) for hit in hits}
+
+
+def sync_elasticsearch(es_client, index_name, index_settings, documents, id_fn=None,
+                       hash_field=HASH_FIELD, dry_run=False, **bulk_kwargs):
+    """
+    Create the index if needed and bring it in line with `documents`.
+    Documents indexed without a hash (e.g. with generated ids) are replaced on the first
+    sync. Returns the `SyncPlan`.
+    """
+    if not es_client.indices.exists(index=index_name):
+        print(f"Creating index: {index_name}")
+        es_client.indices.create(index=index_name, body=index_settings)
+    es_client.indices.put_mapping(index=index_name, properties={
+        hash_field: {"type": "keyword", "index": False}})
+
+    plan = diff_documents(documents, elasticsearch_hashes(es_client, index_name, hash_field),
+                          id_fn, exclude=(hash_field,))
+    print(f"Index '{index_name}': {plan}")
+    if dry_run or not plan.changed:
+        return plan
+
+    def actions():
+        for doc_id, doc_hash, doc in plan.inserts + plan.updates:
+            yield {"_op_type": "index", "_index": index_name, "_id": doc_id,
+                   "_source": {**doc, hash_field: doc_hash}}
+        for doc_id in plan.deletes:
+            yield {"_op_type": "delete", "_index": index_name, "_id": doc_id}
+
+    total = len(plan.inserts) + len(plan.updates) + len(plan.deletes)
+    _, errors = bulk_actions(es_client, index_name, actions(), total=total, **bulk_kwargs)
+    for error in errors[:10]:
+        print(f"  -> {error.get('_id')}: {error.get('error')}")
+    return plan
+
+
+###########################################################################################
+# Qdrant: the point id is derived from the document id, both are kept in the payload
+###########################################################################################
+def point_id(doc_id):
+    return str(uuid5(NAMESPACE_URL, doc_id))
+
+
+def qdrant_hashes(client, collection_name, hash_field=HASH_FIELD, page_size=1000):
+    """
+    Stored doc_id -> hash, plus the ids of points without a doc_id (seeded before the
+    collection was synced) which the sync replaces
+    """
+    stored, legacy, offset = {}, [], None
+    while True:
+        points, offset = client.scroll(collection_name=collection_name, limit=page_size,
+                                       offset=offset, with_payload=["doc_id", hash_field],
+                                       with_vectors=False)
+        for point in points:
+            payload = point.payload or {}
+            if "doc_id" in payload:
+                stored[payload["doc_id"]] = payload.get(hash_field)
+            else:
+                legacy.append(point.id)
+        if offset is None:
+            return stored, legacy
+
+
+def sync_qdrant(client, collection_name, documents, embedders, make_payload, id_fn=None,
+                hash_field=HASH_FIELD, dry_run=False, **ingest_kwargs):
+    """
+    Bring an existing collection in line with `documents`. Only inserted and updated
+    documents are embedded (see `ingest_points` for `embedders` and `make_payload`).
+    Returns the `SyncPlan`.
+    """
+    documents = list(documents)
+    stored, legacy = qdrant_hashes(client, collection_name, hash_field)
+    # The payload fields are part of the hash, switching e.g. to slim payloads re-sends all points
+    salt = ",".join(sorted(make_payload(documents[0]))) if documents else ""
+    plan = diff_documents(documents, stored, id_fn, salt=salt)
+    selector = [point_id(doc_id) for doc_id in plan.deletes] + legacy
+    plan = plan._replace(deletes=plan.deletes + legacy)
+    print(f"Collection '{collection_name}': {plan}")
+    if dry_run or not plan.changed:
+        return plan
+
+    if selector:
+        from qdrant_client import models
+
+        client.delete(collection_name=collection_name,
+                      points_selector=models.PointIdsList(points=selector))
+
+    changed = [{**doc, "doc_id": doc_id, hash_field: doc_hash}
+               for doc_id, doc_hash, doc in plan.inserts + plan.updates]
+    if changed:
+        ingest_points(
+            client, collection_name, changed, embedders,
+            make_payload=lambda doc: {**make_payload(doc), "doc_id": doc["doc_id"],
+                                      hash_field: doc[hash_field]},
+            make_id=lambda i, doc: point_id(doc["doc_id"]),
+            **ingest_kwargs,
+        )
+    return plan
+
@@ -0,0 +1,171 @@
+"""
+Precomputed dense and sparse vectors of the FAQ corpus, shared by every qdrant collection
+builder. One batched local pass embeds every distinct text of every view with the dense
+(`jinaai/jina-embeddings-v2-small-en`) and sparse (`Qdrant/bm25`) model, the result is
+stored per document id under `<cache>/vectors/artifact-<fingerprint>/`:
+    meta.json               models, views and the document ids in row order
+    dense-<view>.npy        (n, dim) float32, opened as a memory map
+    sparse-<view>.npz       CSR arrays (indptr, indices, values)
+A view is a named text of the document, e.g. `text` for zoomcamp-rag/zoomcamp-hybrid and
+`question_text` for zoomcamp-faq. The fingerprint covers the ids, view texts and models, so
+a new collection variant over the same views reuses the artifact without any model call.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+from tqdm import tqdm
+
+from llmzmcp.data import document_ids
+from llmzmcp.shared.embeddings import embed_texts, get_encoder
+from llmzmcp.utils import get_cache_dir
+
+DENSE_MODEL = "jinaai/jina-embeddings-v2-small-en"
+SPARSE_MODEL = "Qdrant/bm25"
+VIEWS = {
+    "text": lambda doc: doc["text"],
+    "question_text": lambda doc: doc["question"] + " " + doc["text"],
+}
+
+
+class VectorArtifact:
+    """
+    Read-only vectors of one corpus. Rows are looked up by document id (see
+    `document_ids`), the same ids `sync_qdrant` passes along as `doc["doc_id"]`.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        meta = json.loads((directory / "meta.json").read_text())
+        self.dense_model = meta["dense_model"]
+        self.sparse_model = meta["sparse_model"]
+        self.views = meta["views"]
+        self.ids = meta["ids"]
+        self.rows = {doc_id: row for row, doc_id in enumerate(self.ids)}
+
+        self._dense = {view: np.load(directory / f"dense-{view}.npy", mmap_mode="r")
+                       for view in self.views}
+        self._sparse = {}
+        for view in self.views:
+            with np.load(directory / f"sparse-{view}.npz") as data:
+                self._sparse[view] = (data["indptr"], data["indices"], data["values"])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def dense(self, view, doc_ids):
+        """
+        (len(doc_ids), dim) float32 array of the dense vectors
+        """
+        rows = [self.rows[doc_id] for doc_id in doc_ids]
+        return np.asarray(self._dense[view][rows], dtype=np.float32)
+
+    def sparse(self, view, doc_ids):
+        """
+        One (indices, values) pair per document
+        """
+        indptr, indices, values = self._sparse[view]
+        pairs = []
+        for doc_id in doc_ids:
+            row = self.rows[doc_id]
+            start, end = indptr[row], indptr[row + 1]
+            pairs.append((indices[start:end], values[start:end]))
+        return pairs
+
+    def dense_embedder(self, view="text"):
+        """
+        `ingest_points`/`sync_qdrant` embedder reading the dense vectors of a view
+        """
+        def embed(docs):
+            return self.dense(view, [doc["doc_id"] for doc in docs]).tolist()
+        return embed
+
+    def sparse_embedder(self, view="text"):
+        """
+        `ingest_points`/`sync_qdrant` embedder reading the sparse vectors of a view
+        """
+        from qdrant_client import models
+
+        def embed(docs):
+            return [models.SparseVector(indices=i.tolist(), values=v.tolist())
+                    for i, v in self.sparse(view, [doc["doc_id"] for doc in docs])]
+        return embed
+
+
+def _fingerprint(ids, texts, dense_model, sparse_model):
+    digest = hashlib.sha256(json.dumps([dense_model, sparse_model, ids]).encode("utf-8"))
+    for view in sorted(texts):
+        digest.update(view.encode("utf-8"))
+        for text in texts[view]:
+            digest.update(hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest())
+    return digest.hexdigest()[:16]
+
+
+def build_vector_artifact(directory, ids, texts, dense_model=DENSE_MODEL,
+                          sparse_model=SPARSE_MODEL, batch_size=256):
+    """
+    Embed every distinct text of all views once and write the artifact to `directory`
+    """
+    unique = list(dict.fromkeys(t for view_texts in texts.values() for t in view_texts))
+    position = {text: i for i, text in enumerate(unique)}
+
+    # Dense vectors go through the embedding store, texts embedded by earlier runs are free
+    dense = embed_texts(unique, dense_model)
+    encode_sparse = get_encoder(sparse_model, sparse=True)
+    sparse = []
+    for start in tqdm(range(0, len(unique), batch_size), position=0):
+        sparse.extend(encode_sparse(unique[start:start + batch_size]))
+
+    # Written next to the final directory and renamed, readers never see a partial artifact
+    tmp = tempfile.mkdtemp(dir=directory.parent, prefix=f".{directory.name}-")
+    try:
+        for view, view_texts in texts.items():
+            rows = [position[t] for t in view_texts]
+            np.save(os.path.join(tmp, f"dense-{view}.npy"), dense[rows])
+            lengths = [len(sparse[r][0]) for r in rows]
+            np.savez(
+                os.path.join(tmp, f"sparse-{view}.npz"),
+                indptr=np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+                indices=np.concatenate([sparse[r][0] for r in rows] or [[]]).astype(np.uint32),
+                values=np.concatenate([sparse[r][1] for r in rows] or [[]]).astype(np.float32),
+            )
+        with open(os.path.join(tmp, "meta.json"), "w") as f_out:
+            json.dump({"dense_model": dense_model, "sparse_model": sparse_model,
+                       "views": list(texts), "ids": ids}, f_out)
+        os.replace(tmp, directory)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return VectorArtifact(directory)
+
+
+def load_vector_artifact(documents, views=VIEWS, dense_model=DENSE_MODEL,
+                         sparse_model=SPARSE_MODEL, id_fn=None):
+    """
+    Vector artifact of the corpus, built on first use and whenever the documents,
+    views or models change
+    """
+    documents = list(documents)
+    ids, texts = list(document_ids(documents, id_fn)), {view: [] for view in views}
+    for doc in documents:
+        for view, text_fn in views.items():
+            texts[view].append(text_fn(doc))
+
+    root = get_cache_dir() / "vectors"
+    root.mkdir(parents=True, exist_ok=True)
+    directory = root / f"artifact-{_fingerprint(ids, texts, dense_model, sparse_model)}"
+    if (directory / "meta.json").exists():
+        return VectorArtifact(directory)
+
+    print(f"Building vector artifact for {len(ids)} documents and views {list(views)}")
+    try:
+        return build_vector_artifact(directory, ids, texts, dense_model, sparse_model)
+    except OSError:
+        # Another process renamed its artifact into place first
+        if (directory / "meta.json").exists():
+            return VectorArtifact(directory)
+        raise
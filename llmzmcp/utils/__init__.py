@@ -1,3 +1,4 @@
 from llmzmcp.utils.cache import *
 from llmzmcp.utils.env import *
 from llmzmcp.utils.paths import *
+from llmzmcp.utils.completion_cache import *
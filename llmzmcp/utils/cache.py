@@ -1,29 +1,263 @@
-from datetime import datetime, timedelta
-from functools import lru_cache, wraps
+import asyncio
+import inspect
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from functools import wraps
 
+CacheInfo = namedtuple(
+    "CacheInfo",
+    ["hits", "misses", "evictions", "expirations", "currsize", "currbytes", "maxsize", "max_bytes"],
+)
 
-def timed_lru_cache(seconds: int, maxsize: int = None, verbose=False):
+_MISSING = object()
+_RETRY = object()  # Result of an async load whose owner was cancelled
+_KWD_MARK = object()
+
+
+def deep_sizeof(obj, _seen=None):
+    """
+    Rough recursive memory footprint of an object in bytes. Follows the builtin
+    containers (and object `__dict__`s) so a list of dicts is counted in full.
+    """
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, bytearray)):
+        return size
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, _seen) + deep_sizeof(v, _seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(el, _seen) for el in obj)
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), _seen)
+    return size
+
+
+class _Flight:
+    """
+    A load in progress. Threads that miss on a key while it is being loaded
+    wait on the event instead of calling the loader again.
+    """
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache where every entry expires `ttl` seconds after it was stored
+    (monotonic clock, `ttl=None` never expires). Bounded by number of entries
+    (`maxsize`) and/or an approximate byte budget (`max_bytes`, measured with `sizeof`).
+    Concurrent misses on the same key are collapsed so only one caller runs the loader.
+    """
+
+    def __init__(self, ttl=None, maxsize=None, max_bytes=None, sizeof=deep_sizeof,
+                 clock=time.monotonic):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.clock = clock
+
+        self._data = OrderedDict()  # key -> (value, expires_at, nbytes)
+        self._lock = threading.RLock()
+        self._flights = {}
+        self._async_flights = {}
+        self._bytes = 0
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def _drop(self, key):
+        _, _, nbytes = self._data.pop(key)
+        self._bytes -= nbytes
+
+    def _lookup(self, key):
+        """
+        Return the cached value or `_MISSING`, updating stats and LRU order. Needs the lock.
+        """
+        entry = self._data.get(key)
+        if entry is not None:
+            value, expires_at, _ = entry
+            if expires_at is None or self.clock() < expires_at:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            self._drop(key)
+            self.expirations += 1
+        self.misses += 1
+        return _MISSING
+
+    def _purge_expired(self):
+        now = self.clock()
+        expired = [k for k, (_, exp, _) in self._data.items() if exp is not None and now >= exp]
+        for key in expired:
+            self._drop(key)
+        self.expirations += len(expired)
+
+    def _over_budget(self):
+        return ((self.maxsize is not None and len(self._data) > self.maxsize)
+                or (self.max_bytes is not None and self._bytes > self.max_bytes))
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def set(self, key, value, ttl=_MISSING):
+        """
+        Store a value. `ttl` overrides the cache-wide lifetime for this entry.
+        """
+        ttl = self.ttl if ttl is _MISSING else ttl
+        nbytes = self.sizeof(value) if self.max_bytes is not None else 0
+        if self.maxsize == 0 or (self.max_bytes is not None and nbytes > self.max_bytes):
+            return  # Would evict everything else and still not fit
+
+        expires_at = None if ttl is None else self.clock() + ttl
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (value, expires_at, nbytes)
+            self._bytes += nbytes
+
+            if self._over_budget():
+                self._purge_expired()
+            while self._over_budget():
+                _, (_, _, evicted_bytes) = self._data.popitem(last=False)
+                self._bytes -= evicted_bytes
+                self.evictions += 1
+
+    def get_or_load(self, key, loader):
+        """
+        Return the cached value for `key`, calling `loader()` on a miss. Threads that
+        miss while another thread is loading the same key wait for its result.
+        """
+        with self._lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                return value
+            flight = self._flights.get(key)
+            owner = flight is None
+            if owner:
+                flight = self._flights[key] = _Flight()
+
+        if not owner:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+            self.set(key, flight.value)
+            return flight.value
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.event.set()
+
+    async def aget_or_load(self, key, loader):
+        """
+        Async twin of `get_or_load`, `loader()` returns an awaitable. Concurrent
+        misses on the same event loop await a single shared load. When the task that
+        owns the load is cancelled the waiters retry, one of them becomes the new owner.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                return value
+            future = self._async_flights.get(key)
+            owner = future is None or future.get_loop() is not loop
+            if owner:
+                future = self._async_flights[key] = loop.create_future()
+
+        if not owner:
+            value = await asyncio.shield(future)
+            if value is _RETRY:
+                return await self.aget_or_load(key, loader)
+            return value
+
+        try:
+            value = await loader()
+            self.set(key, value)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            # Only the owner was cancelled, the waiters must not see a CancelledError
+            future.set_result(_RETRY)
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # Mark as retrieved when nobody else is waiting
+            raise
+        finally:
+            with self._lock:
+                if self._async_flights.get(key) is future:
+                    del self._async_flights[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, self.expirations,
+                             len(self._data), self._bytes, self.maxsize, self.max_bytes)
+
+
+def _make_key(args, kwargs):
+    key = args
+    if kwargs:
+        key += (_KWD_MARK,) + tuple(sorted(kwargs.items()))
+    return key
+
+
+def timed_lru_cache(seconds: int, maxsize: int = None, verbose=False, max_bytes: int = None):
     """
-    Author: https://www.mybluelinux.com/pyhon-lru-cache-with-time-expiration/
+    Memoize a function for `seconds`. Every cached result has its own expiry, the cache
+    is bounded by `maxsize` entries and `max_bytes`, and concurrent calls with the same
+    arguments share one evaluation. Works for both regular and `async def` functions.
+    The wrapped function exposes `cache`, `cache_info()` and `cache_clear()`.
     """
     def wrapper_cache(func):
-        func = lru_cache(maxsize=maxsize)(func)
-        func.lifetime = timedelta(seconds=seconds)
-        func.expiration = datetime.now() + func.lifetime
-        func.verbose = verbose
-
-        @wraps(func)
-        def wrapped_func(*args, **kwargs):
-            if func.verbose:
-                print(f"Current Time: {datetime.now()}, Cache expiration: {func.expiration}")
-            if datetime.now() >= func.expiration:
-                if func.verbose:
-                    print("Cache lifetime expired, retrieving data")
-                func.cache_clear()
-                func.expiration = datetime.now() + func.lifetime
-
-            return func(*args, **kwargs)
+        cache = TTLCache(ttl=seconds, maxsize=maxsize, max_bytes=max_bytes)
+
+        def log():
+            if verbose:
+                print(f"{func.__name__}: {cache.info()}")
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapped_func(*args, **kwargs):
+                key = _make_key(args, kwargs)
+                result = await cache.aget_or_load(key, lambda: func(*args, **kwargs))
+                log()
+                return result
+        else:
+            @wraps(func)
+            def wrapped_func(*args, **kwargs):
+                key = _make_key(args, kwargs)
+                result = cache.get_or_load(key, lambda: func(*args, **kwargs))
+                log()
+                return result
 
+        wrapped_func.cache = cache
+        wrapped_func.cache_info = cache.info
+        wrapped_func.cache_clear = cache.clear
         return wrapped_func
 
-    return wrapper_cache
\ No newline at end of file
+    return wrapper_cache
@@ -0,0 +1,142 @@
+"""
+Persistent cache for chat completions. Responses are stored in a local SQLite database
+keyed by a sha256 of the model, the messages and every request parameter, so re-running
+an evaluation with identical prompts never hits the api twice.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from llmzmcp.utils.paths import get_cache_dir
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS completions (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS completions_accessed_at ON completions (accessed_at);
+"""
+
+
+def completion_key(model, messages, **params):
+    """
+    Content address of a request. Parameters set to None are dropped so
+    `temperature=None` and an omitted temperature map to the same entry.
+    """
+    params = {k: v for k, v in params.items() if v is not None}
+    payload = json.dumps({"model": model, "messages": messages, "params": params},
+                         sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CompletionCache:
+    """
+    SQLite backed completion cache that is safe to share between threads (one
+    connection per thread, WAL journal). `ttl` (seconds) expires entries, `max_entries`
+    evicts the least recently used rows once the table grows past it.
+    """
+
+    def __init__(self, path=None, ttl=None, max_entries=None):
+        self.path = str(path or get_cache_dir() / "completions.sqlite3")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT response, expires_at FROM completions WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is not None and (row[1] is None or row[1] > now):
+            with conn:
+                conn.execute("UPDATE completions SET accessed_at = ? WHERE key = ?", (now, key))
+            with self._lock:
+                self.hits += 1
+            return row[0]
+
+        if row is not None:
+            with conn:
+                conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, model, response, ttl=None):
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = None if ttl is None else now + ttl
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, now, now, expires_at),
+            )
+            if self.max_entries is not None:
+                conn.execute(
+                    "DELETE FROM completions WHERE key IN ("
+                    " SELECT key FROM completions ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def get_or_create(self, model, messages, create, **params):
+        """
+        Return the cached response for the request or call `create()` and store its result
+        """
+        key = completion_key(model, messages, **params)
+        response = self.get(key)
+        if response is None:
+            response = create()
+            self.set(key, model, response)
+        return response
+
+    def purge_expired(self):
+        conn = self._conn()
+        with conn:
+            deleted = conn.execute(
+                "DELETE FROM completions WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            ).rowcount
+        return deleted
+
+    def clear(self):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM completions")
+
+    def stats(self):
+        entries, size = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(response)), 0) FROM completions"
+        ).fetchone()
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 3) if total else 0.0,
+            "entries": entries,
+            "response_chars": size,
+        }
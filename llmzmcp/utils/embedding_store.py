@@ -0,0 +1,167 @@
+"""
+Persistent embedding store keyed by model name and a hash of the embedded text.
+Vectors live in an append-only raw file that is opened as a read-only memory map, so
+looking up an already embedded text costs a dict lookup and a row copy instead of a
+forward pass through the model.
+
+Layout of a store directory (`<cache>/embeddings/<model>-<dtype>/`):
+    meta.json    model name, dimensionality and dtype
+    keys.bin     16 byte blake2b digests, one per row
+    vectors.bin  row-major vectors in `dtype`
+"""
+
+import hashlib
+import json
+import re
+import threading
+
+import numpy as np
+
+from llmzmcp.utils.paths import get_cache_dir
+
+try:
+    import fcntl
+except ImportError:  # Windows, appends are only guarded within the process
+    fcntl = None
+
+_DIGEST_SIZE = 16
+
+
+def text_digest(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=_DIGEST_SIZE).digest()
+
+
+class EmbeddingStore:
+    """
+    Memory-mapped embedding cache for one model. `get_many(texts, encode)` returns an
+    (n, dim) float32 array and embeds all missing texts with a single `encode(list)` call.
+    Stores vectors as float32 or float16 (`dtype`) to halve the disk/page cache footprint.
+    """
+
+    def __init__(self, model_name, dtype="float32", root=None):
+        assert dtype in ("float32", "float16"), "dtype must be `float32` or `float16`"
+        self.model_name = model_name
+        self.dtype = np.dtype(dtype)
+
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        root = root or get_cache_dir() / "embeddings"
+        self.directory = root / f"{safe_name}-{self.dtype.name}"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._meta_path = self.directory / "meta.json"
+        self._keys_path = self.directory / "keys.bin"
+        self._vectors_path = self.directory / "vectors.bin"
+
+        self._lock = threading.RLock()
+        self.dim = None
+        self._rows = {}
+        self._vectors = None
+        self._keys_size = 0
+        self.hits = self.misses = 0
+        self._refresh()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _refresh(self):
+        """
+        (Re)load the key index and the memory map when the files grew, e.g. because
+        another process appended vectors.
+        """
+        if not self._meta_path.exists():
+            return
+        if self.dim is None:
+            self.dim = json.loads(self._meta_path.read_text())["dim"]
+        if not self._keys_path.exists() or self._keys_path.stat().st_size == self._keys_size:
+            return
+
+        keys = self._keys_path.read_bytes()
+        row_bytes = self.dim * self.dtype.itemsize
+        n_vectors = self._vectors_path.stat().st_size // row_bytes
+        n_rows = min(len(keys) // _DIGEST_SIZE, n_vectors)  # Ignore a torn trailing write
+
+        for row in range(len(self._rows), n_rows):
+            self._rows[keys[row * _DIGEST_SIZE:(row + 1) * _DIGEST_SIZE]] = row
+        self._keys_size = n_rows * _DIGEST_SIZE
+        self._vectors = np.memmap(self._vectors_path, dtype=self.dtype, mode="r",
+                                  shape=(n_rows, self.dim)) if n_rows else None
+
+    def _truncate_torn_rows(self):
+        """
+        Cut both files back to the rows that have a key and a vector. A crash between the
+        vector and the key write leaves an orphan vector, rows appended after it would
+        otherwise be read at the wrong position. Only called under the file lock.
+        """
+        row_bytes = self.dim * self.dtype.itemsize
+        keys_size = self._keys_path.stat().st_size if self._keys_path.exists() else 0
+        vectors_size = self._vectors_path.stat().st_size if self._vectors_path.exists() else 0
+        n_rows = min(keys_size // _DIGEST_SIZE, vectors_size // row_bytes)
+        if keys_size != n_rows * _DIGEST_SIZE:
+            with open(self._keys_path, "r+b") as f_out:
+                f_out.truncate(n_rows * _DIGEST_SIZE)
+        if vectors_size != n_rows * row_bytes:
+            with open(self._vectors_path, "r+b") as f_out:
+                f_out.truncate(n_rows * row_bytes)
+
+    def _append(self, digests, vectors):
+        vectors = np.ascontiguousarray(vectors, dtype=self.dtype)
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+            self._meta_path.write_text(json.dumps(
+                {"model": self.model_name, "dim": self.dim, "dtype": self.dtype.name}))
+
+        with open(self.directory / ".lock", "wb") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._truncate_torn_rows()
+            self._refresh()
+            new = [(d, v) for d, v in zip(digests, vectors) if d not in self._rows]
+            if new:
+                # Vectors first so a crash never leaves a key without its vector, an
+                # orphan vector is cut by the next append
+                with open(self._vectors_path, "ab") as f_out:
+                    f_out.write(np.stack([v for _, v in new]).tobytes())
+                with open(self._keys_path, "ab") as f_out:
+                    f_out.write(b"".join(d for d, _ in new))
+            self._refresh()
+
+    def get_many(self, texts, encode):
+        """
+        Return the embeddings of `texts` as a float32 array in input order. Texts that are
+        not stored yet (deduplicated) are embedded with one `encode(list_of_texts)` call.
+        """
+        digests = [text_digest(t) for t in texts]
+        with self._lock:
+            missing = {}
+            for digest, text in zip(digests, texts):
+                if digest not in self._rows and digest not in missing:
+                    missing[digest] = text
+            self.misses += len(missing)
+            self.hits += len(texts) - len(missing)
+
+        if missing:
+            # Encode outside the lock so several threads can embed different batches at once
+            vectors = np.asarray(encode(list(missing.values())))
+            with self._lock:
+                self._append(list(missing.keys()), vectors.reshape(len(missing), -1))
+
+        with self._lock:
+            if not texts:
+                return np.empty((0, self.dim or 0), dtype=np.float32)
+            rows = np.fromiter((self._rows[d] for d in digests), dtype=np.int64, count=len(digests))
+            return np.asarray(self._vectors[rows], dtype=np.float32)
+
+    def get(self, text, encode):
+        """
+        Single text version of `get_many`, returns a 1-d vector
+        """
+        return self.get_many([text], encode)[0]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "model": self.model_name,
+            "rows": len(self._rows),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
@@ -9,4 +9,7 @@ cwd = get_repo_dir()
 env_path = f"{cwd}/.env"
 load_dotenv(dotenv_path=f"{env_path}")
 
-OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
\ No newline at end of file
+OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
+
+# Qdrant points only carry the document id and `course`, results are hydrated locally
+SLIM_PAYLOADS = os.environ.get("LLMZMCP_SLIM_PAYLOADS", "1") != "0"
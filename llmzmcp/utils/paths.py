@@ -22,4 +22,13 @@ def get_repo_dir():
     Get the repo root directory
     """
     path = Path(os.path.realpath(__file__)).parents[2]
-    return path
\ No newline at end of file
+    return path
+
+def get_cache_dir():
+    """
+    Get the directory used for on-disk caches (snapshots, columnar copies, etc.).
+    Defaults to `<repo>/.cache` and can be moved with the `LLMZMCP_CACHE_DIR` env variable.
+    """
+    path = Path(os.environ.get("LLMZMCP_CACHE_DIR", get_repo_dir() / ".cache"))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
@@ -0,0 +1,44 @@
+import numpy as np
+
+from llmzmcp.search import IVFVectorSearch
+from llmzmcp.search.ann import kmeans
+
+
+def _corpus(n=1000, dim=32):
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(n, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    documents = [{"id": i, "course": "a" if i % 2 else "b"} for i in range(n)]
+    return vectors, documents
+
+
+def test_kmeans_centroids_are_unit_length_and_scale_free():
+    vectors, _ = _corpus()
+    centroids = kmeans(vectors, 8)
+    assert np.allclose(np.linalg.norm(centroids, axis=1), 1, atol=1e-5)
+    # Assignment is by inner product, rescaling the vectors changes nothing
+    scaled = vectors * np.random.default_rng(1).uniform(0.1, 10, size=(len(vectors), 1))
+    assert np.allclose(kmeans(scaled.astype(np.float32), 8), centroids, atol=1e-5)
+
+
+def test_full_probe_is_exact():
+    vectors, documents = _corpus()
+    index = IVFVectorSearch(keyword_fields=["course"], exact_threshold=0).fit(vectors, documents)
+    query = vectors[7]
+    rows, _ = index.search_rows(query, {"course": "a"}, num_results=5,
+                                nprobe=len(index.centroids))
+
+    scores = vectors @ query
+    scores[np.array([d["course"] != "a" for d in documents])] = -np.inf
+    assert rows.tolist() == np.argsort(-scores)[:5].tolist()
+
+
+def test_save_load_without_suffix(tmp_path):
+    vectors, documents = _corpus()
+    index = IVFVectorSearch(keyword_fields=["course"]).fit(vectors, documents)
+    index.save(tmp_path / "index")
+    loaded = IVFVectorSearch.load(tmp_path / "index")
+
+    assert (tmp_path / "index.npz").exists()
+    for vector in vectors[:20]:
+        assert loaded.search(vector, {"course": "b"}, 5) == index.search(vector, {"course": "b"}, 5)
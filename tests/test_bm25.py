@@ -0,0 +1,86 @@
+import math
+import re
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from llmzmcp.search import BM25Index
+
+DOCS = [
+    {"question": "How do I install docker?", "text": "Use apt to install docker", "course": "de"},
+    {"question": "Docker compose fails", "text": "Check the compose file", "course": "de"},
+    {"question": "Can I still join the course?", "text": "Yes, you can join late", "course": "ml"},
+    {"question": "Where is the course calendar?", "text": "The calendar is on the site",
+     "course": "ml"},
+    {"question": "Install python packages", "text": "Use pip or conda to install",
+     "course": "mlops"},
+    {"question": None, "text": "Docker docker docker", "course": "mlops"},
+]
+
+
+def reference_scores(query, docs, fields, boost={}, k1=1.2, b=0.75):
+    """
+    Textbook BM25 scored document by document
+    """
+    tokenize = lambda text: re.findall(r"(?u)\b\w\w+\b", str(text or "").lower())
+    scores = np.zeros(len(docs))
+    for field in fields:
+        tokens = [tokenize(doc.get(field)) for doc in docs]
+        avgdl = max(np.mean([len(t) for t in tokens]), 1.0)
+        for term, qtf in Counter(tokenize(query)).items():
+            df = sum(term in t for t in tokens)
+            idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+            for row, doc_tokens in enumerate(tokens):
+                tf = doc_tokens.count(term)
+                norm = k1 * (1 - b + b * len(doc_tokens) / avgdl)
+                scores[row] += boost.get(field, 1.0) * qtf * idf * tf * (k1 + 1) / (tf + norm)
+    return scores
+
+
+@pytest.fixture
+def index():
+    return BM25Index(text_fields=["question", "text"], keyword_fields=["course"]).fit(DOCS)
+
+
+@pytest.mark.parametrize("query,boost", [
+    ("install docker", {}),
+    ("docker docker compose", {"question": 3.0}),
+    ("join the course", {"text": 0}),
+    ("calendar", {"question": 0.5, "text": 2.0}),
+])
+def test_scores_match_reference_bm25(index, query, boost):
+    expected = reference_scores(query, DOCS, ["question", "text"], boost)
+    rows, scores = index.search_rows(query, boost_dict=boost, num_results=len(DOCS))
+
+    positive = np.flatnonzero(expected > 0)
+    assert sorted(rows.tolist()) == sorted(positive.tolist())
+    assert np.allclose(scores, expected[rows], rtol=1e-5)
+    assert list(scores) == sorted(scores, reverse=True)
+    assert np.allclose(index.score_rows(query, np.arange(len(DOCS)), boost), expected, rtol=1e-5)
+
+
+@pytest.mark.parametrize("filter_dict,allowed", [
+    ({"course": "de"}, {0, 1}),
+    ({"course": ["de", "mlops"]}, {0, 1, 4, 5}),
+    ({"$or": [{"course": "ml"}, {"course": "mlops"}]}, {2, 3, 4, 5}),
+    ({"course": "missing"}, set()),
+    ({"not_a_keyword_field": "x"}, set(range(len(DOCS)))),  # Ignored, as in minsearch
+])
+def test_filters(index, filter_dict, allowed):
+    rows, _ = index.search_rows("install docker course", filter_dict=filter_dict, num_results=10)
+    everything, _ = index.search_rows("install docker course", num_results=10)
+    assert set(rows.tolist()) == allowed & set(everything.tolist())
+
+
+def test_num_results_and_no_match(index):
+    expected = reference_scores("docker", DOCS, ["question", "text"])
+    top = [DOCS[i] for i in np.argsort(-expected)[:2]]
+    assert index.search("docker", num_results=2) == top
+    assert index.search("kubernetes") == []
+    assert index.search("docker", num_results=0) == []
+
+
+def test_stop_words():
+    index = BM25Index(text_fields=["text"], keyword_fields=[], stop_words=["the"]).fit(DOCS)
+    assert index.search("the") == []
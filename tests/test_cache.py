@@ -0,0 +1,27 @@
+import asyncio
+
+from llmzmcp.utils import TTLCache
+
+
+def test_aget_or_load_cancelled_owner_does_not_cancel_waiters():
+    cache = TTLCache(ttl=None, maxsize=16)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "value"
+
+    async def main():
+        owner = asyncio.create_task(cache.aget_or_load("key", loader))
+        await asyncio.sleep(0.01)  # The owner is inside its load
+        waiter = asyncio.create_task(cache.aget_or_load("key", loader))
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        result = await waiter
+        assert owner.cancelled()
+        return result
+
+    assert asyncio.run(main()) == "value"
+    assert len(calls) == 2  # The waiter took the load over
+    assert cache.get("key") == "value"
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from llmzmcp.shared import context
+from llmzmcp.shared.context import APPROXIMATE_ENCODING, TRUNCATION_MARK, pack_context
+
+ENCODING = APPROXIMATE_ENCODING  # 4 characters per token, no download needed
+
+
+def doc(section, question, text):
+    return {"section": section, "question": question, "text": text}
+
+
+def exact_tokens(packed):
+    return len(ENCODING.encode(packed.text))
+
+
+def test_everything_fits():
+    docs = [doc("Module 1", "Docker?", "Install docker."), doc("Module 2", "Join?", "Yes.")]
+    packed = pack_context(docs, budget=500, encoding=ENCODING)
+
+    assert packed.documents == docs
+    assert (packed.duplicates, packed.truncated, packed.dropped) == (0, 0, 0)
+    assert packed.text == ("section: Module 1\nquestion: Docker?\nanswer: Install docker.\n\n"
+                           "section: Module 2\nquestion: Join?\nanswer: Yes.\n\n")
+    assert sum(packed.sections.values()) == packed.tokens
+    assert packed.report()["documents"] == 2
+
+
+def test_duplicates_are_dropped_by_normalized_answer():
+    docs = [doc("A", "q1", "Same  answer"), doc("B", "q2", "same answer"), doc("C", "q3", "x")]
+    packed = pack_context(docs, budget=500, encoding=ENCODING)
+    assert [d["question"] for d in packed.documents] == ["q1", "q3"]
+    assert packed.duplicates == 1
+
+
+@pytest.mark.parametrize("budget", [60, 100, 200, 400])
+def test_budget_is_respected(budget):
+    docs = [doc(f"Module {i % 3}", f"question {i}", f"answer {i} " * 40) for i in range(20)]
+    packed = pack_context(docs, budget=budget, encoding=ENCODING, min_answer_tokens=8)
+
+    assert packed.tokens <= budget
+    assert exact_tokens(packed) <= budget
+    assert packed.documents == docs[:len(packed.documents)]  # Rank order
+    assert len(packed.documents) + packed.dropped == len(docs)
+
+
+def test_long_answers_are_cut_and_short_rooms_dropped():
+    long = doc("A", "long", "word " * 200)
+    packed = pack_context([long, doc("B", "short", "fits")], budget=120, encoding=ENCODING,
+                          max_doc_tokens=60, min_answer_tokens=8)
+
+    assert packed.truncated == 1
+    assert packed.text.split("\n\n")[0].endswith(TRUNCATION_MARK)
+    assert packed.sections["A"] <= 60
+    assert [d["question"] for d in packed.documents] == ["long", "short"]
+
+    # Not even `min_answer_tokens` of the answer fit, the result is dropped
+    packed = pack_context([long], budget=20, encoding=ENCODING, min_answer_tokens=8)
+    assert (packed.documents, packed.dropped, packed.text) == ([], 1, "")
+
+
+def test_rank():
+    docs = [doc("A", "q1", "a"), doc("B", "q2", "b")]
+    packed = pack_context(docs, encoding=ENCODING, rank=lambda d: d["question"])
+    assert [d["question"] for d in packed.documents] == ["q2", "q1"]
+
+
+def test_no_encoding_is_loaded_inside_a_coroutine(monkeypatch):
+    monkeypatch.setattr(context, "_encodings", {})
+    monkeypatch.setattr(context, "get_encoding",
+                        lambda model='gpt-4o': pytest.fail("loaded on the event loop"))
+
+    docs = [doc("A", "q", "answer")]
+
+    async def main():
+        return pack_context(docs, model="gpt-test")
+
+    # The approximation was used
+    assert asyncio.run(main()) == pack_context(docs, encoding=ENCODING)
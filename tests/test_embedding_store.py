@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from llmzmcp.utils.embedding_store import EmbeddingStore
+
+DIM = 4
+
+
+def fake_vector(text):
+    return np.array([len(text), sum(map(ord, text)) % 97, ord(text[0]), 1.0], dtype=np.float32)
+
+
+class FakeModel:
+    """
+    Deterministic stand-in for a model, records the batches it was asked to encode
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return np.stack([fake_vector(t) for t in texts])
+
+
+@pytest.fixture
+def root(tmp_path):
+    return tmp_path / "embeddings"
+
+
+def test_missing_texts_are_encoded_once_in_one_call(root):
+    store = EmbeddingStore("fake/model", root=root)
+    model = FakeModel()
+
+    vectors = store.get_many(["a", "bb", "a", "ccc"], model)
+    assert model.calls == [["a", "bb", "ccc"]]
+    assert np.array_equal(vectors, np.stack([fake_vector(t) for t in ["a", "bb", "a", "ccc"]]))
+
+    store.get_many(["ccc", "a", "dddd"], model)
+    assert model.calls[1:] == [["dddd"]]
+    assert store.stats()["rows"] == 4
+    assert np.array_equal(store.get("bb", model), fake_vector("bb"))
+
+
+def test_stores_see_rows_appended_by_others(root):
+    model = FakeModel()
+    writer = EmbeddingStore("fake/model", root=root)
+    other = EmbeddingStore("fake/model", root=root)
+    writer.get_many(["a", "bb"], model)
+
+    # The other store refreshes from disk when it appends, its misses were already stored
+    other.get_many(["x", "a", "bb"], model)
+    assert model.calls == [["a", "bb"], ["x", "a", "bb"]]
+    assert len(other) == 3
+
+    reopened = EmbeddingStore("fake/model", root=root)
+    assert len(reopened) == 3
+    vectors = reopened.get_many(["bb", "x", "a"], model)
+    assert np.array_equal(vectors, np.stack([fake_vector(t) for t in ["bb", "x", "a"]]))
+    assert len(model.calls) == 2
+
+
+def test_float16_store(root):
+    store = EmbeddingStore("fake/model", dtype="float16", root=root)
+    vectors = store.get_many(["a", "bb"], FakeModel())
+    assert vectors.dtype == np.float32
+    assert np.allclose(vectors, [fake_vector("a"), fake_vector("bb")], atol=1e-2)
+    assert (store.directory / "vectors.bin").stat().st_size == 2 * DIM * 2
+
+
+@pytest.mark.parametrize("torn", ["vector", "partial_vector", "vector_and_partial_key"])
+def test_append_after_a_torn_write_keeps_rows_aligned(root, torn):
+    model = FakeModel()
+    store = EmbeddingStore("fake/model", root=root)
+    store.get_many(["a", "bb"], model)
+
+    # A crash between, or in the middle of, the vector and the key write of the next row
+    orphan = np.full(DIM, 99, dtype=np.float32).tobytes()
+    with open(store.directory / "vectors.bin", "ab") as f_out:
+        f_out.write(orphan[:6] if torn == "partial_vector" else orphan)
+    if torn == "vector_and_partial_key":
+        with open(store.directory / "keys.bin", "ab") as f_out:
+            f_out.write(b"\x02" * 5)
+
+    reopened = EmbeddingStore("fake/model", root=root)
+    assert len(reopened) == 2
+    reopened.get_many(["ccc", "dddd"], model)
+
+    texts = ["a", "bb", "ccc", "dddd"]
+    fresh = EmbeddingStore("fake/model", root=root)
+    assert np.array_equal(fresh.get_many(texts, model), np.stack([fake_vector(t) for t in texts]))
+    assert len(model.calls) == 2  # Nothing re-encoded
+    assert (store.directory / "keys.bin").stat().st_size == 4 * 16
+    assert (store.directory / "vectors.bin").stat().st_size == 4 * DIM * 4
@@ -0,0 +1,37 @@
+import numpy as np
+
+from llmzmcp.search import quantized
+from llmzmcp.search.quantized import QuantizedVectorSearch
+
+
+def _corpus(n=200, dim=64):
+    vectors = np.random.default_rng(0).normal(size=(n, dim)).astype(np.float32)
+    documents = [{"course": "a" if i % 2 else "b"} for i in range(n)]
+    return vectors, documents
+
+
+def test_popcount_fallback_counts_bits_per_byte(monkeypatch):
+    x = np.random.default_rng(1).integers(0, 256, size=(5, 8), dtype=np.uint8)
+    expected = np.array([[bin(b).count("1") for b in row] for row in x])
+    monkeypatch.delattr(np, "bitwise_count", raising=False)
+    assert (quantized._popcount(x) == expected).all()
+
+
+def test_binary_search_without_bitwise_count(monkeypatch, tmp_path):
+    vectors, documents = _corpus()
+    index = QuantizedVectorSearch(["course"], quantization="binary",
+                                  mmap_path=tmp_path / "vectors").fit(vectors, documents)
+    expected, _ = index.search_rows(vectors[3], {"course": "a"}, num_results=5)
+
+    monkeypatch.delattr(np, "bitwise_count", raising=False)
+    rows, _ = index.search_rows(vectors[3], {"course": "a"}, num_results=5)
+    assert rows.tolist() == expected.tolist()
+    assert rows[0] == 3
+
+
+def test_mmap_path_without_suffix(tmp_path):
+    vectors, documents = _corpus()
+    index = QuantizedVectorSearch(["course"], mmap_path=str(tmp_path / "vectors"))
+    index.fit(vectors, documents)
+    assert (tmp_path / "vectors.npy").exists()
+    assert np.array_equal(index.vectors, vectors)
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from llmzmcp.data.snapshot import DocumentSnapshot, open_snapshot, write_snapshot
+
+FIELDS = ["question", "text", "course"]
+RECORDS = [
+    {"question": "Can I still join?", "text": "Yes, see the FAQ ✓", "course": "mlops"},
+    {"question": "Docker on Windows?", "text": "", "course": "data-engineering"},
+    {"question": "Missing course", "text": "Ünïcode text"},
+]
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("LLMZMCP_CACHE_DIR", str(tmp_path / "cache"))
+
+
+def test_round_trip(tmp_path):
+    path = write_snapshot(tmp_path / "docs.snap", RECORDS, FIELDS, "abc")
+    snapshot = DocumentSnapshot(path)
+
+    assert len(snapshot) == 3
+    assert snapshot.checksum == "abc"
+    assert snapshot[0] == RECORDS[0]
+    assert snapshot[-1] == {**RECORDS[2], "course": ""}  # Missing values are empty strings
+    assert snapshot.column("text") == [rec["text"] for rec in RECORDS]
+    assert snapshot.to_records() == [{f: rec.get(f, "") for f in FIELDS} for rec in RECORDS]
+    with pytest.raises(IndexError):
+        snapshot[3]
+
+
+@pytest.mark.parametrize("keep", [4, 10, 14, 100, -8])
+def test_truncated_snapshot_is_rejected(tmp_path, keep):
+    path = write_snapshot(tmp_path / "docs.snap", RECORDS, FIELDS, "abc")
+    data = path.read_bytes()
+    path.write_bytes(data[:keep])
+
+    with pytest.raises(ValueError):
+        DocumentSnapshot(path)
+
+
+def test_open_snapshot_rebuilds_truncated_and_stale_files(tmp_path):
+    source = tmp_path / "docs.json"
+    source.write_text(json.dumps(RECORDS))
+    calls = []
+
+    def build():
+        calls.append(1)
+        return json.loads(source.read_text())
+
+    snapshot = open_snapshot("docs", source, FIELDS, build)
+    assert open_snapshot("docs", source, FIELDS, build).to_records() == snapshot.to_records()
+    assert len(calls) == 1
+
+    # Cut inside the header length, then inside the data
+    for keep in [12, len(snapshot.path.read_bytes()) - 8]:
+        snapshot.path.write_bytes(snapshot.path.read_bytes()[:keep])
+        assert open_snapshot("docs", source, FIELDS, build)[1] == RECORDS[1]
+
+    # An edit of the source changes its checksum
+    source.write_text(json.dumps(RECORDS[:1]))
+    assert len(open_snapshot("docs", source, FIELDS, build)) == 1
+    assert len(calls) == 4
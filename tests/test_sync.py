@@ -0,0 +1,91 @@
+import pytest
+from qdrant_client import QdrantClient, models
+
+from llmzmcp.data import content_hash
+from llmzmcp.shared.sync import HASH_FIELD, diff_documents, point_id, sync_qdrant
+
+DOCS = [
+    {"id": "a", "question": "How do I join?", "text": "Register", "course": "mlops"},
+    {"id": "b", "question": "Docker?", "text": "Install it", "course": "de"},
+    {"id": "c", "question": "Homework?", "text": "On the site", "course": "ml"},
+]
+
+
+def stored_hashes(documents):
+    return {doc["id"]: content_hash(doc) for doc in documents}
+
+
+def test_diff_documents_plan():
+    edited = {**DOCS[1], "text": "Install docker desktop"}
+    new = {"id": "d", "question": "Certificate?", "text": "Finish the project", "course": "ml"}
+    plan = diff_documents([DOCS[0], edited, new], stored_hashes(DOCS))
+
+    assert [doc_id for doc_id, _, _ in plan.inserts] == ["d"]
+    assert [(doc_id, doc) for doc_id, _, doc in plan.updates] == [("b", edited)]
+    assert plan.deletes == ["c"]
+    assert plan.unchanged == 1
+    assert plan.changed
+    assert str(plan) == "1 inserts, 1 updates, 1 deletes, 1 unchanged"
+
+
+def test_diff_documents_unchanged_and_unknown_hashes():
+    plan = diff_documents(DOCS, stored_hashes(DOCS))
+    assert not plan.changed and plan.unchanged == 3
+
+    # A stored document without a hash is re-sent, a salt changes every hash
+    assert len(diff_documents(DOCS, {"a": None}).updates) == 1
+    assert len(diff_documents(DOCS, stored_hashes(DOCS), salt="v2").updates) == 3
+
+
+def test_diff_documents_ignores_excluded_fields():
+    stored = {doc["id"]: content_hash(doc) for doc in DOCS}
+    with_hash = [{**doc, HASH_FIELD: "stale"} for doc in DOCS]
+    assert not diff_documents(with_hash, stored, exclude=(HASH_FIELD,)).changed
+
+
+@pytest.fixture
+def client():
+    client = QdrantClient(":memory:")
+    client.create_collection("faq", vectors_config=models.VectorParams(
+        size=2, distance=models.Distance.COSINE))
+    return client
+
+
+def embed(docs):
+    embed.calls.append([doc["doc_id"] for doc in docs])
+    return [[len(doc["text"]), 1.0] for doc in docs]
+
+
+def sync(client, documents):
+    embed.calls = []
+    return sync_qdrant(client, "faq", documents, embedders={None: embed},
+                       make_payload=lambda doc: doc, workers=1)
+
+
+def payloads(client):
+    points, _ = client.scroll("faq", limit=100, with_payload=True)
+    return {point.payload["doc_id"]: point.payload for point in points}
+
+
+def test_sync_qdrant_only_embeds_changes(client):
+    # A point seeded before the collection was synced has no doc_id and is replaced
+    client.upsert("faq", points=[models.PointStruct(id=1, vector=[1.0, 0.0], payload=DOCS[0])])
+
+    plan = sync(client, DOCS)
+    assert (len(plan.inserts), len(plan.deletes)) == (3, 1)
+    assert set(payloads(client)) == {"a", "b", "c"}
+    assert client.count("faq").count == 3
+
+    plan = sync(client, DOCS)
+    assert not plan.changed and plan.unchanged == 3
+    assert embed.calls == []
+
+    edited = {**DOCS[1], "text": "Install docker desktop"}
+    plan = sync(client, [DOCS[0], edited])
+    assert (len(plan.updates), plan.deletes, plan.unchanged) == (1, ["c"], 1)
+    assert embed.calls == [["b"]]
+    stored = payloads(client)
+    assert set(stored) == {"a", "b"}
+    assert stored["b"]["text"] == "Install docker desktop"
+    point = client.retrieve("faq", [point_id("b")], with_vectors=True)[0]
+    assert point.vector == pytest.approx([v / (22 ** 2 + 1) ** 0.5 for v in [22, 1.0]])